@@ -1,16 +1,23 @@
 from __future__ import annotations
 
 import argparse
+import os
 import random
-from datetime import date
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
+from typing import Any, Dict, List, Optional, TypedDict
 
 import yaml
 
 try:
     from data_generator.generators.patients import (
+        PATIENT_MASTER_FILENAME,
+        PatientMaster,
         ensure_patients_master,
         add_new_patients,
+        append_new_patients,
         export_active_patients_snapshot,
     )
     from data_generator.generators.encounters import (
@@ -18,13 +25,32 @@ try:
         generate_encounters_for_day,
     )
     from data_generator.generators.vitals import (
+        VITALS_LAYOUTS,
         generate_vitals_for_day,
+        generate_vitals_columns_for_day,
+        generate_vitals_wide_columns_for_day,
+        vitals_rows_to_wide,
         write_vitals_csv,
+        write_vitals_columns_csv,
+        write_vitals_parquet,
+        write_vitals_columns_parquet,
+        write_vitals_wide_csv,
+        write_vitals_wide_parquet,
     )
+    from data_generator.generators.labs import (
+        generate_labs_columns_for_day,
+        write_labs_csv,
+        write_labs_parquet,
+    )
+    from data_generator.generators.notes import iter_notes_for_day, write_notes_jsonl
+    from data_generator.generators.parquet_io import OUTPUT_FORMATS
 except ImportError:
     from generators.patients import (
+        PATIENT_MASTER_FILENAME,
+        PatientMaster,
         ensure_patients_master,
         add_new_patients,
+        append_new_patients,
         export_active_patients_snapshot,
     )
     from generators.encounters import (
@@ -32,16 +58,78 @@ except ImportError:
         generate_encounters_for_day,
     )
     from generators.vitals import (
+        VITALS_LAYOUTS,
         generate_vitals_for_day,
+        generate_vitals_columns_for_day,
+        generate_vitals_wide_columns_for_day,
+        vitals_rows_to_wide,
         write_vitals_csv,
+        write_vitals_columns_csv,
+        write_vitals_parquet,
+        write_vitals_columns_parquet,
+        write_vitals_wide_csv,
+        write_vitals_wide_parquet,
+    )
+    from generators.labs import (
+        generate_labs_columns_for_day,
+        write_labs_csv,
+        write_labs_parquet,
     )
+    from generators.notes import iter_notes_for_day, write_notes_jsonl
+    from generators.parquet_io import OUTPUT_FORMATS
+
+
+class DayJob(TypedDict):
+    day: str
+    out_dir: Path
+    seed: int
+    master: PatientMaster
+    start_encounter_id: int
+    encounters_per_day: int
+    scenario_weights: Dict[str, float]
+    vitals_cfg: Dict[str, Any]
+    labs_cfg: Dict[str, Any]
+    notes_cfg: Dict[str, Any]
+    file_format: str
+    counter_path: Optional[Path]
+
+
+class DaySummary(TypedDict):
+    day: str
+    out_dir: Path
+    encounters_written: int
+    last_encounter_id: int
+    vitals_engine: str
+    vitals_layout: str
+    vitals_written: int
+    vitals_path: Path
+    labs_written: int
+    labs_path: Optional[Path]
+    notes_written: int
+    notes_path: Optional[Path]
+    active_patients_written: int
 
 
 def parse_args() -> argparse.Namespace:
-    p = argparse.ArgumentParser(description="Generate one day of synthetic clinical data (Phase 1).")
-    p.add_argument("--date", required=True, help="YYYY-MM-DD")
+    p = argparse.ArgumentParser(description="Generate synthetic clinical data for one day or a date range.")
+    days = p.add_mutually_exclusive_group(required=True)
+    days.add_argument("--date", help="YYYY-MM-DD")
+    days.add_argument("--start", help="Range start date YYYY-MM-DD (inclusive, requires --end)")
+    p.add_argument("--end", help="Range end date YYYY-MM-DD (inclusive)")
     p.add_argument("--mode", required=True, choices=["raw", "sample"], help="Output mode: raw or sample")
-    return p.parse_args()
+    p.add_argument("--format", default="csv", choices=OUTPUT_FORMATS, help="Output file format (default: csv)")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Range mode: worker processes generating days concurrently (default: CPU count)",
+    )
+    args = p.parse_args()
+    if args.start and not args.end:
+        p.error("--start requires --end")
+    if args.end and not args.start:
+        p.error("--end requires --start")
+    return args
 
 
 def load_config(config_path: Path) -> dict:
@@ -55,14 +143,270 @@ def resolve_output_dir(mode: str, day: str) -> Path:
     return base / day
 
 
+def derive_day_seed(seed: int, day: str) -> int:
+    """
+    Deterministic per-day seed from (seed, date), so each day gets an independent RNG stream
+    that does not depend on which other days are generated or in what order.
+    """
+    return zlib.crc32(f"{seed}:{day}".encode("utf-8")) & 0x7FFFFFFF
+
+
+def generate_day_outputs(job: DayJob) -> DaySummary:
+    """
+    Generate encounters, vitals, labs, notes and the active-patient snapshot for one day into job["out_dir"].
+    Patient master growth and encounter ID allocation are resolved by the caller.
+    """
+    day = job["day"]
+    out_dir = job["out_dir"]
+    seed = job["seed"]
+    file_format = job["file_format"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Generate encounters (globally unique IDs) and write encounters.csv
+    encounters_rows, new_last_id = generate_encounters_for_day(
+        day=day,
+        encounters_per_day=job["encounters_per_day"],
+        patient_ids=job["master"].patient_ids,
+        start_encounter_id=job["start_encounter_id"],
+        scenario_weights=job["scenario_weights"],
+        out_dir=out_dir,
+        counter_path=job["counter_path"],
+        seed=seed,
+        file_format=file_format,
+    )
+
+    # Generate encounter-linked vitals and write vitals.csv (or vitals.parquet; vitals_wide.* for the wide layout)
+    vitals_cfg = job["vitals_cfg"]
+    vitals_engine = str(vitals_cfg.get("engine", "python"))
+    vitals_layout = str(vitals_cfg.get("layout", "long"))
+    if vitals_layout not in VITALS_LAYOUTS:
+        raise ValueError(f"Unknown vitals layout: {vitals_layout} (expected one of {', '.join(VITALS_LAYOUTS)})")
+    if vitals_layout == "wide":
+        if vitals_engine == "numpy":
+            vitals_wide = generate_vitals_wide_columns_for_day(
+                day=day,
+                encounters_rows=encounters_rows,
+                vitals_cfg=vitals_cfg,
+                seed=seed,
+            )
+        else:
+            vitals_wide = vitals_rows_to_wide(
+                generate_vitals_for_day(
+                    day=day,
+                    encounters_rows=encounters_rows,
+                    vitals_cfg=vitals_cfg,
+                    seed=seed,
+                )
+            )
+        vitals_count = len(vitals_wide["source"])
+        if file_format == "parquet":
+            vitals_path = write_vitals_wide_parquet(vitals_wide, out_dir=out_dir)
+        else:
+            vitals_path = write_vitals_wide_csv(vitals_wide, out_dir=out_dir)
+    elif vitals_engine == "numpy":
+        vitals_columns = generate_vitals_columns_for_day(
+            day=day,
+            encounters_rows=encounters_rows,
+            vitals_cfg=vitals_cfg,
+            seed=seed,
+        )
+        vitals_count = len(vitals_columns["value"])
+        if file_format == "parquet":
+            vitals_path = write_vitals_columns_parquet(vitals_columns, out_dir=out_dir)
+        else:
+            vitals_path = write_vitals_columns_csv(vitals_columns, out_dir=out_dir)
+    else:
+        vitals_rows = generate_vitals_for_day(
+            day=day,
+            encounters_rows=encounters_rows,
+            vitals_cfg=vitals_cfg,
+            seed=seed,
+        )
+        vitals_count = len(vitals_rows)
+        if file_format == "parquet":
+            vitals_path = write_vitals_parquet(vitals_rows, out_dir=out_dir)
+        else:
+            vitals_path = write_vitals_csv(vitals_rows, out_dir=out_dir)
+
+    # Generate panel-based labs (vectorized) and write labs.csv (or labs.parquet)
+    labs_cfg = job["labs_cfg"]
+    labs_count = 0
+    labs_path: Optional[Path] = None
+    if labs_cfg.get("enabled", True):
+        labs_columns = generate_labs_columns_for_day(
+            day=day,
+            encounters_rows=encounters_rows,
+            labs_cfg=labs_cfg,
+            seed=seed,
+        )
+        labs_count = len(labs_columns["value"])
+        if file_format == "parquet":
+            labs_path = write_labs_parquet(labs_columns, out_dir=out_dir)
+        else:
+            labs_path = write_labs_csv(labs_columns, out_dir=out_dir)
+
+    # Stream notes to notes.jsonl (optionally gzip/zstd compressed); always JSONL regardless of file_format
+    notes_cfg = job["notes_cfg"]
+    notes_count = 0
+    notes_path: Optional[Path] = None
+    if notes_cfg.get("enabled", True):
+        notes_path, notes_count = write_notes_jsonl(
+            iter_notes_for_day(
+                day=day,
+                encounters_rows=encounters_rows,
+                notes_cfg=notes_cfg,
+                seed=seed,
+            ),
+            out_dir=out_dir,
+            compression=str(notes_cfg.get("compression", "none")),
+        )
+
+    # Export ACTIVE patients snapshot for the day (patients.csv or patients.parquet)
+    active_patient_ids = {row["patient_id"] for row in encounters_rows}
+    active_count = export_active_patients_snapshot(
+        master=job["master"],
+        active_patient_ids=active_patient_ids,
+        out_dir=out_dir,
+        file_format=file_format,
+    )
+
+    return {
+        "day": day,
+        "out_dir": out_dir,
+        "encounters_written": len(encounters_rows),
+        "last_encounter_id": new_last_id,
+        "vitals_engine": vitals_engine,
+        "vitals_layout": vitals_layout,
+        "vitals_written": vitals_count,
+        "vitals_path": vitals_path,
+        "labs_written": labs_count,
+        "labs_path": labs_path,
+        "notes_written": notes_count,
+        "notes_path": notes_path,
+        "active_patients_written": active_count,
+    }
+
+
+def run_range(args: argparse.Namespace, config: dict) -> None:
+    """
+    Generate every day in [--start, --end] concurrently.
+
+    Per-day seeds are derived from (seed, date). Patient growth and encounter ID ranges are
+    planned serially up front (day i gets IDs last_id + i * count_per_day + 1 ...), so each day
+    is independent and the output does not depend on worker scheduling. The encounter counter is
+    updated once, after all days have been written; new patients are appended to the master file
+    up front (workers memory-map it) and truncated away again if any day fails.
+    """
+    first = date.fromisoformat(args.start)
+    last = date.fromisoformat(args.end)
+    if last < first:
+        raise ValueError(f"End date {args.end} is before start date {args.start}")
+    days = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+    seed = int(config.get("seed", 42))
+
+    state_dir = Path("data_generator") / "state"
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    master_path = state_dir / PATIENT_MASTER_FILENAME
+    patients_cfg = config.get("patients", {})
+    master = ensure_patients_master(
+        master_path=master_path,
+        initial_count=int(patients_cfg.get("initial_count", 100)),
+        seed=seed,
+    )
+    new_per_day = int(patients_cfg.get("new_patients_per_day", 0))
+    max_total = int(patients_cfg.get("max_total", 5000))
+
+    counter_path = state_dir / "encounter_id_counter.txt"
+    last_encounter_id = ensure_encounter_counter(counter_path)
+
+    encounters_cfg = config.get("encounters", {})
+    encounters_per_day = int(encounters_cfg.get("count_per_day", 160))
+    scenario_weights = encounters_cfg.get("scenarios", {
+        "routine": 0.55,
+        "chest_pain": 0.20,
+        "sepsis": 0.15,
+        "copd_hypoxia": 0.10
+    })
+    vitals_cfg = config.get("vitals", {})
+    labs_cfg = config.get("labs", {})
+    notes_cfg = config.get("notes", {})
+
+    # Plan growth and ID ranges serially; the master is append-only, so its prefix is exactly
+    # the master as of that day.
+    initial_total = len(master)
+    added_total = 0
+    day_seeds: List[int] = []
+    master_sizes: List[int] = []
+    for day in days:
+        day_seeds.append(derive_day_seed(seed, day))
+        added_total += append_new_patients(master, new_per_day, max_total, day_seeds[-1])
+        master_sizes.append(len(master))
+
+    print("=== Range Generation Start ===")
+    print(f"range: {args.start}..{args.end} ({len(days)} days)")
+    print(f"mode: {args.mode}")
+    print(f"format: {args.format}")
+    print(f"seed: {seed} (per-day seeds derived from seed + date)")
+    print(f"workers: {args.workers}")
+
+    try:
+        # Flush before taking the per-day prefixes, so each pickles as (path, size) and workers
+        # memory-map the state file instead of receiving a copy of the registry
+        master.flush()
+        jobs: List[DayJob] = []
+        for i, day in enumerate(days):
+            jobs.append(
+                {
+                    "day": day,
+                    "out_dir": resolve_output_dir(args.mode, day),
+                    "seed": day_seeds[i],
+                    "master": master.prefix(master_sizes[i]),
+                    "start_encounter_id": last_encounter_id + i * encounters_per_day,
+                    "encounters_per_day": encounters_per_day,
+                    "scenario_weights": scenario_weights,
+                    "vitals_cfg": vitals_cfg,
+                    "labs_cfg": labs_cfg,
+                    "notes_cfg": notes_cfg,
+                    "file_format": args.format,
+                    "counter_path": None,
+                }
+            )
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            for n, summary in enumerate(pool.map(generate_day_outputs, jobs), start=1):
+                print(
+                    f"[{n}/{len(jobs)}] {summary['day']} -> {summary['out_dir']} "
+                    f"encounters={summary['encounters_written']} "
+                    f"vitals={summary['vitals_written']} "
+                    f"labs={summary['labs_written']} "
+                    f"notes={summary['notes_written']} "
+                    f"active_patients={summary['active_patients_written']}"
+                )
+    except BaseException:
+        master.truncate(initial_total)
+        raise
+
+    # Advance the encounter counter only after every day was written
+    new_last_id = last_encounter_id + len(days) * encounters_per_day
+    counter_path.write_text(str(new_last_id), encoding="utf-8")
+
+    print("=== Range Generation Complete ===")
+    print(f"patients_master_total: {len(master)} (added in range: {added_total})")
+    print(f"encounter_id_counter updated to: {new_last_id}")
+
+
 def main() -> None:
     args = parse_args()
+    config = load_config(Path("data_generator") / "config.yaml")
+
+    if args.start:
+        run_range(args, config)
+        return
 
     # Validate date format early
     _ = date.fromisoformat(args.date)
 
-    config = load_config(Path("data_generator") / "config.yaml")
-
     # Reproducibility
     seed = int(config.get("seed", 42))
     random.seed(seed)
@@ -77,9 +421,9 @@ def main() -> None:
 
     # ---- Phase 1 Pipeline ----
     # 1) Ensure patient master exists (or initialize)
-    master_path = state_dir / "patients_master.csv"
+    master_path = state_dir / PATIENT_MASTER_FILENAME
     patients_cfg = config.get("patients", {})
-    master_rows = ensure_patients_master(
+    master = ensure_patients_master(
         master_path=master_path,
         initial_count=int(patients_cfg.get("initial_count", 100)),
         seed=seed,
@@ -88,9 +432,8 @@ def main() -> None:
     # 2) Add new patients for the day (growth)
     new_per_day = int(patients_cfg.get("new_patients_per_day", 0))
     max_total = int(patients_cfg.get("max_total", 5000))
-    master_rows, added_count = add_new_patients(
-        master_path=master_path,
-        master_rows=master_rows,
+    added_count = add_new_patients(
+        master=master,
         new_patients_per_day=new_per_day,
         max_total=max_total,
         seed=seed,
@@ -100,7 +443,7 @@ def main() -> None:
     counter_path = state_dir / "encounter_id_counter.txt"
     last_encounter_id = ensure_encounter_counter(counter_path)
 
-    # 4) Generate encounters (globally unique IDs) and write encounters.csv
+    # 4) Generate encounters (globally unique IDs), vitals, labs, notes and the active patients snapshot
     encounters_cfg = config.get("encounters", {})
     encounters_per_day = int(encounters_cfg.get("count_per_day", 160))
     scenario_weights = encounters_cfg.get("scenarios", {
@@ -110,49 +453,43 @@ def main() -> None:
         "copd_hypoxia": 0.10
     })
 
-    patient_ids_all = [r["patient_id"] for r in master_rows]
-    encounters_rows, new_last_id = generate_encounters_for_day(
-        day=args.date,
-        encounters_per_day=encounters_per_day,
-        patient_ids=patient_ids_all,
-        start_encounter_id=last_encounter_id,
-        scenario_weights=scenario_weights,
-        out_dir=out_dir,
-        counter_path=counter_path,
-        seed=seed,
-    )
-
-    # 5) Generate encounter-linked vitals and write vitals.csv
-    vitals_cfg = config.get("vitals", {})
-    vitals_rows = generate_vitals_for_day(
-        day=args.date,
-        encounters_rows=encounters_rows,
-        vitals_cfg=vitals_cfg,
-        seed=seed,
-    )
-    vitals_path = write_vitals_csv(vitals_rows, out_dir=out_dir)
-
-    # 6) Export ACTIVE patients snapshot for the day (patients.csv)
-    active_patient_ids = sorted({row["patient_id"] for row in encounters_rows})
-    active_count = export_active_patients_snapshot(
-        master_rows=master_rows,
-        active_patient_ids=set(active_patient_ids),
-        out_dir=out_dir,
+    summary = generate_day_outputs(
+        {
+            "day": args.date,
+            "out_dir": out_dir,
+            "seed": seed,
+            "master": master,
+            "start_encounter_id": last_encounter_id,
+            "encounters_per_day": encounters_per_day,
+            "scenario_weights": scenario_weights,
+            "vitals_cfg": config.get("vitals", {}),
+            "labs_cfg": config.get("labs", {}),
+            "notes_cfg": config.get("notes", {}),
+            "file_format": args.format,
+            "counter_path": counter_path,
+        }
     )
 
     # ---- Summary ----
     print("=== Phase 1 Generation Complete ===")
     print(f"date: {args.date}")
     print(f"mode: {args.mode}")
+    print(f"format: {args.format}")
     print(f"output_dir: {out_dir}")
     print(f"seed: {seed}")
     print(f"patients_master_path: {master_path}")
-    print(f"patients_master_total: {len(master_rows)} (added today: {added_count})")
-    print(f"encounters_written: {len(encounters_rows)}")
-    print(f"vitals_written: {len(vitals_rows)}")
-    print(f"vitals_path: {vitals_path}")
-    print(f"active_patients_written: {active_count}")
-    print(f"encounter_id_counter updated to: {new_last_id}")
+    print(f"patients_master_total: {len(master)} (added today: {added_count})")
+    print(f"encounters_written: {summary['encounters_written']}")
+    print(f"vitals_engine: {summary['vitals_engine']}")
+    print(f"vitals_layout: {summary['vitals_layout']}")
+    print(f"vitals_written: {summary['vitals_written']}")
+    print(f"vitals_path: {summary['vitals_path']}")
+    print(f"labs_written: {summary['labs_written']}")
+    print(f"labs_path: {summary['labs_path']}")
+    print(f"notes_written: {summary['notes_written']}")
+    print(f"notes_path: {summary['notes_path']}")
+    print(f"active_patients_written: {summary['active_patients_written']}")
+    print(f"encounter_id_counter updated to: {summary['last_encounter_id']}")
 
 
 if __name__ == "__main__":
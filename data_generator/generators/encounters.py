@@ -4,7 +4,9 @@ import csv
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TypedDict, List, Tuple, Dict
+from typing import TypedDict, List, Optional, Sequence, Tuple, Dict
+
+from .parquet_io import rows_to_columns, write_parquet
 
 
 class EncounterRow(TypedDict):
@@ -16,6 +18,9 @@ class EncounterRow(TypedDict):
     acuity: str
 
 
+ENCOUNTER_FIELDS = ["encounter_id", "patient_id", "admit_time", "discharge_time", "scenario", "acuity"]
+
+
 SCENARIO_DEFAULTS = {
     "routine": {"acuity_choices": ["low", "medium"], "los_hours": (6, 36)},
     "chest_pain": {"acuity_choices": ["medium", "high"], "los_hours": (12, 72)},
@@ -56,17 +61,19 @@ def _choose_scenario(rng: random.Random, scenario_weights: Dict[str, float]) ->
 def generate_encounters_for_day(
     day: str,
     encounters_per_day: int,
-    patient_ids: List[int],
+    patient_ids: Sequence[int],
     start_encounter_id: int,
     scenario_weights: Dict[str, float],
     out_dir: Path,
-    counter_path: Path,
+    counter_path: Optional[Path],
     seed: int,
+    file_format: str = "csv",
 ) -> Tuple[List[EncounterRow], int]:
     """
-    Generate encounters for a given day and write encounters.csv into out_dir.
+    Generate encounters for a given day and write encounters.csv (or encounters.parquet) into out_dir.
     Encounter IDs are globally unique using start_encounter_id as last-used.
-    Updates counter_path to the new last-used ID.
+    Updates counter_path to the new last-used ID (skipped when counter_path is None, e.g. when
+    the caller pre-allocates ID ranges for several days).
     Returns (encounters_rows, new_last_encounter_id).
     """
     rng = random.Random(seed + 3003)
@@ -103,18 +110,24 @@ def generate_encounters_for_day(
             }
         )
 
-    # Write encounters.csv
+    # Write encounters file
+    if file_format == "parquet":
+        write_parquet("encounters", rows_to_columns(rows, ENCOUNTER_FIELDS), out_dir)
+    else:
+        write_encounters_csv(rows, out_dir)
+
+    # Update counter
+    if counter_path is not None:
+        counter_path.write_text(str(last_id), encoding="utf-8")
+    return rows, last_id
+
+
+def write_encounters_csv(rows: List[EncounterRow], out_dir: Path) -> Path:
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "encounters.csv"
     with out_path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=["encounter_id", "patient_id", "admit_time", "discharge_time", "scenario", "acuity"],
-        )
+        w = csv.DictWriter(f, fieldnames=ENCOUNTER_FIELDS)
         w.writeheader()
         for row in rows:
             w.writerow(row)
-
-    # Update counter
-    counter_path.write_text(str(last_id), encoding="utf-8")
-    return rows, last_id
+    return out_path
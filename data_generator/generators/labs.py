@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, TypedDict
+
+import numpy as np
+
+from .parquet_io import write_parquet
+
+
+class LabColumns(TypedDict):
+    """
+    Columnar labs batch: one NumPy array per labs.schema.json field, all of equal length.
+    """
+    lab_event_id: np.ndarray  # int64
+    encounter_id: np.ndarray  # int64
+    patient_id: np.ndarray  # int64
+    event_time: np.ndarray  # datetime64[s]
+    test_name: np.ndarray  # str
+    value: np.ndarray  # float64
+    unit: np.ndarray  # str
+
+
+LAB_FIELDS = ["lab_event_id", "encounter_id", "patient_id", "event_time", "test_name", "value", "unit"]
+
+# lab_event_id = encounter_id * LAB_EVENT_ID_STRIDE + sequence within the encounter, so IDs are
+# globally unique without a counter file and days can be generated independently.
+LAB_EVENT_ID_STRIDE = 1000
+
+DEFAULT_PANELS: Dict[str, List[str]] = {
+    "CBC": ["WBC", "HGB", "PLT"],
+    "BMP": ["Na", "K", "Cr", "BUN", "Glucose"],
+    "Lactate": ["Lactate"],
+    "Troponin": ["Troponin"],
+}
+
+# Per scenario, the panels ordered and their schedule: first draw at admit, then every
+# `every_hours` while the encounter is open, at most `max_draws` times (0 = no limit).
+DEFAULT_SCENARIO_ORDERS: Dict[str, Dict[str, Dict[str, int]]] = {
+    "routine": {
+        "CBC": {"every_hours": 24, "max_draws": 0},
+        "BMP": {"every_hours": 24, "max_draws": 0},
+    },
+    "chest_pain": {
+        "CBC": {"every_hours": 24, "max_draws": 0},
+        "BMP": {"every_hours": 24, "max_draws": 0},
+        "Troponin": {"every_hours": 3, "max_draws": 3},
+    },
+    "sepsis": {
+        "CBC": {"every_hours": 12, "max_draws": 0},
+        "BMP": {"every_hours": 12, "max_draws": 0},
+        "Lactate": {"every_hours": 6, "max_draws": 0},
+    },
+    "copd_hypoxia": {
+        "CBC": {"every_hours": 24, "max_draws": 0},
+        "BMP": {"every_hours": 24, "max_draws": 0},
+    },
+}
+
+# Baseline (routine) ranges; scenario_ranges override individual tests per scenario.
+DEFAULT_REFERENCE_RANGES: Dict[str, Dict[str, float]] = {
+    "WBC": {"min": 4.5, "max": 11.0},
+    "HGB": {"min": 12.0, "max": 16.5},
+    "PLT": {"min": 150, "max": 400},
+    "Na": {"min": 136, "max": 145},
+    "K": {"min": 3.5, "max": 5.0},
+    "Cr": {"min": 0.6, "max": 1.2},
+    "BUN": {"min": 7, "max": 20},
+    "Glucose": {"min": 70, "max": 140},
+    "Lactate": {"min": 0.5, "max": 2.0},
+    "Troponin": {"min": 0.0, "max": 0.04},
+}
+
+DEFAULT_SCENARIO_RANGES: Dict[str, Dict[str, Dict[str, float]]] = {
+    "routine": {},
+    "chest_pain": {
+        "Troponin": {"min": 0.02, "max": 2.5},
+        "Glucose": {"min": 90, "max": 180},
+    },
+    "sepsis": {
+        "WBC": {"min": 12.0, "max": 25.0},
+        "PLT": {"min": 80, "max": 200},
+        "Cr": {"min": 1.1, "max": 3.0},
+        "BUN": {"min": 18, "max": 45},
+        "Glucose": {"min": 110, "max": 250},
+        "Lactate": {"min": 2.0, "max": 6.5},
+    },
+    "copd_hypoxia": {
+        "WBC": {"min": 6.0, "max": 14.0},
+        "HGB": {"min": 13.0, "max": 18.0},
+    },
+}
+
+UNIT_BY_TEST_NAME = {
+    "WBC": "10^3/uL",
+    "HGB": "g/dL",
+    "PLT": "10^3/uL",
+    "Na": "mmol/L",
+    "K": "mmol/L",
+    "Cr": "mg/dL",
+    "BUN": "mg/dL",
+    "Glucose": "mg/dL",
+    "Lactate": "mmol/L",
+    "Troponin": "ng/mL",
+}
+
+DECIMALS_BY_TEST_NAME = {
+    "WBC": 1,
+    "HGB": 1,
+    "PLT": 0,
+    "Na": 0,
+    "K": 1,
+    "Cr": 2,
+    "BUN": 0,
+    "Glucose": 0,
+    "Lactate": 1,
+    "Troponin": 3,
+}
+
+
+def resolve_labs_cfg(
+    labs_cfg: Dict[str, Any],
+) -> Tuple[
+    Dict[str, List[str]],
+    Dict[str, Dict[str, Dict[str, int]]],
+    Dict[str, Dict[str, float]],
+    Dict[str, Dict[str, Dict[str, float]]],
+    Tuple[int, int],
+]:
+    panels = labs_cfg.get("panels") or DEFAULT_PANELS
+    scenario_orders = labs_cfg.get("scenario_orders") or DEFAULT_SCENARIO_ORDERS
+    reference_ranges = labs_cfg.get("reference_ranges") or DEFAULT_REFERENCE_RANGES
+    scenario_ranges = labs_cfg.get("scenario_ranges", DEFAULT_SCENARIO_RANGES)
+    turnaround = labs_cfg.get("turnaround_minutes", {"min": 30, "max": 90})
+    return (
+        {str(p): [str(t) for t in tests] for p, tests in panels.items()},
+        scenario_orders,
+        reference_ranges,
+        scenario_ranges,
+        (int(turnaround["min"]), int(turnaround["max"])),
+    )
+
+
+def _range_bounds(
+    test_name: str,
+    scenario: str,
+    reference_ranges: Dict[str, Dict[str, float]],
+    scenario_ranges: Dict[str, Dict[str, Dict[str, float]]],
+) -> Tuple[float, float]:
+    test_range = (scenario_ranges.get(scenario) or {}).get(test_name)
+    if test_range is None:
+        test_range = reference_ranges.get(test_name, DEFAULT_REFERENCE_RANGES[test_name])
+    return float(test_range["min"]), float(test_range["max"])
+
+
+def _empty_labs() -> LabColumns:
+    return {
+        "lab_event_id": np.zeros(0, dtype=np.int64),
+        "encounter_id": np.zeros(0, dtype=np.int64),
+        "patient_id": np.zeros(0, dtype=np.int64),
+        "event_time": np.zeros(0, dtype="datetime64[s]"),
+        "test_name": np.zeros(0, dtype=str),
+        "value": np.zeros(0, dtype=np.float64),
+        "unit": np.zeros(0, dtype=str),
+    }
+
+
+def generate_labs_columns_for_day(
+    day: str,
+    encounters_rows: List[Dict[str, Any]],
+    labs_cfg: Dict[str, Any],
+    seed: int,
+) -> LabColumns:
+    """
+    Build panel-based lab results for one day's encounters as a columnar (NumPy) batch.
+
+    Each scenario orders a set of panels on a schedule (first draw at admit, then every
+    `every_hours`, capped by `max_draws`); every draw yields one result per test in the panel,
+    recorded after a random turnaround and never after discharge. Draw times, turnarounds and
+    values for the whole day are computed as arrays, one vectorized pass per panel.
+    Rows are ordered by (encounter_id, event_time, panel test order). Deterministic for a given
+    seed (stream seed + 5005).
+    """
+    _ = day  # reserved for future date-specific behaviors
+
+    rng = np.random.default_rng(seed + 5005)
+    panels, scenario_orders, reference_ranges, scenario_ranges, (turnaround_min, turnaround_max) = resolve_labs_cfg(
+        labs_cfg
+    )
+
+    if not encounters_rows:
+        return _empty_labs()
+
+    encounter_ids = np.array([int(e["encounter_id"]) for e in encounters_rows], dtype=np.int64)
+    patient_ids = np.array([int(e["patient_id"]) for e in encounters_rows], dtype=np.int64)
+    scenarios = np.array([str(e.get("scenario", "routine")) for e in encounters_rows])
+    admit = np.array([np.datetime64(str(e["admit_time"]), "s") for e in encounters_rows], dtype="datetime64[s]")
+    discharge = np.array(
+        [np.datetime64(str(e["discharge_time"]), "s") for e in encounters_rows], dtype="datetime64[s]"
+    )
+    window_seconds = (discharge - admit).astype(np.int64)
+
+    # One block of draws per panel: (encounter position, draw offset seconds, panel code)
+    draw_encounter: List[np.ndarray] = []
+    draw_offset: List[np.ndarray] = []
+    draw_panel: List[np.ndarray] = []
+    panel_names = list(panels)
+    for panel_code, panel in enumerate(panel_names):
+        every_seconds = np.zeros(len(encounters_rows), dtype=np.int64)
+        max_draws = np.zeros(len(encounters_rows), dtype=np.int64)
+        for scenario in np.unique(scenarios):
+            order = (scenario_orders.get(str(scenario)) or scenario_orders.get("routine", {})).get(panel)
+            if order is None:
+                continue
+            is_scenario = scenarios == scenario
+            every_seconds[is_scenario] = max(1, int(order.get("every_hours", 24))) * 3600
+            max_draws[is_scenario] = int(order.get("max_draws", 0))
+
+        ordered = (every_seconds > 0) & (window_seconds >= 0)
+        n_draws = np.where(ordered, window_seconds // np.maximum(every_seconds, 1) + 1, 0)
+        n_draws = np.where(max_draws > 0, np.minimum(n_draws, max_draws), n_draws)
+        total_draws = int(n_draws.sum())
+
+        encounter_idx = np.repeat(np.arange(len(encounters_rows)), n_draws)
+        draw_starts = np.cumsum(n_draws) - n_draws
+        draw_idx = np.arange(total_draws, dtype=np.int64) - np.repeat(draw_starts, n_draws)
+        draw_encounter.append(encounter_idx)
+        draw_offset.append(draw_idx * every_seconds[encounter_idx])
+        draw_panel.append(np.full(total_draws, panel_code, dtype=np.int64))
+
+    encounter_idx = np.concatenate(draw_encounter)
+    offset = np.concatenate(draw_offset)
+    panel_idx = np.concatenate(draw_panel)
+    if len(panel_idx) == 0:
+        return _empty_labs()
+
+    # Result time = draw time + turnaround, capped at discharge
+    turnaround = rng.integers(turnaround_min * 60, turnaround_max * 60 + 1, size=len(offset))
+    offset = np.minimum(offset + turnaround, window_seconds[encounter_idx])
+
+    order = np.lexsort((panel_idx, offset, encounter_idx))
+    encounter_idx, offset, panel_idx = encounter_idx[order], offset[order], panel_idx[order]
+
+    # Expand draws into one row per test of the panel
+    test_names = sorted({t for tests in panels.values() for t in tests})
+    panel_tests = [np.array([test_names.index(t) for t in panels[p]], dtype=np.int64) for p in panel_names]
+    tests_per_draw = np.array([len(t) for t in panel_tests], dtype=np.int64)[panel_idx]
+    row_draw = np.repeat(np.arange(len(panel_idx)), tests_per_draw)
+    row_start = np.cumsum(tests_per_draw) - tests_per_draw
+    row_in_draw = np.arange(len(row_draw), dtype=np.int64) - np.repeat(row_start, tests_per_draw)
+    panel_test_table = np.zeros((len(panel_names), max(len(t) for t in panel_tests)), dtype=np.int64)
+    for code, tests in enumerate(panel_tests):
+        panel_test_table[code, : len(tests)] = tests
+    test_code = panel_test_table[panel_idx[row_draw], row_in_draw]
+    row_encounter = encounter_idx[row_draw]
+
+    # Values: per-(scenario, test) bounds, uniform draws, per-test rounding
+    scenario_names = sorted(set(scenarios.tolist()))
+    scenario_code = np.searchsorted(np.array(scenario_names), scenarios)
+    bounds = np.array(
+        [[_range_bounds(t, s, reference_ranges, scenario_ranges) for t in test_names] for s in scenario_names],
+        dtype=np.float64,
+    ).reshape(len(scenario_names), len(test_names), 2)
+    row_scenario = scenario_code[row_encounter]
+    low = bounds[row_scenario, test_code, 0]
+    high = bounds[row_scenario, test_code, 1]
+    scale = np.power(10.0, np.array([DECIMALS_BY_TEST_NAME.get(t, 2) for t in test_names]))[test_code]
+    values = np.round((low + rng.random(len(row_draw)) * (high - low)) * scale) / scale
+
+    # Sequence within encounter (rows are grouped by encounter) -> globally unique lab_event_id
+    row_encounter_ids = encounter_ids[row_encounter]
+    first_row = np.r_[True, row_encounter_ids[1:] != row_encounter_ids[:-1]]
+    group_start = np.maximum.accumulate(np.where(first_row, np.arange(len(row_draw)), 0))
+    sequence = np.arange(len(row_draw), dtype=np.int64) - group_start + 1
+    if int(sequence.max()) >= LAB_EVENT_ID_STRIDE:
+        raise ValueError(f"More than {LAB_EVENT_ID_STRIDE - 1} lab results for one encounter; relax the panel schedule.")
+
+    test_array = np.array(test_names)
+    unit_array = np.array([UNIT_BY_TEST_NAME.get(t, "") for t in test_names])
+    return {
+        "lab_event_id": row_encounter_ids * LAB_EVENT_ID_STRIDE + sequence,
+        "encounter_id": row_encounter_ids,
+        "patient_id": patient_ids[row_encounter],
+        "event_time": admit[row_encounter] + offset[row_draw].astype("timedelta64[s]"),
+        "test_name": test_array[test_code],
+        "value": values,
+        "unit": unit_array[test_code],
+    }
+
+
+def write_labs_csv(columns: LabColumns, out_dir: Path) -> Path:
+    """
+    Write a columnar labs batch to out_dir/labs.csv (columns per labs.schema.json).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "labs.csv"
+    event_time = np.datetime_as_string(columns["event_time"], unit="s")
+    with out_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LAB_FIELDS)
+        writer.writerows(
+            zip(
+                columns["lab_event_id"].tolist(),
+                columns["encounter_id"].tolist(),
+                columns["patient_id"].tolist(),
+                event_time.tolist(),
+                columns["test_name"].tolist(),
+                columns["value"].tolist(),
+                columns["unit"].tolist(),
+            )
+        )
+    return out_path
+
+
+def write_labs_parquet(columns: LabColumns, out_dir: Path) -> Path:
+    """
+    Write a columnar labs batch to out_dir/labs.parquet without per-row conversion.
+    """
+    return write_parquet("labs", columns, out_dir)
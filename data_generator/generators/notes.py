@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import io
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, TypedDict
+
+import pyarrow as pa
+
+
+class NoteRow(TypedDict):
+    note_id: int
+    encounter_id: int
+    patient_id: int
+    note_time: str  # ISO format
+    note_type: str
+    text: str
+
+
+NOTE_FIELDS = ["note_id", "encounter_id", "patient_id", "note_time", "note_type", "text"]
+
+# note_id = encounter_id * NOTE_ID_STRIDE + sequence within the encounter (same scheme as lab_event_id)
+NOTE_ID_STRIDE = 1000
+
+# Compression -> file suffix; the codec is picked from the suffix by pyarrow (gzip, zstd)
+NOTES_COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+DEFAULT_PROGRESS_EVERY_HOURS = {"low": 24, "medium": 12, "high": 8}
+
+DEFAULT_LAB_REVIEW_EVERY_HOURS = 24
+
+SCENARIO_PHRASES: Dict[str, Dict[str, List[str]]] = {
+    "routine": {
+        "complaint": [
+            "admitted for observation after a minor fall without injury",
+            "dehydration following several days of gastroenteritis",
+            "elective admission for medication adjustment",
+            "generalized weakness with poor oral intake",
+        ],
+        "findings": [
+            "vital signs within normal limits",
+            "mild dehydration on exam, mucous membranes dry",
+            "ambulating independently, no focal deficits",
+        ],
+        "plan": [
+            "oral rehydration and encourage intake",
+            "physical therapy evaluation before discharge",
+            "continue home medications and monitor",
+        ],
+        "labs": [
+            "CBC and BMP within reference ranges",
+            "sodium {na} mmol/L, creatinine {cr} mg/dL, no acute abnormality",
+        ],
+    },
+    "chest_pain": {
+        "complaint": [
+            "substernal chest pain radiating to the left arm",
+            "chest pressure on exertion relieved by rest",
+            "intermittent chest tightness with diaphoresis",
+        ],
+        "findings": [
+            "ECG with nonspecific ST-T wave changes",
+            "hypertensive on arrival, pain improved after nitroglycerin",
+            "serial troponin trend under review",
+        ],
+        "plan": [
+            "serial troponins, aspirin and cardiology consult",
+            "telemetry monitoring and stress test if troponins negative",
+            "continue heparin drip pending catheterization",
+        ],
+        "labs": [
+            "troponin {troponin} ng/mL on serial draw",
+            "troponin {troponin} ng/mL, glucose {glucose} mg/dL",
+        ],
+    },
+    "sepsis": {
+        "complaint": [
+            "fever and rigors with suspected urinary source",
+            "altered mental status with fever and hypotension",
+            "productive cough, fever and tachycardia concerning for pneumonia",
+        ],
+        "findings": [
+            "lactate elevated, hypotension responsive to fluid bolus",
+            "meets SIRS criteria, blood cultures drawn",
+            "tachycardic and febrile, mottled extremities",
+        ],
+        "plan": [
+            "broad-spectrum antibiotics, blood cultures and repeat lactate",
+            "30 mL/kg crystalloid bolus and vasopressors if MAP below 65",
+            "source control evaluation and ICU consult",
+        ],
+        "labs": [
+            "lactate {lactate} mmol/L, WBC {wbc} x10^3/uL",
+            "repeat lactate {lactate} mmol/L, creatinine {cr} mg/dL",
+        ],
+    },
+    "copd_hypoxia": {
+        "complaint": [
+            "worsening dyspnea and wheeze over three days",
+            "COPD exacerbation with increased sputum production",
+            "shortness of breath at rest on home oxygen",
+        ],
+        "findings": [
+            "hypoxic on room air with SpO2 in the high 80s",
+            "diffuse expiratory wheeze, accessory muscle use",
+            "improved air movement after nebulizers",
+        ],
+        "plan": [
+            "nebulized bronchodilators, systemic steroids and titrate O2 to 88-92%",
+            "BiPAP overnight if work of breathing increases",
+            "continue steroids and wean oxygen as tolerated",
+        ],
+        "labs": [
+            "WBC {wbc} x10^3/uL, hemoglobin {hgb} g/dL",
+            "CBC and BMP without acute change",
+        ],
+    },
+}
+
+ACUITY_PHRASES = {
+    "low": "Patient stable and comfortable.",
+    "medium": "Patient condition guarded, monitoring closely.",
+    "high": "Patient critically ill, requires close monitoring.",
+}
+
+
+def resolve_notes_cfg(notes_cfg: Dict[str, Any]) -> Tuple[Dict[str, int], int, str]:
+    progress_every_hours = {**DEFAULT_PROGRESS_EVERY_HOURS, **(notes_cfg.get("progress_every_hours") or {})}
+    lab_review_every_hours = int(notes_cfg.get("lab_review_every_hours", DEFAULT_LAB_REVIEW_EVERY_HOURS))
+    compression = str(notes_cfg.get("compression", "none"))
+    if compression not in NOTES_COMPRESSIONS:
+        raise ValueError(f"Unknown notes compression: {compression} (expected one of {', '.join(NOTES_COMPRESSIONS)})")
+    return {k: max(1, int(v)) for k, v in progress_every_hours.items()}, max(1, lab_review_every_hours), compression
+
+
+def _fill(rng: random.Random, template: str) -> str:
+    return template.format(
+        na=rng.randint(134, 146),
+        cr=round(rng.uniform(0.6, 2.8), 2),
+        troponin=round(rng.uniform(0.01, 2.5), 3),
+        glucose=rng.randint(80, 220),
+        lactate=round(rng.uniform(1.0, 6.5), 1),
+        wbc=round(rng.uniform(4.5, 24.0), 1),
+        hgb=round(rng.uniform(11.0, 17.5), 1),
+    )
+
+
+def _note_text(rng: random.Random, note_type: str, scenario: str, acuity: str, hours_in: float) -> str:
+    phrases = SCENARIO_PHRASES.get(scenario, SCENARIO_PHRASES["routine"])
+    complaint = rng.choice(phrases["complaint"])
+    findings = rng.choice(phrases["findings"])
+    plan = rng.choice(phrases["plan"])
+    condition = ACUITY_PHRASES.get(acuity, ACUITY_PHRASES["medium"])
+
+    if note_type == "triage":
+        return f"Triage note. Presenting with {complaint}. Acuity {acuity}. {condition}"
+    if note_type == "assessment_plan":
+        return f"Assessment: {complaint}; {findings}. Plan: {plan}."
+    if note_type == "progress":
+        return f"Progress note, hospital hour {int(hours_in)}. {condition} {findings.capitalize()}. Plan: {plan}."
+    if note_type == "lab_review":
+        return f"Lab review: {_fill(rng, rng.choice(phrases['labs']))}. {findings.capitalize()}."
+    return (
+        f"Discharge summary after {int(hours_in)} hours. Admitted with {complaint}. "
+        f"Treated with {plan}. Discharged in stable condition with follow-up arranged."
+    )
+
+
+def iter_notes_for_day(
+    day: str,
+    encounters_rows: List[Dict[str, Any]],
+    notes_cfg: Dict[str, Any],
+    seed: int,
+) -> Iterator[NoteRow]:
+    """
+    Lazily yield the day's notes, one encounter at a time, in (encounter_id, note_time) order.
+
+    Each encounter gets a triage note at admit, an assessment/plan shortly after, progress notes on an
+    acuity-driven cadence (progress_every_hours), lab reviews every lab_review_every_hours and a
+    discharge summary just before discharge; text is assembled from scenario-specific phrases.
+    Only one encounter's notes are held at a time, so callers can stream rows straight to disk.
+    """
+    _ = day  # reserved for future date-specific behaviors
+
+    rng = random.Random(seed + 6006)
+    progress_every_hours, lab_review_every_hours, _ = resolve_notes_cfg(notes_cfg)
+
+    for encounter in encounters_rows:
+        encounter_id = int(encounter["encounter_id"])
+        patient_id = int(encounter["patient_id"])
+        scenario = str(encounter.get("scenario", "routine"))
+        acuity = str(encounter.get("acuity", "medium"))
+        admit = datetime.fromisoformat(str(encounter["admit_time"]))
+        discharge = datetime.fromisoformat(str(encounter["discharge_time"]))
+        if discharge < admit:
+            continue
+
+        def within(offset_minutes: float) -> datetime:
+            return min(admit + timedelta(minutes=offset_minutes), discharge)
+
+        los_minutes = (discharge - admit).total_seconds() / 60.0
+        schedule: List[Tuple[datetime, str]] = [
+            (within(rng.randint(0, 15)), "triage"),
+            (within(rng.randint(30, 120)), "assessment_plan"),
+        ]
+        progress_minutes = progress_every_hours.get(acuity, DEFAULT_PROGRESS_EVERY_HOURS["medium"]) * 60
+        offset = progress_minutes
+        while offset < los_minutes:
+            schedule.append((within(offset + rng.randint(0, 30)), "progress"))
+            offset += progress_minutes
+        offset = lab_review_every_hours * 60
+        while offset < los_minutes:
+            schedule.append((within(offset + rng.randint(60, 120)), "lab_review"))
+            offset += lab_review_every_hours * 60
+        schedule.append((discharge - timedelta(minutes=min(rng.randint(0, 30), los_minutes)), "discharge"))
+        schedule.sort(key=lambda item: item[0])
+
+        if len(schedule) >= NOTE_ID_STRIDE:
+            raise ValueError(f"More than {NOTE_ID_STRIDE - 1} notes for encounter {encounter_id}; relax the note cadence.")
+
+        for sequence, (note_time, note_type) in enumerate(schedule, start=1):
+            hours_in = (note_time - admit).total_seconds() / 3600.0
+            yield {
+                "note_id": encounter_id * NOTE_ID_STRIDE + sequence,
+                "encounter_id": encounter_id,
+                "patient_id": patient_id,
+                "note_time": note_time.isoformat(timespec="seconds"),
+                "note_type": note_type,
+                "text": _note_text(rng, note_type, scenario, acuity, hours_in),
+            }
+
+
+def notes_filename(compression: str = "none") -> str:
+    return f"notes.jsonl{NOTES_COMPRESSIONS[compression]}"
+
+
+def write_notes_jsonl(rows: Iterable[NoteRow], out_dir: Path, compression: str = "none") -> Tuple[Path, int]:
+    """
+    Stream rows to out_dir/notes.jsonl (notes.jsonl.gz / notes.jsonl.zst when compressed), one JSON
+    object per line, without materializing the day. Other-compression variants left by earlier runs
+    are removed so the day has a single notes file. Returns (path, rows written).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / notes_filename(compression)
+    for other in NOTES_COMPRESSIONS:
+        stale = out_dir / notes_filename(other)
+        if stale != out_path and stale.exists():
+            stale.unlink()
+
+    count = 0
+    with pa.output_stream(str(out_path), compression="detect") as raw, io.TextIOWrapper(
+        raw, encoding="utf-8", newline="\n"
+    ) as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return out_path, count
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+OUTPUT_FORMATS = ["csv", "parquet"]
+
+# Fixed-vocabulary string columns: int8 codes + dictionary in Arrow/Parquet (read back as plain strings)
+CATEGORY = pa.dictionary(pa.int8(), pa.string())
+
+PARQUET_SCHEMAS: Dict[str, pa.Schema] = {
+    "patients": pa.schema(
+        [
+            ("patient_id", pa.int64()),
+            ("age", pa.int64()),
+            ("sex", CATEGORY),
+        ]
+    ),
+    "encounters": pa.schema(
+        [
+            ("encounter_id", pa.int64()),
+            ("patient_id", pa.int64()),
+            ("admit_time", pa.timestamp("s")),
+            ("discharge_time", pa.timestamp("s")),
+            ("scenario", CATEGORY),
+            ("acuity", CATEGORY),
+        ]
+    ),
+    "vitals": pa.schema(
+        [
+            ("encounter_id", pa.int64()),
+            ("patient_id", pa.int64()),
+            ("event_time", pa.timestamp("s")),
+            ("vital_type", CATEGORY),
+            ("value", pa.float64()),
+            ("unit", CATEGORY),
+            ("source", CATEGORY),
+        ]
+    ),
+    "vitals_wide": pa.schema(
+        [
+            ("encounter_id", pa.int64()),
+            ("patient_id", pa.int64()),
+            ("event_time", pa.timestamp("s")),
+            ("source", CATEGORY),
+            ("heart_rate", pa.float64()),
+            ("resp_rate", pa.float64()),
+            ("temperature_c", pa.float64()),
+            ("spo2", pa.float64()),
+            ("systolic_bp", pa.float64()),
+            ("diastolic_bp", pa.float64()),
+        ]
+    ),
+    "labs": pa.schema(
+        [
+            ("lab_event_id", pa.int64()),
+            ("encounter_id", pa.int64()),
+            ("patient_id", pa.int64()),
+            ("event_time", pa.timestamp("s")),
+            ("test_name", pa.string()),
+            ("value", pa.float64()),
+            ("unit", pa.string()),
+        ]
+    ),
+}
+
+
+def rows_to_columns(rows: Sequence[Mapping[str, Any]], fields: List[str]) -> Dict[str, List[Any]]:
+    return {name: [row[name] for row in rows] for name in fields}
+
+
+def dictionary_array(codes: np.ndarray, vocabulary: List[str]) -> pa.DictionaryArray:
+    """
+    CATEGORY array from integer codes into vocabulary, without materializing the strings.
+    """
+    return pa.DictionaryArray.from_arrays(
+        pa.array(np.asarray(codes, dtype=np.int8)), pa.array(vocabulary, type=pa.string())
+    )
+
+
+def write_parquet(dataset: str, columns: Mapping[str, Any], out_dir: Path) -> Path:
+    """
+    Write columns (lists, NumPy arrays or Arrow arrays) to out_dir/<dataset>.parquet using the typed
+    schema from PARQUET_SCHEMAS. ISO-8601 timestamp strings are converted to timestamps and
+    string values of CATEGORY fields are dictionary-encoded.
+    """
+    schema = PARQUET_SCHEMAS[dataset]
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        if isinstance(values, pa.Array):
+            arrays.append(values)
+            continue
+        if pa.types.is_timestamp(field.type):
+            values = np.asarray(values, dtype="datetime64[s]")
+        arrays.append(pa.array(values, type=field.type))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{dataset}.parquet"
+    pq.write_table(pa.Table.from_arrays(arrays, schema=schema), out_path)
+    return out_path
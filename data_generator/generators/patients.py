@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import csv
+import os
 import random
 from pathlib import Path
-from typing import Dict, TypedDict, List, Set, Tuple
+from typing import Any, Iterable, List, Optional, Tuple, TypedDict
+
+import numpy as np
+
+from .parquet_io import rows_to_columns, write_parquet
 
 
 class PatientRow(TypedDict):
@@ -12,6 +17,17 @@ class PatientRow(TypedDict):
     sex: str
 
 
+PATIENT_FIELDS = ["patient_id", "age", "sex"]
+
+# Fixed-size records of the patient master state file (little-endian, 11 bytes per patient)
+PATIENT_MASTER_DTYPE = np.dtype([("patient_id", "<i8"), ("age", "<i2"), ("sex", "S1")])
+
+PATIENT_MASTER_FILENAME = "patients_master.bin"
+LEGACY_PATIENT_MASTER_FILENAME = "patients_master.csv"
+
+_MIN_CAPACITY = 1024
+
+
 def _random_sex(rng: random.Random) -> str:
     return rng.choice(["M", "F", "U"])
 
@@ -21,30 +37,189 @@ def _random_age(rng: random.Random) -> int:
     return rng.randint(0, 120)
 
 
-def ensure_patients_master(master_path: Path, initial_count: int, seed: int) -> List[PatientRow]:
+def _open_master(path: Path, size: int) -> "PatientMaster":
+    return PatientMaster.load(path, size=size, mmap=True)
+
+
+class PatientMaster:
+    """
+    Append-only patient registry backed by a NumPy structured array (PATIENT_MASTER_DTYPE).
+
+    New patients always get max(patient_id) + 1, so rows stay sorted by patient_id and
+    id -> row is a binary search (np.searchsorted) rather than a scan. The buffer grows by
+    doubling, and the state file is a flat sequence of fixed-size records: flush() appends only
+    the rows added since the last flush. Growth, lookups and snapshots cost O(new rows) /
+    O(active rows * log n) instead of O(master).
+
+    A master whose rows are all flushed pickles as (path, size) and is memory-mapped again on
+    unpickling, so per-day jobs sent to worker processes do not copy the registry.
+    """
+
+    def __init__(self, path: Path, rows: Optional[np.ndarray] = None, flushed: int = 0) -> None:
+        self.path = path
+        self._rows = rows if rows is not None else np.empty(0, dtype=PATIENT_MASTER_DTYPE)
+        self._size = len(self._rows)
+        self._flushed = min(flushed, self._size)
+
+    @classmethod
+    def load(cls, path: Path, size: Optional[int] = None, mmap: bool = False) -> "PatientMaster":
+        """
+        Read the state file (optionally only its first size rows; mmap=True maps it read-only).
+        A torn trailing record (interrupted flush) is cut off the file unless mapping read-only,
+        so later flushes stay aligned to whole records.
+        """
+        file_size = path.stat().st_size if path.exists() else 0
+        available = file_size // PATIENT_MASTER_DTYPE.itemsize
+        if not mmap and file_size > available * PATIENT_MASTER_DTYPE.itemsize:
+            os.truncate(path, available * PATIENT_MASTER_DTYPE.itemsize)
+        count = available if size is None else min(size, available)
+        if count == 0:
+            rows = np.empty(0, dtype=PATIENT_MASTER_DTYPE)
+        elif mmap:
+            rows = np.memmap(path, dtype=PATIENT_MASTER_DTYPE, mode="r", shape=(count,))
+        else:
+            rows = np.fromfile(path, dtype=PATIENT_MASTER_DTYPE, count=count)
+        return cls(path, rows, flushed=count)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        if self._flushed == self._size:
+            return (_open_master, (self.path, self._size))
+        return (PatientMaster, (self.path, np.array(self._rows[: self._size]), self._flushed))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def patient_ids(self) -> np.ndarray:
+        return self._rows["patient_id"][: self._size]
+
+    @property
+    def next_patient_id(self) -> int:
+        return int(self._rows["patient_id"][self._size - 1]) + 1 if self._size else 1
+
+    def prefix(self, size: int) -> "PatientMaster":
+        """
+        The master as it was when it held its first size rows (shares the buffer). Take prefixes
+        after flush(): a prefix within the flushed rows pickles as (path, size).
+        """
+        size = min(size, self._size)
+        return PatientMaster(self.path, self._rows[:size], flushed=min(self._flushed, size))
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._rows) and not isinstance(self._rows, np.memmap):
+            return
+        capacity = max(_MIN_CAPACITY, len(self._rows))
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=PATIENT_MASTER_DTYPE)
+        grown[: self._size] = self._rows[: self._size]
+        self._rows = grown
+
+    def append(self, ages: List[int], sexes: List[str]) -> int:
+        """
+        Append patients with consecutive new ids. Returns the number of rows appended.
+        """
+        count = len(ages)
+        if count == 0:
+            return 0
+        first_id = self.next_patient_id
+        self._reserve(count)
+        new_rows = self._rows[self._size : self._size + count]
+        new_rows["patient_id"] = np.arange(first_id, first_id + count, dtype=np.int64)
+        new_rows["age"] = ages
+        new_rows["sex"] = [sex.encode("ascii") for sex in sexes]
+        self._size += count
+        return count
+
+    def rows_for(self, patient_ids: Iterable[int]) -> List[PatientRow]:
+        """
+        Rows for the given ids (deduplicated, ordered by patient_id). Unknown ids raise KeyError.
+        """
+        wanted = np.unique(np.fromiter((int(pid) for pid in patient_ids), dtype=np.int64))
+        ids = self.patient_ids
+        positions = np.searchsorted(ids, wanted)
+        found = positions < len(ids)
+        found[found] = ids[positions[found]] == wanted[found]
+        if not found.all():
+            missing = ", ".join(str(pid) for pid in wanted[~found][:5])
+            raise KeyError(f"patient_id not in patient master: {missing}")
+        rows = self._rows[positions]
+        return [
+            {"patient_id": int(pid), "age": int(age), "sex": sex.decode("ascii")}
+            for pid, age, sex in zip(rows["patient_id"], rows["age"], rows["sex"])
+        ]
+
+    def flush(self) -> int:
+        """
+        Append rows added since the last flush to the state file. Returns rows written.
+        Rows are written at the record offset of the first unflushed row, never after stray bytes.
+        """
+        pending = self._rows[self._flushed : self._size]
+        if len(pending):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("r+b" if self.path.exists() else "wb") as f:
+                f.seek(self._flushed * PATIENT_MASTER_DTYPE.itemsize)
+                pending.tofile(f)
+                f.truncate()
+        self._flushed = self._size
+        return len(pending)
+
+    def truncate(self, size: int) -> None:
+        """
+        Drop rows beyond size, in memory and in the state file (undo of appends/flushes).
+        """
+        size = min(size, self._size)
+        if self.path.exists() and self.path.stat().st_size > size * PATIENT_MASTER_DTYPE.itemsize:
+            os.truncate(self.path, size * PATIENT_MASTER_DTYPE.itemsize)
+        self._size = size
+        self._flushed = min(self._flushed, size)
+
+
+def _load_legacy_csv(csv_path: Path, master_path: Path) -> PatientMaster:
     """
-    Ensure patients_master.csv exists. If not, create with initial_count patients.
-    Returns the full master list (in memory) as dict rows with keys: patient_id, age, sex.
+    Convert a patients_master.csv written by earlier versions into the binary state file.
+    """
+    rows = load_patients_csv(csv_path)
+    rows.sort(key=lambda row: row["patient_id"])
+    array = np.empty(len(rows), dtype=PATIENT_MASTER_DTYPE)
+    array["patient_id"] = [row["patient_id"] for row in rows]
+    array["age"] = [row["age"] for row in rows]
+    array["sex"] = [row["sex"].encode("ascii") for row in rows]
+    master = PatientMaster(master_path, array)
+    master.flush()
+    return master
+
+
+def ensure_patients_master(master_path: Path, initial_count: int, seed: int) -> PatientMaster:
+    """
+    Ensure the patient master state file exists. If not, convert a legacy patients_master.csv next
+    to it, or create it with initial_count patients. Returns the loaded master.
     """
     rng = random.Random(seed + 1001)
 
     if master_path.exists() and master_path.stat().st_size > 0:
-        return load_patients_master(master_path)
+        return PatientMaster.load(master_path)
 
-    # Initialize fresh master
-    rows: List[PatientRow] = []
-    for pid in range(1, initial_count + 1):
-        rows.append(
-            {"patient_id": pid, "age": _random_age(rng), "sex": _random_sex(rng)}
-        )
+    legacy_path = master_path.with_name(LEGACY_PATIENT_MASTER_FILENAME)
+    if legacy_path.exists() and legacy_path.stat().st_size > 0:
+        return _load_legacy_csv(legacy_path, master_path)
 
-    write_patients_csv(master_path, rows)
-    return rows
+    # Initialize fresh master
+    ages: List[int] = []
+    sexes: List[str] = []
+    for _ in range(initial_count):
+        ages.append(_random_age(rng))
+        sexes.append(_random_sex(rng))
+    master = PatientMaster(master_path)
+    master.append(ages, sexes)
+    master.flush()
+    return master
 
 
-def load_patients_master(master_path: Path) -> List[PatientRow]:
+def load_patients_csv(path: Path) -> List[PatientRow]:
     rows: List[PatientRow] = []
-    with master_path.open("r", newline="", encoding="utf-8") as f:
+    with path.open("r", newline="", encoding="utf-8") as f:
         r = csv.DictReader(f)
         for row in r:
             rows.append(
@@ -60,56 +235,69 @@ def load_patients_master(master_path: Path) -> List[PatientRow]:
 def write_patients_csv(path: Path, rows: List[PatientRow]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["patient_id", "age", "sex"])
+        w = csv.DictWriter(f, fieldnames=PATIENT_FIELDS)
         w.writeheader()
         for row in rows:
             w.writerow(row)
 
 
-def add_new_patients(
-    master_path: Path,
-    master_rows: List[PatientRow],
+def append_new_patients(
+    master: PatientMaster,
     new_patients_per_day: int,
     max_total: int,
     seed: int,
-) -> Tuple[List[PatientRow], int]:
+) -> int:
     """
-    Append new patients to the master list up to max_total.
-    Returns (updated_master_rows, added_count).
+    Append new patients to the master in memory (no file write), up to max_total.
+    Returns added_count.
     """
     if new_patients_per_day <= 0:
-        return master_rows, 0
+        return 0
 
     rng = random.Random(seed + 2002)
 
-    current_total = len(master_rows)
+    current_total = len(master)
     if current_total >= max_total:
-        return master_rows, 0
+        return 0
 
     can_add = min(new_patients_per_day, max_total - current_total)
-    next_id = max(int(r["patient_id"]) for r in master_rows) + 1 if master_rows else 1
+    ages: List[int] = []
+    sexes: List[str] = []
+    for _ in range(can_add):
+        ages.append(_random_age(rng))
+        sexes.append(_random_sex(rng))
+    return master.append(ages, sexes)
 
-    for i in range(can_add):
-        pid = next_id + i
-        master_rows.append(
-            {"patient_id": pid, "age": _random_age(rng), "sex": _random_sex(rng)}
-        )
 
-    write_patients_csv(master_path, master_rows)
-    return master_rows, can_add
+def add_new_patients(
+    master: PatientMaster,
+    new_patients_per_day: int,
+    max_total: int,
+    seed: int,
+) -> int:
+    """
+    Append new patients to the master up to max_total and append them to the state file.
+    Returns added_count.
+    """
+    added_count = append_new_patients(master, new_patients_per_day, max_total, seed)
+    master.flush()
+    return added_count
 
 
 def export_active_patients_snapshot(
-    master_rows: List[PatientRow],
-    active_patient_ids: Set[int],
+    master: PatientMaster,
+    active_patient_ids: Iterable[int],
     out_dir: Path,
+    file_format: str = "csv",
 ) -> int:
     """
-    Write daily patients.csv containing only active patients for that day.
-    Output: out_dir/patients.csv
+    Write daily patients.csv (or patients.parquet) containing only active patients for that day.
+    Output: out_dir/patients.<file_format>
     Returns number of rows written.
     """
-    active_rows = [r for r in master_rows if int(r["patient_id"]) in active_patient_ids]
-    out_path = out_dir / "patients.csv"
-    write_patients_csv(out_path, active_rows)
+    active_rows = master.rows_for(active_patient_ids)
+    if file_format == "parquet":
+        write_parquet("patients", rows_to_columns(active_rows, PATIENT_FIELDS), out_dir)
+    else:
+        write_patients_csv(out_dir / "patients.csv", active_rows)
     return len(active_rows)
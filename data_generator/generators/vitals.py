@@ -4,7 +4,12 @@ import csv
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, TypedDict
+from typing import Any, Dict, List, Tuple, TypedDict
+
+import numpy as np
+import pyarrow as pa
+
+from .parquet_io import dictionary_array, rows_to_columns, write_parquet
 
 
 class VitalRow(TypedDict):
@@ -17,6 +22,39 @@ class VitalRow(TypedDict):
     source: str
 
 
+class VitalColumns(TypedDict):
+    """
+    Columnar vitals batch: one NumPy array per VitalRow field, all of equal length.
+    vital_type and source are int8 codes into VITAL_TYPES / VITAL_SOURCES; unit is not carried
+    (it is UNIT_BY_VITAL_TYPE[vital_type]) and is derived by the writers.
+    """
+    encounter_id: np.ndarray  # int64
+    patient_id: np.ndarray  # int64
+    event_time: np.ndarray  # datetime64[s]
+    vital_type: np.ndarray  # int8 code into VITAL_TYPES
+    value: np.ndarray  # float64
+    source: np.ndarray  # int8 code into VITAL_SOURCES
+
+
+class VitalWideColumns(TypedDict):
+    """
+    Wide vitals batch: one row per (encounter_id, event_time) timestep, one value column per
+    VITAL_TYPES entry (NaN where the vital type was not recorded, e.g. not enabled).
+    """
+    encounter_id: np.ndarray  # int64
+    patient_id: np.ndarray  # int64
+    event_time: np.ndarray  # datetime64[s]
+    source: np.ndarray  # int8 code into VITAL_SOURCES
+    values: np.ndarray  # float64, shape (rows, len(VITAL_TYPES))
+
+
+VITAL_FIELDS = ["encounter_id", "patient_id", "event_time", "vital_type", "value", "unit", "source"]
+
+VITALS_ENGINES = ["python", "numpy"]
+
+# long: one row per reading (vitals.csv / vitals.parquet); wide: one row per timestep (vitals_wide.*)
+VITALS_LAYOUTS = ["long", "wide"]
+
 DEFAULT_ENABLED_VITAL_TYPES = [
     "heart_rate",
     "resp_rate",
@@ -70,33 +108,52 @@ UNIT_BY_VITAL_TYPE = {
     "diastolic_bp": "mmHg",
 }
 
+# Vocabularies of the integer-coded VitalColumns fields (code = position)
+VITAL_TYPES = list(UNIT_BY_VITAL_TYPE)
+VITAL_SOURCES = ["monitor", "manual"]
+VITAL_UNITS = list(dict.fromkeys(UNIT_BY_VITAL_TYPE.values()))
 
-def _pick_source(rng: random.Random, source_weights: Dict[str, float]) -> str:
+# vital_type code -> unit code
+_UNIT_CODES = np.array([VITAL_UNITS.index(UNIT_BY_VITAL_TYPE[v]) for v in VITAL_TYPES], dtype=np.int8)
+
+VITAL_WIDE_FIELDS = ["encounter_id", "patient_id", "event_time", "source", *VITAL_TYPES]
+
+
+def _source_weights(source_weights: Dict[str, float]) -> Tuple[float, float]:
     monitor_weight = float(source_weights.get("monitor", 0.85))
     manual_weight = float(source_weights.get("manual", 0.15))
-    total = monitor_weight + manual_weight
+    return monitor_weight, monitor_weight + manual_weight
+
+
+def _pick_source(rng: random.Random, source_weights: Dict[str, float]) -> str:
+    monitor_weight, total = _source_weights(source_weights)
     if total <= 0:
         return "monitor"
     r = rng.random() * total
     return "monitor" if r <= monitor_weight else "manual"
 
 
-def _sample_value(
-    rng: random.Random,
+def _range_bounds(
     vital_type: str,
     scenario: str,
     scenario_ranges: Dict[str, Dict[str, Dict[str, float]]],
-) -> float:
+) -> Tuple[float, float]:
     scenario_map = scenario_ranges.get(scenario, scenario_ranges.get("routine", {}))
     vital_range = scenario_map.get(vital_type)
 
     if vital_range is None:
         fallback = DEFAULT_SCENARIO_RANGES["routine"][vital_type]
-        min_v = float(fallback["min"])
-        max_v = float(fallback["max"])
-    else:
-        min_v = float(vital_range["min"])
-        max_v = float(vital_range["max"])
+        return float(fallback["min"]), float(fallback["max"])
+    return float(vital_range["min"]), float(vital_range["max"])
+
+
+def _sample_value(
+    rng: random.Random,
+    vital_type: str,
+    scenario: str,
+    scenario_ranges: Dict[str, Dict[str, Dict[str, float]]],
+) -> float:
+    min_v, max_v = _range_bounds(vital_type, scenario, scenario_ranges)
 
     sampled = rng.uniform(min_v, max_v)
     if vital_type == "temperature_c":
@@ -104,19 +161,36 @@ def _sample_value(
     return round(sampled, 0)
 
 
-def generate_vitals_for_day(
-    day: str,
-    encounters_rows: List[Dict[str, Any]],
-    vitals_cfg: Dict[str, Any],
-    seed: int,
+def sample_vitals_timestep(
+    rng: random.Random,
+    encounter_id: int,
+    patient_id: int,
+    event_time: datetime,
+    scenario: str,
+    enabled_vital_types: List[str],
+    scenario_ranges: Dict[str, Dict[str, Dict[str, float]]],
+    source_weights: Dict[str, float],
 ) -> List[VitalRow]:
     """
-    Build encounter-linked vitals rows for one day.
-    Output row schema matches vitals.schema.json event model.
+    Rows for one timestep of one encounter: one source pick, then one value per enabled vital type.
     """
-    _ = day  # reserved for future date-specific behaviors
+    source = _pick_source(rng, source_weights)
+    event_time_iso = event_time.isoformat(timespec="seconds")
+    return [
+        {
+            "encounter_id": encounter_id,
+            "patient_id": patient_id,
+            "event_time": event_time_iso,
+            "vital_type": vital_type,
+            "value": float(_sample_value(rng, vital_type, scenario, scenario_ranges)),
+            "unit": UNIT_BY_VITAL_TYPE[vital_type],
+            "source": source,
+        }
+        for vital_type in enabled_vital_types
+    ]
 
-    rng = random.Random(seed + 4004)
+
+def resolve_vitals_cfg(vitals_cfg: Dict[str, Any]) -> Tuple[int, List[str], Dict[str, Any], Dict[str, float]]:
     frequency_minutes = int(vitals_cfg.get("frequency_minutes", 60))
     if frequency_minutes <= 0:
         frequency_minutes = 60
@@ -127,6 +201,23 @@ def generate_vitals_for_day(
 
     scenario_ranges = vitals_cfg.get("scenario_ranges", DEFAULT_SCENARIO_RANGES)
     source_weights = vitals_cfg.get("source_weights", {"monitor": 0.85, "manual": 0.15})
+    return frequency_minutes, [str(v) for v in enabled_vital_types], scenario_ranges, source_weights
+
+
+def generate_vitals_for_day(
+    day: str,
+    encounters_rows: List[Dict[str, Any]],
+    vitals_cfg: Dict[str, Any],
+    seed: int,
+) -> List[VitalRow]:
+    """
+    Build encounter-linked vitals rows for one day.
+    Output row schema matches vitals.schema.json event model.
+    """
+    _ = day  # reserved for future date-specific behaviors
+
+    rng = random.Random(seed + 4004)
+    frequency_minutes, enabled_vital_types, scenario_ranges, source_weights = resolve_vitals_cfg(vitals_cfg)
 
     rows: List[VitalRow] = []
     step = timedelta(minutes=frequency_minutes)
@@ -143,34 +234,266 @@ def generate_vitals_for_day(
 
         event_time = admit
         while event_time <= discharge:
-            source = _pick_source(rng, source_weights)
-            for vital_type in enabled_vital_types:
-                value = _sample_value(rng, str(vital_type), scenario, scenario_ranges)
-                rows.append(
-                    {
-                        "encounter_id": encounter_id,
-                        "patient_id": patient_id,
-                        "event_time": event_time.isoformat(timespec="seconds"),
-                        "vital_type": str(vital_type),
-                        "value": float(value),
-                        "unit": UNIT_BY_VITAL_TYPE[str(vital_type)],
-                        "source": source,
-                    }
+            rows.extend(
+                sample_vitals_timestep(
+                    rng,
+                    encounter_id=encounter_id,
+                    patient_id=patient_id,
+                    event_time=event_time,
+                    scenario=scenario,
+                    enabled_vital_types=enabled_vital_types,
+                    scenario_ranges=scenario_ranges,
+                    source_weights=source_weights,
                 )
+            )
             event_time = event_time + step
 
     return rows
 
 
+def _sample_vitals_timesteps(
+    encounters_rows: List[Dict[str, Any]],
+    vitals_cfg: Dict[str, Any],
+    seed: int,
+) -> Tuple[VitalWideColumns, List[str]]:
+    """
+    Draw every timestep of the day as arrays (shared by both layouts of the numpy engine).
+    Returns the timesteps with values in enabled vital type order (not yet spread over
+    VITAL_TYPES) and the enabled vital types.
+    """
+    rng = np.random.default_rng(seed + 4004)
+    frequency_minutes, enabled_vital_types, scenario_ranges, source_weights = resolve_vitals_cfg(vitals_cfg)
+    step_seconds = frequency_minutes * 60
+
+    encounter_ids = np.array([int(e["encounter_id"]) for e in encounters_rows], dtype=np.int64)
+    patient_ids = np.array([int(e["patient_id"]) for e in encounters_rows], dtype=np.int64)
+    scenarios = [str(e.get("scenario", "routine")) for e in encounters_rows]
+    admit = np.array([np.datetime64(str(e["admit_time"]), "s") for e in encounters_rows], dtype="datetime64[s]")
+    discharge = np.array(
+        [np.datetime64(str(e["discharge_time"]), "s") for e in encounters_rows], dtype="datetime64[s]"
+    )
+
+    # Timesteps per encounter, including the event exactly at admit_time
+    window_seconds = (discharge - admit).astype(np.int64)
+    n_steps = np.where(window_seconds >= 0, window_seconds // step_seconds + 1, 0)
+    total_steps = int(n_steps.sum())
+
+    encounter_idx = np.repeat(np.arange(len(encounters_rows)), n_steps)
+    step_starts = np.cumsum(n_steps) - n_steps
+    step_idx = np.arange(total_steps, dtype=np.int64) - np.repeat(step_starts, n_steps)
+    event_time = admit[encounter_idx] + (step_idx * step_seconds).astype("timedelta64[s]")
+
+    # One source pick per timestep, shared by all vitals of that timestep
+    monitor_weight, total_weight = _source_weights(source_weights)
+    if total_weight <= 0:
+        is_monitor = np.ones(total_steps, dtype=bool)
+    else:
+        is_monitor = rng.random(total_steps) * total_weight <= monitor_weight
+    source = np.where(is_monitor, VITAL_SOURCES.index("monitor"), VITAL_SOURCES.index("manual")).astype(np.int8)
+
+    # Per-scenario bound tables, indexed by scenario code then vital position
+    scenario_names = sorted(set(scenarios))
+    scenario_code = np.array([scenario_names.index(s) for s in scenarios], dtype=np.int64)
+    bounds = np.array(
+        [[_range_bounds(v, s, scenario_ranges) for v in enabled_vital_types] for s in scenario_names],
+        dtype=np.float64,
+    ).reshape(len(scenario_names), len(enabled_vital_types), 2)
+    step_scenario = scenario_code[encounter_idx]
+    low = bounds[step_scenario, :, 0]
+    high = bounds[step_scenario, :, 1]
+
+    values = low + rng.random((total_steps, len(enabled_vital_types))) * (high - low)
+    scale = np.array([10.0 if v == "temperature_c" else 1.0 for v in enabled_vital_types])
+    values = np.round(values * scale) / scale
+
+    steps: VitalWideColumns = {
+        "encounter_id": encounter_ids[encounter_idx],
+        "patient_id": patient_ids[encounter_idx],
+        "event_time": event_time,
+        "source": source,
+        "values": values,
+    }
+    return steps, enabled_vital_types
+
+
+def generate_vitals_columns_for_day(
+    day: str,
+    encounters_rows: List[Dict[str, Any]],
+    vitals_cfg: Dict[str, Any],
+    seed: int,
+) -> VitalColumns:
+    """
+    Vectorized (NumPy) variant of generate_vitals_for_day.
+    Timestamps, source picks and value draws for the whole day are computed as arrays
+    and returned as a columnar batch in the same row order (encounter, event_time, vital_type).
+    The same seed and encounters always reproduce the same batch; the random stream is
+    independent of the row-based engine, so values differ between the two engines.
+    """
+    _ = day  # reserved for future date-specific behaviors
+
+    steps, enabled_vital_types = _sample_vitals_timesteps(encounters_rows, vitals_cfg, seed)
+    n_vitals = len(enabled_vital_types)
+    vital_codes = np.array([VITAL_TYPES.index(v) for v in enabled_vital_types], dtype=np.int8)
+
+    return {
+        "encounter_id": np.repeat(steps["encounter_id"], n_vitals),
+        "patient_id": np.repeat(steps["patient_id"], n_vitals),
+        "event_time": np.repeat(steps["event_time"], n_vitals),
+        "vital_type": np.tile(vital_codes, len(steps["source"])),
+        "value": steps["values"].ravel(),
+        "source": np.repeat(steps["source"], n_vitals),
+    }
+
+
+def generate_vitals_wide_columns_for_day(
+    day: str,
+    encounters_rows: List[Dict[str, Any]],
+    vitals_cfg: Dict[str, Any],
+    seed: int,
+) -> VitalWideColumns:
+    """
+    Wide layout of generate_vitals_columns_for_day: the same draws (same seed, same values),
+    one row per timestep instead of one row per reading.
+    """
+    _ = day  # reserved for future date-specific behaviors
+
+    steps, enabled_vital_types = _sample_vitals_timesteps(encounters_rows, vitals_cfg, seed)
+    values = np.full((len(steps["source"]), len(VITAL_TYPES)), np.nan)
+    values[:, [VITAL_TYPES.index(v) for v in enabled_vital_types]] = steps["values"]
+    return {**steps, "values": values}
+
+
+def vitals_rows_to_wide(rows: List[VitalRow]) -> VitalWideColumns:
+    """
+    Pivot row-engine vitals to the wide layout. The rows of a timestep are consecutive
+    (generate_vitals_for_day order) and hold at most one reading per vital type.
+    """
+    step_of_row = np.zeros(len(rows), dtype=np.int64)
+    starts: List[int] = []
+    previous_key = None
+    for i, row in enumerate(rows):
+        key = (row["encounter_id"], row["event_time"])
+        if key != previous_key:
+            starts.append(i)
+            previous_key = key
+        step_of_row[i] = len(starts) - 1
+
+    values = np.full((len(starts), len(VITAL_TYPES)), np.nan)
+    vital_codes = [VITAL_TYPES.index(row["vital_type"]) for row in rows]
+    values[step_of_row, vital_codes] = [float(row["value"]) for row in rows]
+    return {
+        "encounter_id": np.array([rows[i]["encounter_id"] for i in starts], dtype=np.int64),
+        "patient_id": np.array([rows[i]["patient_id"] for i in starts], dtype=np.int64),
+        "event_time": np.array([rows[i]["event_time"] for i in starts], dtype="datetime64[s]"),
+        "source": np.array([VITAL_SOURCES.index(rows[i]["source"]) for i in starts], dtype=np.int8),
+        "values": values,
+    }
+
+
 def write_vitals_csv(rows: List[VitalRow], out_dir: Path) -> Path:
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / "vitals.csv"
     with out_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["encounter_id", "patient_id", "event_time", "vital_type", "value", "unit", "source"],
-        )
+        writer = csv.DictWriter(f, fieldnames=VITAL_FIELDS)
         writer.writeheader()
         for row in rows:
             writer.writerow(row)
     return out_path
+
+
+def write_vitals_columns_csv(columns: VitalColumns, out_dir: Path) -> Path:
+    """
+    Write a columnar vitals batch to out_dir/vitals.csv (same contract as write_vitals_csv).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "vitals.csv"
+    event_time = np.datetime_as_string(columns["event_time"], unit="s")
+    vital_type = np.array(VITAL_TYPES)[columns["vital_type"]]
+    unit = np.array(VITAL_UNITS)[_UNIT_CODES[columns["vital_type"]]]
+    source = np.array(VITAL_SOURCES)[columns["source"]]
+    with out_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(VITAL_FIELDS)
+        writer.writerows(
+            zip(
+                columns["encounter_id"].tolist(),
+                columns["patient_id"].tolist(),
+                event_time.tolist(),
+                vital_type.tolist(),
+                columns["value"].tolist(),
+                unit.tolist(),
+                source.tolist(),
+            )
+        )
+    return out_path
+
+
+def write_vitals_parquet(rows: List[VitalRow], out_dir: Path) -> Path:
+    return write_parquet("vitals", rows_to_columns(rows, VITAL_FIELDS), out_dir)
+
+
+def write_vitals_columns_parquet(columns: VitalColumns, out_dir: Path) -> Path:
+    """
+    Write a columnar vitals batch to out_dir/vitals.parquet without per-row conversion.
+    The coded columns are written as Arrow dictionary arrays over their vocabularies (no string
+    materialization); unit reuses the vital_type codes mapped to VITAL_UNITS.
+    """
+    return write_parquet(
+        "vitals",
+        {
+            **columns,
+            "vital_type": dictionary_array(columns["vital_type"], VITAL_TYPES),
+            "unit": dictionary_array(_UNIT_CODES[columns["vital_type"]], VITAL_UNITS),
+            "source": dictionary_array(columns["source"], VITAL_SOURCES),
+        },
+        out_dir,
+    )
+
+
+def write_vitals_wide_csv(columns: VitalWideColumns, out_dir: Path) -> Path:
+    """
+    Write a wide vitals batch to out_dir/vitals_wide.csv (columns VITAL_WIDE_FIELDS; values not
+    recorded are empty).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "vitals_wide.csv"
+    event_time = np.datetime_as_string(columns["event_time"], unit="s")
+    source = np.array(VITAL_SOURCES)[columns["source"]]
+    values = columns["values"]
+    value_columns = [
+        np.where(np.isnan(values[:, i]), None, values[:, i]).tolist() for i in range(len(VITAL_TYPES))
+    ]
+    with out_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(VITAL_WIDE_FIELDS)
+        writer.writerows(
+            zip(
+                columns["encounter_id"].tolist(),
+                columns["patient_id"].tolist(),
+                event_time.tolist(),
+                source.tolist(),
+                *value_columns,
+            )
+        )
+    return out_path
+
+
+def write_vitals_wide_parquet(columns: VitalWideColumns, out_dir: Path) -> Path:
+    """
+    Write a wide vitals batch to out_dir/vitals_wide.parquet (one nullable float64 column per vital type).
+    """
+    values = columns["values"]
+    return write_parquet(
+        "vitals_wide",
+        {
+            "encounter_id": columns["encounter_id"],
+            "patient_id": columns["patient_id"],
+            "event_time": columns["event_time"],
+            "source": dictionary_array(columns["source"], VITAL_SOURCES),
+            **{
+                vital_type: pa.array(values[:, i], mask=np.isnan(values[:, i]))
+                for i, vital_type in enumerate(VITAL_TYPES)
+            },
+        },
+        out_dir,
+    )
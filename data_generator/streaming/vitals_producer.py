@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import pyarrow.parquet as pq
+import yaml
+
+try:
+    from ..generators.encounters import ENCOUNTER_FIELDS
+    from ..generators.vitals import (
+        VITAL_FIELDS,
+        VitalRow,
+        resolve_vitals_cfg,
+        sample_vitals_timestep,
+    )
+except ImportError:
+    # Script mode (python data_generator/streaming/vitals_producer.py): import the generators the way
+    # generate_daily_batch.py does, from the data_generator/ directory next to streaming/
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from generators.encounters import ENCOUNTER_FIELDS
+    from generators.vitals import (
+        VITAL_FIELDS,
+        VitalRow,
+        resolve_vitals_cfg,
+        sample_vitals_timestep,
+    )
+
+
+def iter_vitals_in_event_order(
+    encounters_rows: List[Dict[str, Any]],
+    vitals_cfg: Dict[str, Any],
+    seed: int,
+) -> Iterator[VitalRow]:
+    """
+    Yield vitals for all encounters merged in event_time order (ties broken by encounter_id).
+
+    A heap holds only the next pending timestep per encounter, so memory is O(active encounters)
+    regardless of frequency or length of stay. Values follow the same rules as
+    generate_vitals_for_day (seed + 4004), but rows are drawn in event-time order, so the random
+    stream, and therefore the values, differ from the batch output.
+    """
+    rng = random.Random(seed + 4004)
+    frequency_minutes, enabled_vital_types, scenario_ranges, source_weights = resolve_vitals_cfg(vitals_cfg)
+    step = timedelta(minutes=frequency_minutes)
+
+    heap: List[Tuple[datetime, int, int]] = []
+    windows: List[Tuple[int, str, datetime]] = []
+    for encounter in encounters_rows:
+        admit = datetime.fromisoformat(str(encounter["admit_time"]))
+        discharge = datetime.fromisoformat(str(encounter["discharge_time"]))
+        if discharge < admit:
+            continue
+        windows.append((int(encounter["patient_id"]), str(encounter.get("scenario", "routine")), discharge))
+        heap.append((admit, int(encounter["encounter_id"]), len(windows) - 1))
+    heapq.heapify(heap)
+
+    while heap:
+        event_time, encounter_id, idx = heapq.heappop(heap)
+        patient_id, scenario, discharge = windows[idx]
+
+        yield from sample_vitals_timestep(
+            rng,
+            encounter_id=encounter_id,
+            patient_id=patient_id,
+            event_time=event_time,
+            scenario=scenario,
+            enabled_vital_types=enabled_vital_types,
+            scenario_ranges=scenario_ranges,
+            source_weights=source_weights,
+        )
+
+        next_time = event_time + step
+        if next_time <= discharge:
+            heapq.heappush(heap, (next_time, encounter_id, idx))
+
+
+class ChunkFileSink:
+    """
+    Rolling CSV chunk files in a landing directory.
+
+    Each chunk holds at most chunk_rows rows (plus header) and is written to a hidden .tmp file,
+    then renamed into place, so consumers tailing the directory only ever see complete files.
+    File names sort in production order: <prefix>-<seq:06d>.csv. Numbering continues after the
+    highest sequence already present for the prefix in the landing directory or the ingestor's
+    done/ and rejected/ subdirectories, so a re-run never reuses a name.
+    """
+
+    def __init__(self, landing_dir: Path, prefix: str, chunk_rows: int) -> None:
+        self.landing_dir = landing_dir
+        self.prefix = prefix
+        self.chunk_rows = max(1, chunk_rows)
+        self.buffer: List[VitalRow] = []
+        self.chunks_written = 0
+        self.landing_dir.mkdir(parents=True, exist_ok=True)
+        self.sequence = self._last_sequence()
+
+    def _last_sequence(self) -> int:
+        pattern = re.compile(rf"{re.escape(self.prefix)}-(\d+)\.csv")
+        last = 0
+        for directory in (self.landing_dir, self.landing_dir / "done", self.landing_dir / "rejected"):
+            if not directory.is_dir():
+                continue
+            for path in directory.glob(f"{self.prefix}-*.csv"):
+                match = pattern.fullmatch(path.name)
+                if match:
+                    last = max(last, int(match.group(1)))
+        return last
+
+    def write(self, row: VitalRow) -> None:
+        self.buffer.append(row)
+        if len(self.buffer) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> Optional[Path]:
+        if not self.buffer:
+            return None
+        self.sequence += 1
+        self.chunks_written += 1
+        name = f"{self.prefix}-{self.sequence:06d}.csv"
+        tmp_path = self.landing_dir / f".{name}.tmp"
+        with tmp_path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=VITAL_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.buffer)
+        out_path = self.landing_dir / name
+        os.replace(tmp_path, out_path)
+        self.buffer = []
+        return out_path
+
+    def close(self) -> None:
+        self.flush()
+
+
+class StreamSink:
+    """
+    CSV rows to a text stream (e.g. stdout piped into a consumer); header written once.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=VITAL_FIELDS)
+        self.writer.writeheader()
+        self.chunks_written = 0
+
+    def write(self, row: VitalRow) -> None:
+        self.writer.writerow(row)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+def produce(
+    rows: Iterator[VitalRow],
+    sink: Any,
+    rows_per_second: float = 0.0,
+    flush_seconds: float = 5.0,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Drain rows into sink, throttled to rows_per_second (0 = as fast as possible).
+    Partial chunks are flushed at least every flush_seconds so downstream latency stays bounded
+    at low rates. Returns number of rows produced.
+    """
+    started = time.monotonic()
+    last_flush = started
+    produced = 0
+
+    for row in rows:
+        if limit is not None and produced >= limit:
+            break
+        sink.write(row)
+        produced += 1
+
+        now = time.monotonic()
+        if rows_per_second > 0:
+            ahead = produced / rows_per_second - (now - started)
+            if ahead > 0:
+                time.sleep(ahead)
+                now = time.monotonic()
+        if flush_seconds > 0 and now - last_flush >= flush_seconds:
+            sink.flush()
+            last_flush = now
+
+    sink.close()
+    return produced
+
+
+def load_encounters(input_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Read the day's encounters (encounters.parquet preferred, else encounters.csv).
+    """
+    parquet_path = input_dir / "encounters.parquet"
+    if parquet_path.exists():
+        return pq.read_table(parquet_path, columns=ENCOUNTER_FIELDS).to_pylist()
+
+    csv_path = input_dir / "encounters.csv"
+    if not csv_path.exists():
+        raise FileNotFoundError(f"No encounters.parquet or encounters.csv in {input_dir}")
+    with csv_path.open("r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Stream vitals for a day's encounters in event-time order.")
+    p.add_argument("--date", required=True, help="YYYY-MM-DD (encounters are read from data/<mode>/<date>/)")
+    p.add_argument("--mode", required=True, choices=["raw", "sample"], help="Input folder: raw or sample")
+    p.add_argument("--sink", default="dir", choices=["dir", "stdout"], help="dir: rolling chunk files; stdout: CSV pipe")
+    p.add_argument(
+        "--landing-dir",
+        default=str(Path("data") / "staged" / "landing" / "vitals"),
+        help="Chunk file directory for --sink dir",
+    )
+    p.add_argument("--chunk-rows", type=int, default=5000, help="Max rows per chunk file (default: 5000)")
+    p.add_argument("--rows-per-second", type=float, default=0.0, help="Throttle rate, 0 = unthrottled")
+    p.add_argument("--flush-seconds", type=float, default=5.0, help="Flush partial chunks at least this often")
+    p.add_argument("--limit", type=int, default=None, help="Stop after this many rows")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    config_path = Path("data_generator") / "config.yaml"
+    with config_path.open("r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    seed = int(config.get("seed", 42))
+
+    input_dir = Path("data") / args.mode / args.date
+    encounters_rows = load_encounters(input_dir)
+    rows = iter_vitals_in_event_order(encounters_rows, config.get("vitals", {}), seed)
+
+    if args.sink == "stdout":
+        sink: Any = StreamSink(sys.stdout)
+    else:
+        sink = ChunkFileSink(Path(args.landing_dir), prefix=f"vitals-{args.date}", chunk_rows=args.chunk_rows)
+
+    started = time.monotonic()
+    produced = produce(
+        rows,
+        sink,
+        rows_per_second=args.rows_per_second,
+        flush_seconds=args.flush_seconds,
+        limit=args.limit,
+    )
+    elapsed = time.monotonic() - started
+
+    if args.sink == "dir":
+        print("=== Vitals Stream Complete ===")
+        print(f"date: {args.date}")
+        print(f"encounters: {len(encounters_rows)}")
+        print(f"rows_produced: {produced}")
+        print(f"chunks_written: {sink.chunks_written} -> {args.landing_dir}")
+        print(f"elapsed_s: {elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
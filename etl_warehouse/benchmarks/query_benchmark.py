@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, TypedDict
+
+import duckdb
+
+try:
+    from etl_warehouse.etl.load import apply_indexes
+    from etl_warehouse.etl.migrations import bootstrap_warehouse
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "etl"))
+    from load import apply_indexes
+    from migrations import bootstrap_warehouse
+
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "sql" / "schema.sql"
+
+START_TIME = datetime(2026, 1, 1)
+
+
+class LatencySummary(TypedDict):
+    median_ms: float
+    p95_ms: float
+
+
+def populate_warehouse(conn: duckdb.DuckDBPyConnection, encounters: int, days: int, sorted_load: bool) -> None:
+    """
+    Fill curated.dim_patients / curated.fact_encounters with synthetic rows.
+    sorted_load=False inserts rows in random order (no physical design);
+    sorted_load=True inserts them ordered the way the ETL loads them.
+    """
+    patients = max(1, encounters // 4)
+    order_patients = "patient_id" if sorted_load else "random()"
+    order_encounters = "admit_time, encounter_id" if sorted_load else "random()"
+    conn.execute("SELECT setseed(0.42)")
+    conn.execute(
+        f"""
+        INSERT INTO curated.dim_patients
+        SELECT
+            range + 1 AS patient_id,
+            CAST(18 + hash(range) % 80 AS BIGINT) AS age,
+            CASE WHEN hash(range) % 2 = 0 THEN 'F' ELSE 'M' END AS sex
+        FROM range({patients})
+        ORDER BY {order_patients}
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO curated.fact_encounters
+        SELECT
+            encounter_id,
+            patient_id,
+            admit_time,
+            admit_time + to_hours(los_hours) AS discharge_time,
+            scenario,
+            acuity,
+            los_hours
+        FROM (
+            SELECT
+                range + 1 AS encounter_id,
+                CAST(1 + hash(range) % {patients} AS BIGINT) AS patient_id,
+                TIMESTAMP '{START_TIME.isoformat(sep=" ")}'
+                    + to_seconds(CAST(hash(range * 7) % {days * 86400} AS BIGINT)) AS admit_time,
+                CAST(2 + hash(range * 13) % 120 AS BIGINT) AS los_hours,
+                ['routine', 'sepsis', 'chest_pain'][1 + CAST(hash(range) % 3 AS BIGINT)] AS scenario,
+                ['low', 'medium', 'high'][1 + CAST(hash(range * 3) % 3 AS BIGINT)] AS acuity
+            FROM range({encounters})
+        )
+        ORDER BY {order_encounters}
+        """
+    )
+
+
+def time_queries(run: Callable[[int], None], iterations: int) -> LatencySummary:
+    latencies: List[float] = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        run(i)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    latencies.sort()
+    return {
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def run_queries(
+    conn: duckdb.DuckDBPyConnection,
+    encounters: int,
+    days: int,
+    iterations: int,
+    seed: int,
+) -> Dict[str, LatencySummary]:
+    rng = random.Random(seed)
+    encounter_ids = [rng.randint(1, encounters) for _ in range(iterations)]
+    patient_ids = [rng.randint(1, max(1, encounters // 4)) for _ in range(iterations)]
+    range_starts = [START_TIME + timedelta(days=rng.randrange(max(1, days - 1))) for _ in range(iterations)]
+
+    def encounter_lookup(i: int) -> None:
+        conn.execute(
+            "SELECT * FROM curated.fact_encounters WHERE encounter_id = ?",
+            [encounter_ids[i]],
+        ).fetchall()
+
+    def patient_lookup(i: int) -> None:
+        conn.execute(
+            "SELECT * FROM curated.dim_patients WHERE patient_id = ?",
+            [patient_ids[i]],
+        ).fetchall()
+
+    def one_day_range(i: int) -> None:
+        conn.execute(
+            """
+            SELECT scenario, COUNT(*), AVG(los_hours)
+            FROM curated.fact_encounters
+            WHERE admit_time >= ? AND admit_time < ?
+            GROUP BY scenario
+            """,
+            [range_starts[i], range_starts[i] + timedelta(days=1)],
+        ).fetchall()
+
+    # Warm-up so the first measured query does not pay for loading blocks from disk
+    encounter_lookup(0)
+    one_day_range(0)
+
+    return {
+        "encounter_point_lookup": time_queries(encounter_lookup, iterations),
+        "patient_point_lookup": time_queries(patient_lookup, iterations),
+        "encounter_one_day_range": time_queries(one_day_range, iterations),
+    }
+
+
+def run_benchmark(encounters: int, days: int, iterations: int, seed: int, work_dir: Path) -> Dict[str, Dict[str, LatencySummary]]:
+    """
+    Build two warehouses with the same rows: 'before' (random insert order, no indexes) and
+    'after' (sort-ordered load + indexes.sql applied after the load), and time the same queries on both.
+    """
+    results: Dict[str, Dict[str, LatencySummary]] = {}
+    for label, physical_design in (("before", False), ("after", True)):
+        db_path = work_dir / f"query_benchmark_{label}.duckdb"
+        if db_path.exists():
+            db_path.unlink()
+        with duckdb.connect(str(db_path)) as conn:
+            bootstrap_warehouse(conn, SCHEMA_PATH)
+
+            started = time.perf_counter()
+            populate_warehouse(conn, encounters, days, sorted_load=physical_design)
+            load_s = time.perf_counter() - started
+            index_s = 0.0
+            if physical_design:
+                started = time.perf_counter()
+                apply_indexes(conn, SCHEMA_PATH)
+                index_s = time.perf_counter() - started
+            conn.execute("CHECKPOINT")
+            print(f"query_benchmark: {label}: load={load_s:.2f}s index_build={index_s:.2f}s")
+
+        # Reopen so queries run against the persisted layout
+        with duckdb.connect(str(db_path), read_only=True) as conn:
+            results[label] = run_queries(conn, encounters, days, iterations, seed)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Point-lookup and date-range latency with and without the warehouse physical design.")
+    p.add_argument("--encounters", type=int, default=1_000_000, help="Encounters to generate (default: 1,000,000)")
+    p.add_argument("--days", type=int, default=365, help="Days the admit times are spread over (default: 365)")
+    p.add_argument("--iterations", type=int, default=200, help="Queries timed per query type (default: 200)")
+    p.add_argument("--seed", type=int, default=42, help="Seed for query parameters")
+    p.add_argument("--work-dir", default=None, help="Directory for the benchmark DuckDB files (default: temp dir)")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    print("=== QUERY BENCHMARK START ===")
+    print(f"encounters: {args.encounters}, days: {args.days}, iterations: {args.iterations}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(args.work_dir) if args.work_dir else Path(tmp_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        results = run_benchmark(args.encounters, args.days, args.iterations, args.seed, work_dir)
+
+    print(f"{'query':<26} {'before p50':>11} {'before p95':>11} {'after p50':>10} {'after p95':>10}")
+    for query in results["before"]:
+        before = results["before"][query]
+        after = results["after"][query]
+        print(
+            f"{query:<26} {before['median_ms']:>9.2f}ms {before['p95_ms']:>9.2f}ms "
+            f"{after['median_ms']:>8.2f}ms {after['p95_ms']:>8.2f}ms"
+        )
+    print("=== QUERY BENCHMARK COMPLETE ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TypedDict
+
+import duckdb
+
+try:
+    from data_generator.generate_daily_batch import load_config, run_range
+    from etl_warehouse.etl.backfill import date_range, run_backfill
+    from etl_warehouse.benchmarks.query_benchmark import LatencySummary, time_queries
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from data_generator.generate_daily_batch import load_config, run_range
+    from etl_warehouse.etl.backfill import date_range, run_backfill
+    from etl_warehouse.benchmarks.query_benchmark import LatencySummary, time_queries
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CONFIG_PATH = REPO_ROOT / "data_generator" / "config.yaml"
+SCHEMA_PATH = REPO_ROOT / "etl_warehouse" / "sql" / "schema.sql"
+
+# Fixed workload; parameters (?) are drawn per iteration from the loaded warehouse.
+WORKLOAD: Dict[str, str] = {
+    "gold_daily_encounter_summary": """
+        SELECT encounter_date, scenario, acuity, encounter_count, avg_los_hours, min_los_hours, max_los_hours
+        FROM gold.daily_encounter_summary
+        ORDER BY encounter_date, scenario, acuity
+    """,
+    "patient_encounter_timeline": """
+        SELECT e.encounter_id, e.admit_time, e.discharge_time, e.scenario, e.acuity, e.los_hours, p.age, p.sex
+        FROM curated.fact_encounters AS e
+        JOIN curated.dim_patients AS p ON e.patient_id = p.patient_id
+        WHERE e.patient_id = ?
+        ORDER BY e.admit_time
+    """,
+    "encounter_vitals_series": """
+        SELECT v.event_time, v.vital_type, v.value, t.unit
+        FROM curated.fact_vitals AS v
+        JOIN curated.dim_vital_types AS t ON t.vital_type = v.vital_type
+        WHERE v.encounter_id = ?
+        ORDER BY v.vital_type, v.event_time
+    """,
+    "encounter_vitals_wide_series": """
+        SELECT event_time, source, heart_rate, resp_rate, temperature_c, spo2, systolic_bp, diastolic_bp
+        FROM curated.fact_vitals_wide
+        WHERE encounter_id = ?
+        ORDER BY event_time
+    """,
+    "encounter_vitals_hourly_trend": """
+        SELECT vital_type, bucket_start, reading_count, min_value, max_value, mean_value, last_value
+        FROM curated.fact_vitals_1h
+        WHERE encounter_id = ?
+        ORDER BY vital_type, bucket_start
+    """,
+    "scenario_cohort_aggregates": """
+        SELECT
+            e.acuity,
+            v.vital_type,
+            COUNT(DISTINCT e.encounter_id) AS encounters,
+            AVG(v.value) AS mean_value,
+            MIN(v.value) AS min_value,
+            MAX(v.value) AS max_value
+        FROM curated.fact_encounters AS e
+        JOIN curated.fact_vitals AS v ON v.encounter_id = e.encounter_id
+        WHERE e.scenario = ?
+        GROUP BY e.acuity, v.vital_type
+        ORDER BY e.acuity, v.vital_type
+    """,
+}
+
+TABLES = [
+    "curated.dim_patients",
+    "curated.fact_encounters",
+    "curated.fact_vitals",
+    "curated.fact_vitals_wide",
+    "curated.fact_vitals_5m",
+    "curated.fact_vitals_1h",
+    "gold.daily_encounter_summary",
+    "gold.hourly_vitals_summary",
+]
+
+
+class TierResult(TypedDict):
+    tier: str
+    days: int
+    frequency_minutes: int
+    generate_s: float
+    etl_s: float
+    db_bytes: int
+    rows: Dict[str, int]
+    queries: Dict[str, LatencySummary]
+
+
+def tier_name(days: int, frequency_minutes: int) -> str:
+    return f"{days}d-{frequency_minutes}m"
+
+
+def _query_params(conn: duckdb.DuckDBPyConnection, iterations: int, seed: int) -> Dict[str, List[list]]:
+    rng = random.Random(seed)
+    patient_ids = [r[0] for r in conn.execute("SELECT patient_id FROM curated.dim_patients ORDER BY patient_id").fetchall()]
+    encounter_ids = [r[0] for r in conn.execute("SELECT encounter_id FROM curated.fact_encounters ORDER BY encounter_id").fetchall()]
+    scenarios = [r[0] for r in conn.execute("SELECT DISTINCT scenario FROM curated.fact_encounters ORDER BY scenario").fetchall()]
+    return {
+        "gold_daily_encounter_summary": [[] for _ in range(iterations)],
+        "patient_encounter_timeline": [[rng.choice(patient_ids)] for _ in range(iterations)],
+        "encounter_vitals_series": [[rng.choice(encounter_ids)] for _ in range(iterations)],
+        "encounter_vitals_wide_series": [[rng.choice(encounter_ids)] for _ in range(iterations)],
+        "encounter_vitals_hourly_trend": [[rng.choice(encounter_ids)] for _ in range(iterations)],
+        "scenario_cohort_aggregates": [[scenarios[i % len(scenarios)]] for i in range(iterations)],
+    }
+
+
+def run_workload(db_path: Path, iterations: int, seed: int) -> Dict[str, LatencySummary]:
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        params = _query_params(conn, iterations, seed)
+        results: Dict[str, LatencySummary] = {}
+        for name, sql in WORKLOAD.items():
+            # Warm-up run so every query is measured against cached blocks
+            conn.execute(sql, params[name][0]).fetchall()
+            results[name] = time_queries(lambda i: conn.execute(sql, params[name][i]).fetchall(), iterations)
+        return results
+
+
+def run_tier(
+    days: int,
+    frequency_minutes: int,
+    start: str,
+    config: Dict[str, Any],
+    vitals_engine: str,
+    vitals_layout: str,
+    file_format: str,
+    etl_engine: str,
+    workers: int,
+    iterations: int,
+    seed: int,
+    tier_dir: Path,
+) -> TierResult:
+    """
+    Generate `days` days at the given vitals frequency into tier_dir with the generator's range mode,
+    backfill them into a fresh warehouse and time the fixed workload.
+    Generator and ETL resolve data/ paths against the working directory, so both run inside tier_dir.
+    """
+    name = tier_name(days, frequency_minutes)
+    end = (date.fromisoformat(start) + timedelta(days=days - 1)).isoformat()
+
+    tier_config = copy.deepcopy(config)
+    tier_config.setdefault("vitals", {})
+    tier_config["vitals"]["frequency_minutes"] = frequency_minutes
+    tier_config["vitals"]["engine"] = vitals_engine
+    tier_config["vitals"]["layout"] = vitals_layout
+
+    if tier_dir.exists():
+        shutil.rmtree(tier_dir)
+    tier_dir.mkdir(parents=True)
+    db_path = tier_dir / "data" / "processed" / "clinical_warehouse.duckdb"
+
+    cwd = Path.cwd()
+    os.chdir(tier_dir)
+    try:
+        started = time.perf_counter()
+        run_range(
+            argparse.Namespace(start=start, end=end, mode="raw", format=file_format, workers=workers),
+            tier_config,
+        )
+        generate_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        run_backfill(
+            date_range(start, end),
+            source="raw",
+            db_path=db_path,
+            schema_path=SCHEMA_PATH,
+            workers=workers,
+            commit_every=7,
+            engine=etl_engine,
+        )
+        etl_s = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = {table: int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]) for table in TABLES}
+
+    print(f"warehouse_benchmark: {name}: running workload ({iterations} iterations per query)")
+    queries = run_workload(db_path, iterations, seed)
+
+    return {
+        "tier": name,
+        "days": days,
+        "frequency_minutes": frequency_minutes,
+        "generate_s": generate_s,
+        "etl_s": etl_s,
+        "db_bytes": db_path.stat().st_size,
+        "rows": rows,
+        "queries": queries,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare_runs(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare two benchmark JSON documents tier by tier.
+    Returns one line per ETL timing or query median that got slower than baseline * threshold.
+    """
+    regressions: List[str] = []
+    baseline_tiers = {t["tier"]: t for t in baseline.get("tiers", [])}
+    for tier in current["tiers"]:
+        base = baseline_tiers.get(tier["tier"])
+        if base is None:
+            continue
+        for key in ("generate_s", "etl_s"):
+            if base.get(key) and tier[key] > base[key] * threshold:
+                regressions.append(f"{tier['tier']} {key}: {base[key]:.2f}s -> {tier[key]:.2f}s")
+        for query, latency in tier["queries"].items():
+            base_latency = base.get("queries", {}).get(query)
+            if base_latency and latency["median_ms"] > base_latency["median_ms"] * threshold:
+                regressions.append(
+                    f"{tier['tier']} {query}: median {base_latency['median_ms']:.2f}ms -> {latency['median_ms']:.2f}ms"
+                )
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Generate warehouses at scale tiers and time a fixed query workload.")
+    p.add_argument("--days", type=int, nargs="+", default=[1, 30], help="Day-count tiers (default: 1 30)")
+    p.add_argument(
+        "--frequency-minutes",
+        type=int,
+        nargs="+",
+        default=[60, 15],
+        help="Vitals frequency tiers in minutes (default: 60 15); every days x frequency pair is one tier",
+    )
+    p.add_argument("--start", default="2026-01-01", help="First generated day YYYY-MM-DD")
+    p.add_argument("--vitals-engine", default="numpy", choices=["python", "numpy"], help="Generator vitals engine")
+    p.add_argument(
+        "--vitals-layout", default="long", choices=["long", "wide"], help="Generated vitals file layout"
+    )
+    p.add_argument("--format", default="parquet", choices=["csv", "parquet"], help="Generated file format")
+    p.add_argument("--engine", default="sql", choices=["pandas", "sql"], help="ETL engine")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator/ETL worker processes")
+    p.add_argument("--iterations", type=int, default=20, help="Timed runs per workload query (default: 20)")
+    p.add_argument("--seed", type=int, default=42, help="Seed for query parameters")
+    p.add_argument("--work-dir", default=None, help="Directory for tier data/warehouses (default: temp dir, removed)")
+    p.add_argument(
+        "--output",
+        default=None,
+        help="JSON results path (default: data/processed/benchmarks/warehouse_benchmark-<UTC timestamp>.json)",
+    )
+    p.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    p.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=1.25,
+        help="Flag timings slower than baseline * threshold (default: 1.25)",
+    )
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_config(CONFIG_PATH)
+    started_at = datetime.now(timezone.utc)
+    output_path = Path(args.output) if args.output else (
+        Path("data") / "processed" / "benchmarks" / f"warehouse_benchmark-{started_at:%Y%m%dT%H%M%SZ}.json"
+    )
+
+    print("=== WAREHOUSE BENCHMARK START ===")
+    tiers: List[TierResult] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(args.work_dir).resolve() if args.work_dir else Path(tmp_dir)
+        for days in args.days:
+            for frequency_minutes in args.frequency_minutes:
+                name = tier_name(days, frequency_minutes)
+                print(f"warehouse_benchmark: tier {name}")
+                result = run_tier(
+                    days=days,
+                    frequency_minutes=frequency_minutes,
+                    start=args.start,
+                    config=config,
+                    vitals_engine=args.vitals_engine,
+                    vitals_layout=args.vitals_layout,
+                    file_format=args.format,
+                    etl_engine=args.engine,
+                    workers=args.workers,
+                    iterations=args.iterations,
+                    seed=args.seed,
+                    tier_dir=work_dir / name,
+                )
+                tiers.append(result)
+                print(
+                    f"warehouse_benchmark: {name}: generate={result['generate_s']:.2f}s etl={result['etl_s']:.2f}s "
+                    f"vitals={result['rows']['curated.fact_vitals']} db={result['db_bytes'] / 1e6:.1f}MB"
+                )
+
+    document = {
+        "benchmark": "warehouse_benchmark",
+        "started_at": started_at.isoformat(),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "duckdb": duckdb.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "start": args.start,
+            "vitals_engine": args.vitals_engine,
+            "vitals_layout": args.vitals_layout,
+            "format": args.format,
+            "etl_engine": args.engine,
+            "workers": args.workers,
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "tiers": tiers,
+    }
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    print(f"{'tier':<10} {'query':<30} {'p50':>9} {'p95':>9}")
+    for tier in tiers:
+        for query, latency in tier["queries"].items():
+            print(f"{tier['tier']:<10} {query:<30} {latency['median_ms']:>7.2f}ms {latency['p95_ms']:>7.2f}ms")
+    print(f"warehouse_benchmark: results -> {output_path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_runs(document, baseline, args.regression_threshold)
+        if regressions:
+            print(f"warehouse_benchmark: {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            print("=== WAREHOUSE BENCHMARK FAILED ===")
+            sys.exit(1)
+        print(f"warehouse_benchmark: no regressions vs {args.baseline} (threshold x{args.regression_threshold})")
+
+    print("=== WAREHOUSE BENCHMARK COMPLETE ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .extract import extract_day, input_bytes
+    from .transform import transform_day
+    from .validation import validate_labs, validate_notes, validate_vitals
+    from .instrumentation import RunRecorder, StageRecord, frame_rows, measure_stage
+    from .load import apply_indexes, drop_indexes, write_day
+    from .manifest import DayManifest, fingerprint_day, unchanged_since
+    from .session import WarehouseSession, session_scope
+    from .sql_engine import run_day_sql
+except ImportError:
+    from extract import extract_day, input_bytes
+    from transform import transform_day
+    from validation import validate_labs, validate_notes, validate_vitals
+    from instrumentation import RunRecorder, StageRecord, frame_rows, measure_stage
+    from load import apply_indexes, drop_indexes, write_day
+    from manifest import DayManifest, fingerprint_day, unchanged_since
+    from session import WarehouseSession, session_scope
+    from sql_engine import run_day_sql
+
+
+def date_range(start: str, end: str) -> List[str]:
+    """
+    Inclusive list of YYYY-MM-DD strings from start to end.
+    """
+    first = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+    if last < first:
+        raise ValueError(f"End date {end} is before start date {start}")
+    return [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def stage_day(input_dir: Path) -> Tuple[Dict[str, pd.DataFrame], List[StageRecord]]:
+    """
+    Extract, transform and validate one day (runs in a worker process).
+    Returns (staged_data, stage records measured in the worker).
+    """
+    records: List[StageRecord] = []
+    day = input_dir.name
+    with measure_stage(records, "extract", day=day, bytes_read=input_bytes(input_dir)) as stage:
+        raw_data = extract_day(input_dir)
+        stage["rows_out"] = frame_rows(raw_data)
+    with measure_stage(records, "transform", day=day, rows_in=frame_rows(raw_data)) as stage:
+        staged_data = transform_day(raw_data, validate=False)
+        stage["rows_out"] = frame_rows(staged_data)
+    with measure_stage(records, "validate_vitals", day=day, rows_in=len(staged_data["vitals"])) as stage:
+        validate_vitals(staged_data["vitals"], staged_data["encounters"])
+        stage["rows_out"] = len(staged_data["vitals"])
+    with measure_stage(records, "validate_labs", day=day, rows_in=len(staged_data["labs"])) as stage:
+        validate_labs(staged_data["labs"], staged_data["encounters"])
+        stage["rows_out"] = len(staged_data["labs"])
+    with measure_stage(records, "validate_notes", day=day, rows_in=len(staged_data["notes"])) as stage:
+        validate_notes(staged_data["notes"], staged_data["encounters"])
+        stage["rows_out"] = len(staged_data["notes"])
+    return staged_data, records
+
+
+def _stage_in_pool(
+    pool: ProcessPoolExecutor,
+    days: List[str],
+    input_dirs: Dict[str, Path],
+    max_in_flight: int,
+) -> Iterator[Tuple[str, Any, List[StageRecord]]]:
+    """
+    Yield (day, staged_data, stage records) in date order while up to max_in_flight days are
+    extracted/transformed ahead in the pool.
+    """
+    queue = iter(days)
+    in_flight: Deque[Tuple[str, Future]] = deque()
+
+    def submit_next() -> None:
+        day = next(queue, None)
+        if day is not None:
+            in_flight.append((day, pool.submit(stage_day, input_dirs[day])))
+
+    for _ in range(max_in_flight):
+        submit_next()
+
+    try:
+        while in_flight:
+            day, future = in_flight.popleft()
+            try:
+                staged_data, records = future.result()
+            except Exception as exc:
+                raise RuntimeError(f"Extract/transform failed for {day}: {exc}") from exc
+            submit_next()
+            yield day, staged_data, records
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+
+
+def run_backfill(
+    days: List[str],
+    source: str,
+    db_path: Path,
+    schema_path: Path,
+    workers: int,
+    commit_every: int,
+    engine: str = "pandas",
+    recorder: Optional[RunRecorder] = None,
+    session: Optional[WarehouseSession] = None,
+    force: bool = False,
+) -> None:
+    """
+    Backfill a list of days into the warehouse (incremental mode, loaded in date order).
+
+    pandas engine: days are extracted/transformed concurrently in a process pool; at most
+    2 * workers staged days are held in memory at once.
+    sql engine: each day is read, validated and written by DuckDB on the writer connection
+    (DuckDB parallelizes each day internally), so no process pool is used.
+
+    A single writer connection (session's, or one opened for the backfill) commits every
+    `commit_every` days. Days without an input folder are skipped, and so are days whose input
+    files and pipeline version match ops.ingest_manifest (unless force); each loaded day records
+    its files there in the day's transaction. A failing day rolls back its uncommitted batch and
+    stops the backfill. Indexes are dropped before the first day and rebuilt once after the last
+    commit (or rollback; a rebuild error then never replaces the load error).
+    Per-day stage metrics (worker-side extract/transform/validate, writer-side load stages) are
+    recorded on recorder and printed per day.
+    """
+    if recorder is None:
+        recorder = RunRecorder(engine=engine, load_mode="incremental")
+
+    input_dirs = {day: Path("data") / source / day for day in days}
+    pending_days = [day for day in days if input_dirs[day].exists()]
+    skipped = [day for day in days if not input_dirs[day].exists()]
+    for day in skipped:
+        print(f"backfill: skip {day} (no input folder {input_dirs[day]})")
+
+    commit_every = max(1, commit_every)
+    pool_workers = 1 if engine == "sql" else max(1, workers)
+    started = time.perf_counter()
+    loaded = 0
+    uncommitted: List[str] = []
+
+    # the sql engine stages nothing in worker processes, so it gets no pool at all
+    pool_scope = nullcontext() if engine == "sql" else ProcessPoolExecutor(max_workers=pool_workers)
+    with pool_scope as pool, session_scope(session, db_path, schema_path) as active:
+        conn = active.conn
+        manifests: Dict[str, DayManifest] = {}
+        for day in list(pending_days):
+            manifests[day] = fingerprint_day(conn, source, input_dirs[day])
+            loaded_at = None if force else unchanged_since(conn, manifests[day], mode="incremental")
+            if loaded_at is not None:
+                pending_days.remove(day)
+                skipped.append(day)
+                print(f"backfill: skip {day} (inputs and pipeline unchanged since {loaded_at:%Y-%m-%d %H:%M:%S})")
+        total = len(pending_days)
+        if total == 0:
+            print(f"backfill: nothing to load, skipped {len(skipped)} day(s) -> {active.db_path}")
+            return
+
+        drop_indexes(conn)
+
+        staged_days: Iterator[Tuple[str, Any, List[StageRecord]]]
+        if engine == "sql":
+            staged_days = ((day, input_dirs[day], []) for day in pending_days)
+        else:
+            staged_days = _stage_in_pool(pool, pending_days, input_dirs, max_in_flight=pool_workers * 2)
+
+        current_day = ""
+        conn.begin()
+        try:
+            for current_day, staged, worker_records in staged_days:
+                recorder.add(worker_records)
+                if engine == "sql":
+                    counts = run_day_sql(
+                        conn, staged, mode="incremental", recorder=recorder, manifest=manifests[current_day]
+                    )
+                else:
+                    counts = write_day(
+                        conn,
+                        staged,
+                        mode="incremental",
+                        recorder=recorder,
+                        day=current_day,
+                        manifest=manifests[current_day],
+                    )
+                uncommitted.append(current_day)
+                if len(uncommitted) >= commit_every:
+                    with recorder.stage("commit", day=current_day):
+                        conn.commit()
+                    conn.begin()
+                    uncommitted = []
+                del staged
+
+                loaded += 1
+                stage_times = " ".join(
+                    f"{record['stage']}={record['wall_s']:.2f}s"
+                    for record in recorder.records
+                    if record["day"] == current_day
+                )
+                print(
+                    f"backfill: [{loaded}/{total}] {current_day} {stage_times} "
+                    f"encounters={counts['encounters']} vitals={counts['vitals']} labs={counts['labs']} notes={counts['notes']}"
+                )
+            if uncommitted:
+                with recorder.stage("commit", day=current_day):
+                    conn.commit()
+            else:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            print(f"backfill: failed on {current_day}")
+            if uncommitted:
+                print(f"backfill: rolled back uncommitted days: {', '.join(uncommitted)}")
+            # Restore the indexes over the committed days without masking the load error
+            try:
+                apply_indexes(conn, active.schema_path)
+            except Exception as rebuild_error:
+                print(f"backfill: index rebuild failed after rollback: {rebuild_error}")
+            raise
+        with recorder.stage("index_rebuild"):
+            apply_indexes(conn, active.schema_path)
+        print(f"backfill: rebuilt indexes in {recorder.records[-1]['wall_s']:.2f}s")
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"backfill: loaded {loaded} day(s), skipped {len(skipped)}, "
+        f"engine={engine}, workers={pool_workers}, elapsed={elapsed:.2f}s -> {active.db_path}"
+    )
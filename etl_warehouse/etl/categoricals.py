@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import duckdb
+import pandas as pd
+
+
+# Fixed vocabularies (staged_*.schema.json enums). The ENUM types in categorical_types.sql list the
+# same values in the same order, so pandas category codes and DuckDB enum codes agree.
+VITAL_TYPES = ["heart_rate", "resp_rate", "temperature_c", "spo2", "systolic_bp", "diastolic_bp"]
+
+VITAL_SOURCES = ["monitor", "manual"]
+
+SCENARIOS = ["routine", "chest_pain", "sepsis", "copd_hypoxia"]
+
+ACUITY_LEVELS = ["low", "medium", "high"]
+
+SEXES = ["M", "F", "U"]
+
+# unit is a function of vital_type: it is served by curated.dim_vital_types instead of being stored per row
+UNIT_BY_VITAL_TYPE = {
+    "heart_rate": "bpm",
+    "resp_rate": "breaths/min",
+    "temperature_c": "C",
+    "spo2": "%",
+    "systolic_bp": "mmHg",
+    "diastolic_bp": "mmHg",
+}
+
+# column name -> (DuckDB ENUM type, categories); applies to columns of that name in CATEGORICAL_SCHEMAS
+CATEGORICAL_COLUMNS: Dict[str, Tuple[str, List[str]]] = {
+    "vital_type": ("vital_type_enum", VITAL_TYPES),
+    "source": ("vital_source_enum", VITAL_SOURCES),
+    "scenario": ("scenario_enum", SCENARIOS),
+    "acuity": ("acuity_enum", ACUITY_LEVELS),
+    "sex": ("sex_enum", SEXES),
+}
+
+CATEGORICAL_SCHEMAS = ["raw", "curated", "gold"]
+
+# (schema, table, column) no longer stored; dropped from warehouses created before
+DERIVED_COLUMNS = [("raw", "vitals", "unit"), ("curated", "fact_vitals", "unit")]
+
+
+def as_categorical(values: pd.Series, column: str) -> pd.Series:
+    """
+    Cast to an unordered pd.Categorical over the column's fixed vocabulary. Values outside it become
+    nulls, like other unparseable values, and are caught by the required-field / quality checks.
+    """
+    # Factorizing first and then re-coding the few distinct values is much cheaper than
+    # matching every row against the vocabulary (a no-op for frames that are already categorical).
+    # DuckDB hands ENUM columns over as ordered categoricals; unordering them keeps Parquet and CSV
+    # extracts the same dtype
+    return values.astype("category").cat.set_categories(CATEGORICAL_COLUMNS[column][1], ordered=False)
+
+
+def enum_type_sql(column: str) -> str:
+    """
+    Inline DuckDB ENUM type literal for the column's vocabulary (for connections without the named types).
+    """
+    values = ", ".join(f"'{value}'" for value in CATEGORICAL_COLUMNS[column][1])
+    return f"ENUM({values})"
+
+
+def bootstrap_categorical_types(conn: duckdb.DuckDBPyConnection, types_path: Path) -> None:
+    """
+    Create the ENUM types from categorical_types.sql and convert existing tables: VARCHAR columns
+    named in CATEGORICAL_COLUMNS become their ENUM type (values outside the vocabulary become
+    NULL) and DERIVED_COLUMNS are dropped. A new warehouse has no tables yet, so only the types are created.
+    """
+    types_sql = types_path.read_text(encoding="utf-8").strip()
+    if types_sql:
+        conn.execute(types_sql)
+
+    schemas = ", ".join(f"'{name}'" for name in CATEGORICAL_SCHEMAS)
+    names = ", ".join(f"'{name}'" for name in CATEGORICAL_COLUMNS)
+    columns = conn.execute(
+        f"""
+        SELECT c.schema_name, c.table_name, c.column_name
+        FROM duckdb_columns() AS c
+        JOIN duckdb_tables() AS t
+          ON t.database_name = c.database_name AND t.schema_name = c.schema_name AND t.table_name = c.table_name
+        WHERE c.database_name = current_database()
+          AND c.schema_name IN ({schemas})
+          AND c.column_name IN ({names})
+          AND c.data_type = 'VARCHAR'
+        ORDER BY c.schema_name, c.table_name, c.column_name
+        """
+    ).fetchall()
+    existing = {
+        (row[0], row[1], row[2])
+        for row in conn.execute(
+            "SELECT schema_name, table_name, column_name FROM duckdb_columns() WHERE database_name = current_database()"
+        ).fetchall()
+    }
+    dropped = [column for column in DERIVED_COLUMNS if column in existing]
+
+    # DuckDB cannot alter a table that has indexes: they are dropped here and rebuilt from
+    # indexes.sql by bootstrap_warehouse once the migration is committed
+    altered_tables = {(row[0], row[1]) for row in columns} | {(row[0], row[1]) for row in dropped}
+    for schema_name, table_name, index_name in conn.execute(
+        "SELECT schema_name, table_name, index_name FROM duckdb_indexes() WHERE database_name = current_database()"
+    ).fetchall():
+        if (schema_name, table_name) in altered_tables:
+            conn.execute(f"DROP INDEX {schema_name}.{index_name}")
+
+    for schema_name, table_name, column_name in columns:
+        enum_type = CATEGORICAL_COLUMNS[column_name][0]
+        conn.execute(
+            f"ALTER TABLE {schema_name}.{table_name} ALTER COLUMN {column_name} "
+            f"SET DATA TYPE {enum_type} USING TRY_CAST({column_name} AS {enum_type})"
+        )
+    for schema_name, table_name, column_name in dropped:
+        conn.execute(f"ALTER TABLE {schema_name}.{table_name} DROP COLUMN {column_name}")
@@ -1,37 +1,176 @@
 from __future__ import annotations
 
+import io
+import json
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
+import duckdb
 import pandas as pd
+import pyarrow as pa
+
+try:
+    from .categoricals import VITAL_TYPES, enum_type_sql
+except ImportError:
+    from categoricals import VITAL_TYPES, enum_type_sql
+
+
+DATASETS = ["patients", "encounters", "vitals"]
+
+# Datasets added after the original contract; days generated before them load without them.
+OPTIONAL_DATASETS = ["labs", "notes"]
+
+# Candidate file suffixes per dataset (a day folder must hold exactly one candidate per dataset)
+INPUT_SUFFIXES = {
+    "notes": (".jsonl.zst", ".jsonl.gz", ".jsonl"),
+}
+DEFAULT_INPUT_SUFFIXES = (".parquet", ".csv")
+
+# Candidate file names (without suffix) per dataset: vitals may come in the
+# wide layout (vitals_wide.*, one row per timestep, a column per vital type), unpivoted on read.
+INPUT_STEMS = {
+    "vitals": ("vitals", "vitals_wide"),
+}
+WIDE_VITALS_STEM = "vitals_wide"
+
+LAB_COLUMNS = ["lab_event_id", "encounter_id", "patient_id", "event_time", "test_name", "value", "unit"]
+
+NOTE_COLUMNS = ["note_id", "encounter_id", "patient_id", "note_time", "note_type", "text"]
+
+EMPTY_FRAMES = {"labs": LAB_COLUMNS, "notes": NOTE_COLUMNS}
+
+# Fixed-vocabulary columns read from Parquet (and wide vitals) straight into pandas categoricals (categoricals.py)
+PARQUET_CATEGORICAL_COLUMNS = {
+    "patients": ["sex"],
+    "encounters": ["scenario", "acuity"],
+    "vitals": ["vital_type", "source"],
+}
+
+
+def resolve_input_file(input_dir: Path, dataset: str) -> Optional[Path]:
+    """
+    Return the input file for a dataset: <dataset>.parquet or <dataset>.csv (notes: notes.jsonl.zst,
+    notes.jsonl.gz or notes.jsonl; vitals: vitals.* or vitals_wide.*). Returns None if no candidate exists.
+    Raises ValueError when several candidates exist (e.g. a stale file left by a run in another format or
+    layout), since which one is current cannot be told.
+    """
+    found = [
+        input_dir / f"{stem}{suffix}"
+        for stem in INPUT_STEMS.get(dataset, (dataset,))
+        for suffix in INPUT_SUFFIXES.get(dataset, DEFAULT_INPUT_SUFFIXES)
+        if (input_dir / f"{stem}{suffix}").exists()
+    ]
+    if len(found) > 1:
+        names = ", ".join(path.name for path in found)
+        raise ValueError(f"Ambiguous {dataset} input in {input_dir}: {names} (remove the stale file(s))")
+    return found[0] if found else None
+
+
+def is_wide_vitals(path: Path) -> bool:
+    return path.name.split(".", 1)[0] == WIDE_VITALS_STEM
+
+
+def unpivot_vitals_sql(relation: str) -> str:
+    """
+    Long vitals rows (encounter_id, patient_id, event_time, vital_type, value, source) from a
+    wide vitals relation: one row per non-null vital type column, so values not recorded are skipped.
+    Columns are cast after the unpivot (TRY_CAST), so an unparseable value still yields a row with
+    a null, caught by validation like in the long layout.
+    """
+    return (
+        "SELECT TRY_CAST(encounter_id AS BIGINT) AS encounter_id, TRY_CAST(patient_id AS BIGINT) AS patient_id, "
+        "TRY_CAST(event_time AS TIMESTAMP) AS event_time, vital_type, TRY_CAST(value AS DOUBLE) AS value, source "
+        f"FROM (UNPIVOT {relation} ON {', '.join(VITAL_TYPES)} INTO NAME vital_type VALUE value)"
+    )
+
+
+def input_bytes(input_dir: Path) -> int:
+    """
+    Total size of the files extract_day / stage_day_sql would read for the day.
+    """
+    paths = [resolve_input_file(input_dir, name) for name in DATASETS + OPTIONAL_DATASETS]
+    return sum(path.stat().st_size for path in paths if path is not None)
+
+
+def categorical_select_sql(dataset: str, relation: str = "read_parquet(?)") -> str:
+    """
+    SELECT over read_parquet(?) (or relation) for a dataset. Its fixed-vocabulary columns are cast
+    to ENUM, so DuckDB hands them to pandas as categoricals without materializing a string per row;
+    values outside the vocabulary become nulls (as in categoricals.as_categorical).
+    """
+    columns = PARQUET_CATEGORICAL_COLUMNS.get(dataset)
+    if not columns:
+        return f"SELECT * FROM {relation}"
+    replaced = ", ".join(f"TRY_CAST({column} AS {enum_type_sql(column)}) AS {column}" for column in columns)
+    return f"SELECT * REPLACE ({replaced}) FROM {relation}"
+
+
+def read_notes_jsonl(path: Path) -> pd.DataFrame:
+    """
+    Read notes JSON Lines (plain, .gz or .zst; the codec is picked from the suffix) one line at a
+    time into column lists, so the file is never held in memory as text or as a list of dicts.
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in NOTE_COLUMNS}
+    with pa.input_stream(str(path), compression="detect") as raw, io.TextIOWrapper(raw, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for name, values in columns.items():
+                values.append(record.get(name))
+    return pd.DataFrame(columns)
 
 
 def extract_day(input_dir: Path) -> Dict[str, pd.DataFrame]:
     """
     Read the daily input folder and return raw DataFrames.
 
-    Expected files (Phase 2):
-      - patients.csv
-      - encounters.csv
-      - vitals.csv
+    Expected files (Phase 2), as .parquet or .csv:
+      - patients
+      - encounters
+      - vitals
+      - labs (optional; an empty frame is returned when the day has no labs file)
+      - notes (optional) as notes.jsonl[.gz|.zst]
+
+    Parquet files are read through DuckDB's native reader and keep their column types,
+    so no text parsing is needed (fixed-vocabulary columns arrive as categoricals); CSV files
+    are read untyped with pandas; notes are streamed line by line (read_notes_jsonl).
+    Wide vitals files (vitals_wide.*) are unpivoted by DuckDB while reading, so the vitals frame
+    has the long layout either way.
     """
     if not input_dir.exists():
         raise FileNotFoundError(f"Input folder not found: {input_dir}")
 
-    patients_path = input_dir / "patients.csv"
-    encounters_path = input_dir / "encounters.csv"
-    vitals_path = input_dir / "vitals.csv"
+    paths = {name: resolve_input_file(input_dir, name) for name in DATASETS}
 
-    missing = [str(p.name) for p in [patients_path, encounters_path, vitals_path] if not p.exists()]
+    missing = [f"{name}.csv|{name}.parquet" for name, path in paths.items() if path is None]
     if missing:
         raise FileNotFoundError(f"Missing required files in {input_dir}: {', '.join(missing)}")
 
-    patients = pd.read_csv(patients_path)
-    encounters = pd.read_csv(encounters_path)
-    vitals = pd.read_csv(vitals_path)
+    resolved = {name: path for name, path in paths.items() if path is not None}
+    for name in OPTIONAL_DATASETS:
+        path = resolve_input_file(input_dir, name)
+        if path is not None:
+            resolved[name] = path
+
+    frames: Dict[str, pd.DataFrame] = {}
+    with duckdb.connect() as conn:
+        for name, path in resolved.items():
+            if name == "notes":
+                frames[name] = read_notes_jsonl(path)
+            elif is_wide_vitals(path):
+                if path.suffix == ".parquet":
+                    wide = "read_parquet(?)"
+                else:
+                    wide = "read_csv(?, header = true, all_varchar = true)"
+                relation = f"({unpivot_vitals_sql(wide)})"
+                frames[name] = conn.execute(categorical_select_sql(name, relation), [str(path)]).df()
+            elif path.suffix == ".parquet":
+                frames[name] = conn.execute(categorical_select_sql(name), [str(path)]).df()
+            else:
+                frames[name] = pd.read_csv(path)
 
-    return {
-        "patients": patients,
-        "encounters": encounters,
-        "vitals": vitals,
-    }
+    for name, columns in EMPTY_FRAMES.items():
+        if name not in frames:
+            frames[name] = pd.DataFrame(columns=columns)
+    return frames
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import duckdb
+
+try:
+    from .vitals_rollups import refresh_vitals_rollups
+    from .vitals_wide import refresh_vitals_wide
+except ImportError:
+    from vitals_rollups import refresh_vitals_rollups
+    from vitals_wide import refresh_vitals_wide
+
+
+GOLD_TABLES = ["daily_encounter_summary"]
+
+# Served straight from curated rollups (gold_views.sql); earlier versions materialized them as tables
+GOLD_VIEWS = ["hourly_vitals_summary"]
+
+DAILY_ENCOUNTER_SUMMARY_SELECT = """
+    SELECT
+        CAST(admit_time AS DATE) AS encounter_date,
+        scenario,
+        acuity,
+        COUNT(*) AS encounter_count,
+        AVG(los_hours) AS avg_los_hours,
+        MIN(los_hours) AS min_los_hours,
+        MAX(los_hours) AS max_los_hours
+    FROM curated.fact_encounters
+    WHERE admit_time IS NOT NULL
+      {filter}
+    GROUP BY
+        CAST(admit_time AS DATE),
+        scenario,
+        acuity
+"""
+
+
+def _existing_gold_objects(conn: duckdb.DuckDBPyConnection, object_type: str) -> List[str]:
+    if object_type == "view":
+        sql = "SELECT view_name FROM duckdb_views() WHERE schema_name = 'gold' AND NOT internal"
+    else:
+        sql = "SELECT table_name FROM duckdb_tables() WHERE schema_name = 'gold'"
+    return [row[0] for row in conn.execute(sql).fetchall()]
+
+
+def bootstrap_gold(conn: duckdb.DuckDBPyConnection, gold_views_path: Path) -> None:
+    """
+    Create the materialized gold tables and the gold views from gold_views.sql.
+    Warehouses created before gold was materialized hold gold.daily_encounter_summary as a view,
+    and later ones gold.hourly_vitals_summary as a table: each is dropped and replaced by the
+    current kind. Any gold table created here is fully populated from the curated tables, so
+    existing history is covered.
+    """
+    conn.execute("CREATE SCHEMA IF NOT EXISTS gold")
+    for view_name in _existing_gold_objects(conn, "view"):
+        if view_name in GOLD_TABLES:
+            conn.execute(f"DROP VIEW gold.{view_name}")
+    for table_name in _existing_gold_objects(conn, "table"):
+        if table_name in GOLD_VIEWS:
+            conn.execute(f"DROP TABLE gold.{table_name}")
+
+    existing = set(_existing_gold_objects(conn, "table"))
+    if gold_views_path.exists():
+        gold_views_sql = gold_views_path.read_text(encoding="utf-8").strip()
+        if gold_views_sql:
+            conn.execute(gold_views_sql)
+
+    created = [name for name in GOLD_TABLES if name not in existing]
+    if created:
+        refresh_gold(conn, full=True)
+
+
+def _ensure_tracking_tables(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS gold_touched_dates (encounter_date DATE)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS gold_touched_encounters (encounter_id BIGINT)")
+    conn.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS gold_appended_vitals (
+            encounter_id BIGINT,
+            vital_type vital_type_enum,
+            event_time TIMESTAMP,
+            value DOUBLE PRECISION
+        )
+        """
+    )
+
+
+def _has_rows(conn: duckdb.DuckDBPyConnection, table: str) -> bool:
+    return conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+
+
+def track_encounter_changes(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    Record the encounter dates and encounter_ids an incremental load of encounters_df touches.
+    Must run before the load, so dates of rows about to be replaced are captured as well.
+    Accumulates until refresh_gold is called (e.g. across a backfill commit batch).
+    """
+    _ensure_tracking_tables(conn)
+    conn.execute(
+        """
+        INSERT INTO gold_touched_dates
+        SELECT CAST(admit_time AS DATE) FROM encounters_df
+        UNION
+        SELECT CAST(admit_time AS DATE) FROM curated.fact_encounters
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO gold_touched_encounters
+        SELECT DISTINCT encounter_id FROM encounters_df
+        """
+    )
+
+
+def track_vitals_changes(conn: duckdb.DuckDBPyConnection, relation: str) -> None:
+    """
+    Record the vitals appended from relation (e.g. a streamed micro-batch), so refresh_gold
+    touches only the timesteps and rollup buckets they fall into.
+    """
+    _ensure_tracking_tables(conn)
+    conn.execute(
+        f"""
+        INSERT INTO gold_appended_vitals
+        SELECT encounter_id, vital_type, event_time, value FROM {relation}
+        """
+    )
+
+
+def refresh_gold(conn: duckdb.DuckDBPyConnection, full: bool = False) -> None:
+    """
+    Refresh materialized gold tables and the derived vitals tables (wide layout, rollups;
+    gold.hourly_vitals_summary is a view over the hourly rollup).
+
+    full=True recomputes everything (replace-mode loads, first creation).
+    Otherwise only tracked partitions are recomputed: daily_encounter_summary rows for touched
+    encounter dates; curated.fact_vitals_wide and the vitals rollups for touched encounter_ids
+    (delete + re-aggregate) and, for appended vitals, only the timesteps and rollup buckets they
+    fall into. Tracking tables are cleared afterwards.
+    Runs in the caller's transaction.
+    """
+    _ensure_tracking_tables(conn)
+    if full:
+        refresh_vitals_wide(conn)
+        refresh_vitals_rollups(conn)
+        conn.execute("DELETE FROM gold.daily_encounter_summary")
+        conn.execute(
+            "INSERT INTO gold.daily_encounter_summary "
+            + DAILY_ENCOUNTER_SUMMARY_SELECT.format(filter="")
+        )
+    else:
+        encounters = "gold_touched_encounters" if _has_rows(conn, "gold_touched_encounters") else None
+        appended = "gold_appended_vitals" if _has_rows(conn, "gold_appended_vitals") else None
+        if encounters is not None or appended is not None:
+            refresh_vitals_wide(conn, encounters=encounters, appended=appended)
+            refresh_vitals_rollups(conn, encounters=encounters, appended=appended)
+        conn.execute(
+            """
+            DELETE FROM gold.daily_encounter_summary
+            WHERE encounter_date IN (SELECT encounter_date FROM gold_touched_dates)
+            """
+        )
+        conn.execute(
+            "INSERT INTO gold.daily_encounter_summary "
+            + DAILY_ENCOUNTER_SUMMARY_SELECT.format(
+                filter="AND CAST(admit_time AS DATE) IN (SELECT encounter_date FROM gold_touched_dates)"
+            )
+        )
+
+    conn.execute("DELETE FROM gold_touched_dates")
+    conn.execute("DELETE FROM gold_touched_encounters")
+    conn.execute("DELETE FROM gold_appended_vitals")
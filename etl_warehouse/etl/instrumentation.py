@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, TypedDict
+
+import duckdb
+import pandas as pd
+
+
+STAGE_FIELDS = [
+    "run_id",
+    "day",
+    "stage",
+    "engine",
+    "load_mode",
+    "status",
+    "started_at",
+    "wall_s",
+    "cpu_s",
+    "peak_rss_bytes",
+    "rows_in",
+    "rows_out",
+    "bytes_read",
+]
+
+
+class StageCounters(TypedDict):
+    rows_in: int
+    rows_out: int
+    bytes_read: int
+
+
+class StageRecord(TypedDict):
+    run_id: str
+    day: Optional[str]
+    stage: str
+    engine: str
+    load_mode: str
+    status: str
+    started_at: str
+    wall_s: float
+    cpu_s: float
+    peak_rss_bytes: int
+    rows_in: int
+    rows_out: int
+    bytes_read: int
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of the current process so far (ru_maxrss is KiB on Linux, bytes on macOS).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def frame_rows(frames: Dict[str, pd.DataFrame]) -> int:
+    return sum(len(frame) for frame in frames.values())
+
+
+@contextmanager
+def measure_stage(
+    records: List[StageRecord],
+    stage: str,
+    day: Optional[str] = None,
+    rows_in: int = 0,
+    bytes_read: int = 0,
+) -> Iterator[StageCounters]:
+    """
+    Time the wrapped block and append one StageRecord to records (also when it raises, with
+    status "failed"). The yielded counters can be updated inside the block (e.g. rows_out).
+    CPU time is process-wide, so it includes DuckDB worker threads; peak RSS is the process
+    high-water mark at the end of the stage. run_id/engine/load_mode are filled in by RunRecorder.
+    """
+    counters: StageCounters = {"rows_in": rows_in, "rows_out": 0, "bytes_read": bytes_read}
+    started_at = datetime.now(timezone.utc).isoformat()
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    status = "failed"
+    try:
+        yield counters
+        status = "ok"
+    finally:
+        records.append(
+            {
+                "run_id": "",
+                "day": day,
+                "stage": stage,
+                "engine": "",
+                "load_mode": "",
+                "status": status,
+                "started_at": started_at,
+                "wall_s": time.perf_counter() - wall_started,
+                "cpu_s": time.process_time() - cpu_started,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "rows_in": int(counters["rows_in"]),
+                "rows_out": int(counters["rows_out"]),
+                "bytes_read": int(counters["bytes_read"]),
+            }
+        )
+
+
+class RunRecorder:
+    """
+    Collects per-stage metrics for one ETL run.
+
+    Every finished stage is appended to jsonl_path (one JSON object per line) as soon as it ends,
+    so a run that dies midway still leaves its completed stages behind; persist() writes the
+    collected records to ops.etl_runs.
+    """
+
+    def __init__(self, engine: str = "pandas", load_mode: str = "replace", jsonl_path: Optional[Path] = None) -> None:
+        self.run_id = uuid.uuid4().hex
+        self.engine = engine
+        self.load_mode = load_mode
+        self.jsonl_path = jsonl_path
+        self.records: List[StageRecord] = []
+        self.persisted = 0
+        self.quality_records: List[Dict[str, Any]] = []
+        if jsonl_path is not None:
+            jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stage(
+        self,
+        stage: str,
+        day: Optional[str] = None,
+        rows_in: int = 0,
+        bytes_read: int = 0,
+    ) -> Iterator[StageCounters]:
+        finished: List[StageRecord] = []
+        try:
+            with measure_stage(finished, stage, day=day, rows_in=rows_in, bytes_read=bytes_read) as counters:
+                yield counters
+        finally:
+            self.add(finished)
+
+    def add(self, records: List[StageRecord]) -> None:
+        """
+        Adopt records measured elsewhere (e.g. returned by a worker process) into this run.
+        """
+        for record in records:
+            record["run_id"] = self.run_id
+            record["engine"] = self.engine
+            record["load_mode"] = self.load_mode
+            self.records.append(record)
+            if self.jsonl_path is not None:
+                with self.jsonl_path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def add_quality(self, results: Iterable[Mapping[str, Any]], day: Optional[str] = None) -> None:
+        """
+        Keep data quality check results (quality/checks.py) of this run, tagged with run_id and day,
+        so they can be recorded in quality.results even when the load they checked is rolled back.
+        """
+        for result in results:
+            self.quality_records.append({"run_id": self.run_id, "day": day, **result})
+
+    def persist(self, conn: duckdb.DuckDBPyConnection) -> int:
+        """
+        Insert records not yet persisted into ops.etl_runs. Returns number of rows inserted.
+        """
+        pending = self.records[self.persisted:]
+        if pending:
+            conn.executemany(
+                f"INSERT INTO ops.etl_runs ({', '.join(STAGE_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in STAGE_FIELDS)})",
+                [[record[field] for field in STAGE_FIELDS] for record in pending],
+            )
+            self.persisted = len(self.records)
+        return len(pending)
+
+    def summary(self) -> str:
+        """
+        One line per stage name: total wall/CPU seconds and max peak RSS across days.
+        """
+        totals: Dict[str, List[float]] = {}
+        for record in self.records:
+            wall, cpu, rss = totals.setdefault(record["stage"], [0.0, 0.0, 0.0])
+            totals[record["stage"]] = [wall + record["wall_s"], cpu + record["cpu_s"], max(rss, record["peak_rss_bytes"])]
+        return "\n".join(
+            f"  {stage:<16} wall={wall:.2f}s cpu={cpu:.2f}s peak_rss={rss / 1e6:.0f}MB"
+            for stage, (wall, cpu, rss) in totals.items()
+        )
@@ -1,113 +1,595 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Optional
 import duckdb
 import pandas as pd
 
+try:
+    from .gold import refresh_gold, track_encounter_changes
+    from .instrumentation import RunRecorder
+    from .manifest import DayManifest, record_manifest
+    from .note_search import refresh_note_index
+    from .risk_scores import refresh_risk_scores
+    from .quality_checks import format_result, raise_on_failures, run_checks
+    from .session import WarehouseSession, session_scope
+except ImportError:
+    from gold import refresh_gold, track_encounter_changes
+    from instrumentation import RunRecorder
+    from manifest import DayManifest, record_manifest
+    from note_search import refresh_note_index
+    from risk_scores import refresh_risk_scores
+    from quality_checks import format_result, raise_on_failures, run_checks
+    from session import WarehouseSession, session_scope
 
-def load_day(staged_data: Dict[str, pd.DataFrame], db_path: Path, schema_path: Path) -> None:
-    patients = staged_data["patients"]
-    encounters = staged_data["encounters"]
+LOAD_MODES = ["replace", "incremental"]
 
-    db_path.parent.mkdir(parents=True, exist_ok=True)
+STAGED_RELATIONS = ["patients_df", "encounters_df", "vitals_df", "labs_df", "notes_df"]
 
-    with duckdb.connect(str(db_path)) as conn:
-        if schema_path.exists():
-            schema_sql = schema_path.read_text(encoding="utf-8").strip()
-            if schema_sql:
-                conn.execute(schema_sql)
+# Quality checks after a load cover only the keys staged for the day: dataset -> (key column, relation)
+CHECK_SCOPES = {
+    "patients": ("patient_id", "patients_df"),
+    "encounters": ("encounter_id", "encounters_df"),
+    "vitals": ("encounter_id", "encounters_df"),
+    "labs": ("encounter_id", "encounters_df"),
+    "notes": ("encounter_id", "encounters_df"),
+}
 
-        conn.register("patients_df", patients)
-        conn.register("encounters_df", encounters)
 
-        conn.execute(
-            """
-            CREATE SCHEMA IF NOT EXISTS raw
-            """
-        )
-        conn.execute(
-            """
-            CREATE SCHEMA IF NOT EXISTS curated
-            """
-        )
-        conn.execute(
-            """
-            CREATE OR REPLACE TABLE raw.patients AS
-            SELECT * FROM patients_df
-            """
-        )
-        conn.execute(
-            """
-            CREATE OR REPLACE TABLE raw.encounters AS
-            SELECT * FROM encounters_df
-            """
-        )
-        conn.execute(
-            """
-            CREATE OR REPLACE TABLE curated.dim_patients AS
-            SELECT
-                patient_id,
-                age,
-                sex
-            FROM raw.patients
-            """
-        )
-        conn.execute(
-            """
-            CREATE OR REPLACE TABLE curated.fact_encounters AS
-            SELECT
-                encounter_id,
-                patient_id,
-                admit_time,
-                discharge_time,
-                scenario,
-                acuity,
-                los_hours
-            FROM raw.encounters
-            """
+def _load_replace(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    Rebuild raw/curated tables from the registered day frames (warehouse holds only this day).
+    """
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE raw.patients AS
+        SELECT
+            patient_id,
+            age,
+            CAST(sex AS sex_enum) AS sex
+        FROM patients_df
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE raw.encounters AS
+        SELECT
+            encounter_id,
+            patient_id,
+            admit_time,
+            discharge_time,
+            CAST(scenario AS scenario_enum) AS scenario,
+            CAST(acuity AS acuity_enum) AS acuity,
+            los_hours
+        FROM encounters_df
+        ORDER BY admit_time, encounter_id
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE curated.dim_patients AS
+        SELECT
+            patient_id,
+            age,
+            sex
+        FROM raw.patients
+        ORDER BY patient_id
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE curated.fact_encounters AS
+        SELECT
+            encounter_id,
+            patient_id,
+            admit_time,
+            discharge_time,
+            scenario,
+            acuity,
+            los_hours
+        FROM raw.encounters
+        ORDER BY admit_time, encounter_id
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE raw.vitals AS
+        SELECT
+            encounter_id,
+            patient_id,
+            event_time,
+            CAST(vital_type AS vital_type_enum) AS vital_type,
+            value,
+            CAST(source AS vital_source_enum) AS source
+        FROM vitals_df
+        ORDER BY CAST(event_time AS DATE), encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE curated.fact_vitals AS
+        SELECT
+            encounter_id,
+            patient_id,
+            CAST(event_time AS DATE) AS event_date,
+            event_time,
+            vital_type,
+            value,
+            source
+        FROM raw.vitals
+        ORDER BY event_date, encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE raw.labs AS
+        SELECT
+            lab_event_id,
+            encounter_id,
+            patient_id,
+            event_time,
+            test_name,
+            value,
+            unit
+        FROM labs_df
+        ORDER BY CAST(event_time AS DATE), encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE curated.fact_labs AS
+        SELECT
+            lab_event_id,
+            encounter_id,
+            patient_id,
+            CAST(event_time AS DATE) AS event_date,
+            event_time,
+            test_name,
+            value,
+            unit
+        FROM raw.labs
+        ORDER BY event_date, encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE raw.notes AS
+        SELECT
+            note_id,
+            encounter_id,
+            patient_id,
+            note_time,
+            note_type,
+            text
+        FROM notes_df
+        ORDER BY CAST(note_time AS DATE), encounter_id, note_time
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TABLE curated.fact_notes AS
+        SELECT
+            note_id,
+            encounter_id,
+            patient_id,
+            CAST(note_time AS DATE) AS note_date,
+            note_time,
+            note_type,
+            text
+        FROM raw.notes
+        ORDER BY note_date, encounter_id, note_time
+        """
+    )
+
+
+def _load_incremental(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    Upsert the registered day frames into the existing tables, keyed on patient_id/encounter_id.
+    Rows for keys present in the day are deleted and re-inserted, so re-running a day is idempotent
+    and history from other days is kept. Vitals, labs and notes are replaced per encounter of the day.
+    """
+    conn.execute(
+        """
+        DELETE FROM raw.patients
+        WHERE patient_id IN (SELECT patient_id FROM patients_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO raw.patients
+        SELECT patient_id, age, sex FROM patients_df
+        ORDER BY patient_id
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM raw.encounters
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO raw.encounters
+        SELECT
+            encounter_id,
+            patient_id,
+            admit_time,
+            discharge_time,
+            scenario,
+            acuity,
+            los_hours
+        FROM encounters_df
+        ORDER BY admit_time, encounter_id
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM curated.dim_patients
+        WHERE patient_id IN (SELECT patient_id FROM patients_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO curated.dim_patients
+        SELECT
+            patient_id,
+            age,
+            sex
+        FROM patients_df
+        ORDER BY patient_id
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM curated.fact_encounters
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO curated.fact_encounters
+        SELECT
+            encounter_id,
+            patient_id,
+            admit_time,
+            discharge_time,
+            scenario,
+            acuity,
+            los_hours
+        FROM encounters_df
+        ORDER BY admit_time, encounter_id
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM raw.vitals
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO raw.vitals
+        SELECT
+            encounter_id,
+            patient_id,
+            event_time,
+            vital_type,
+            value,
+            source
+        FROM vitals_df
+        ORDER BY CAST(event_time AS DATE), encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM curated.fact_vitals
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO curated.fact_vitals
+        SELECT
+            encounter_id,
+            patient_id,
+            CAST(event_time AS DATE) AS event_date,
+            event_time,
+            vital_type,
+            value,
+            source
+        FROM vitals_df
+        ORDER BY event_date, encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM raw.labs
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO raw.labs
+        SELECT
+            lab_event_id,
+            encounter_id,
+            patient_id,
+            event_time,
+            test_name,
+            value,
+            unit
+        FROM labs_df
+        ORDER BY CAST(event_time AS DATE), encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM curated.fact_labs
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO curated.fact_labs
+        SELECT
+            lab_event_id,
+            encounter_id,
+            patient_id,
+            CAST(event_time AS DATE) AS event_date,
+            event_time,
+            test_name,
+            value,
+            unit
+        FROM labs_df
+        ORDER BY event_date, encounter_id, event_time
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM raw.notes
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO raw.notes
+        SELECT
+            note_id,
+            encounter_id,
+            patient_id,
+            note_time,
+            note_type,
+            text
+        FROM notes_df
+        ORDER BY CAST(note_time AS DATE), encounter_id, note_time
+        """
+    )
+    conn.execute(
+        """
+        DELETE FROM curated.fact_notes
+        WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO curated.fact_notes
+        SELECT
+            note_id,
+            encounter_id,
+            patient_id,
+            CAST(note_time AS DATE) AS note_date,
+            note_time,
+            note_type,
+            text
+        FROM notes_df
+        ORDER BY note_date, encounter_id, note_time
+        """
+    )
+
+
+def apply_indexes(conn: duckdb.DuckDBPyConnection, schema_path: Path) -> None:
+    """
+    Create the indexes from indexes.sql (next to schema.sql) if missing.
+    Run after replace loads (CREATE OR REPLACE TABLE drops a table's indexes) and once after a
+    backfill: building an ART index once over loaded data is cheaper than maintaining it row by row.
+    """
+    indexes_path = schema_path.with_name("indexes.sql")
+    if indexes_path.exists():
+        indexes_sql = indexes_path.read_text(encoding="utf-8").strip()
+        if indexes_sql:
+            conn.execute(indexes_sql)
+
+
+def drop_indexes(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    Drop all raw/curated indexes ahead of a multi-day bulk load (backfill); apply_indexes rebuilds
+    them afterwards. Single-day incremental loads keep the indexes in place.
+    """
+    indexes = conn.execute(
+        """
+        SELECT schema_name, index_name FROM duckdb_indexes()
+        WHERE schema_name IN ('raw', 'curated')
+        """
+    ).fetchall()
+    for schema_name, index_name in indexes:
+        conn.execute(f"DROP INDEX {schema_name}.{index_name}")
+
+
+def _fetch_count(conn: duckdb.DuckDBPyConnection, sql: str) -> int:
+    row = conn.execute(sql).fetchone()
+    if row is None:
+        raise RuntimeError("Failed to fetch row counts from DuckDB.")
+    return int(row[0])
+
+
+def write_staged_day(
+    conn: duckdb.DuckDBPyConnection,
+    mode: str = "replace",
+    recorder: Optional[RunRecorder] = None,
+    day: Optional[str] = None,
+    manifest: Optional[DayManifest] = None,
+) -> Dict[str, int]:
+    """
+    Write the day visible on conn as relations patients_df / encounters_df / vitals_df / labs_df /
+    notes_df (registered DataFrames or DuckDB temp tables), validate it and refresh the gold tables,
+    note search index and risk scores it touches. The caller owns the transaction. Returns the
+    validated row counts for the day. Stages load_write / load_checks / gold_refresh / note_index /
+    risk_scores are recorded on recorder when given. The day's input files (manifest) are recorded in
+    ops.ingest_manifest in the same transaction.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode} (expected one of {', '.join(LOAD_MODES)})")
+
+    if recorder is None:
+        recorder = RunRecorder(load_mode=mode)
+
+    staged_rows = sum(_fetch_count(conn, f"SELECT COUNT(*) FROM {name}") for name in STAGED_RELATIONS)
+    with recorder.stage("load_write", day=day, rows_in=staged_rows) as stage:
+        if mode == "incremental":
+            track_encounter_changes(conn)
+            _load_incremental(conn)
+        else:
+            _load_replace(conn)
+        stage["rows_out"] = staged_rows
+
+    with recorder.stage("load_checks", day=day, rows_in=staged_rows) as stage:
+        # One scan per curated table, scoped to the day's keys (whole tables in replace mode)
+        report = run_checks(conn, scopes=CHECK_SCOPES)
+        recorder.add_quality(report["results"], day=day)
+        for result in report["results"]:
+            if result["status"] == "warn":
+                print(f"quality: WARN {format_result(result)}")
+        raise_on_failures(report)
+
+        counts = {
+            "patients": report["row_counts"]["patients"],
+            "unique_raw_patients": report["raw_row_counts"]["patients"],
+            "encounters": report["row_counts"]["encounters"],
+            "raw_encounters": report["raw_row_counts"]["encounters"],
+            "vitals": report["row_counts"]["vitals"],
+            "raw_vitals": report["raw_row_counts"]["vitals"],
+            "labs": report["row_counts"]["labs"],
+            "raw_labs": report["raw_row_counts"]["labs"],
+            "notes": report["row_counts"]["notes"],
+            "raw_notes": report["raw_row_counts"]["notes"],
+        }
+        stage["rows_out"] = sum(counts[name] for name in ("patients", "encounters", "vitals", "labs", "notes"))
+
+    with recorder.stage("gold_refresh", day=day):
+        refresh_gold(conn, full=mode == "replace")
+
+    with recorder.stage("note_index", day=day, rows_in=counts["notes"]) as stage:
+        stage["rows_out"] = refresh_note_index(conn, full=mode == "replace")
+
+    with recorder.stage("risk_scores", day=day, rows_in=counts["vitals"]) as stage:
+        stage["rows_out"] = refresh_risk_scores(conn, encounters=None if mode == "replace" else "encounters_df")
+
+    record_manifest(conn, manifest, mode, recorder.run_id)
+    return counts
+
+
+def write_day(
+    conn: duckdb.DuckDBPyConnection,
+    staged_data: Dict[str, pd.DataFrame],
+    mode: str = "replace",
+    recorder: Optional[RunRecorder] = None,
+    day: Optional[str] = None,
+    manifest: Optional[DayManifest] = None,
+) -> Dict[str, int]:
+    """
+    Write one staged day (pandas frames) on an open connection and validate it.
+    The caller owns the transaction, so several days can be committed together.
+    Returns the validated row counts for the day.
+    """
+    conn.register("patients_df", staged_data["patients"])
+    conn.register("encounters_df", staged_data["encounters"])
+    conn.register("vitals_df", staged_data["vitals"])
+    conn.register("labs_df", staged_data["labs"])
+    conn.register("notes_df", staged_data["notes"])
+    try:
+        return write_staged_day(conn, mode=mode, recorder=recorder, day=day, manifest=manifest)
+    finally:
+        for name in STAGED_RELATIONS:
+            conn.unregister(name)
+
+
+def commit_day(
+    conn: duckdb.DuckDBPyConnection,
+    schema_path: Path,
+    write: Callable[[], Dict[str, int]],
+    recorder: RunRecorder,
+    mode: str = "replace",
+    day: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Run write() in one transaction on conn. Returns write()'s row counts.
+    Incremental loads maintain the (non-unique) indexes in place, so their cost scales with the day.
+    A replace load recreates the tables, which drops their indexes: they are rebuilt over the
+    loaded day once it is committed (a rollback restores the previous tables with their indexes).
+    """
+    conn.begin()
+    try:
+        counts = write()
+        with recorder.stage("commit", day=day):
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if mode == "replace":
+        with recorder.stage("index_rebuild", day=day):
+            apply_indexes(conn, schema_path)
+    return counts
+
+
+def load_day(
+    staged_data: Dict[str, pd.DataFrame],
+    db_path: Path,
+    schema_path: Path,
+    mode: str = "replace",
+    recorder: Optional[RunRecorder] = None,
+    day: Optional[str] = None,
+    session: Optional[WarehouseSession] = None,
+    manifest: Optional[DayManifest] = None,
+) -> None:
+    """
+    Load one staged day into DuckDB.
+
+    mode="replace" rebuilds raw/curated tables from the day (previous days are dropped).
+    mode="incremental" upserts the day's patients/encounters/vitals/labs/notes into existing tables, so cost
+    scales with the day rather than the history and re-running a day is idempotent.
+    Validation checks are scoped to the keys loaded for the day in both modes.
+    Incremental loads keep the indexes in place; a replace load rebuilds them from indexes.sql once committed.
+    Uses session's connection when given, otherwise opens a session for this call.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode} (expected one of {', '.join(LOAD_MODES)})")
+    if recorder is None:
+        recorder = RunRecorder(load_mode=mode)
+
+    with session_scope(session, db_path, schema_path) as active:
+        conn = active.conn
+        counts = commit_day(
+            conn,
+            active.schema_path,
+            lambda: write_day(conn, staged_data, mode=mode, recorder=recorder, day=day, manifest=manifest),
+            recorder,
+            mode=mode,
+            day=day,
         )
 
-        gold_views_path = schema_path.with_name("gold_views.sql")
-        if gold_views_path.exists():
-            gold_views_sql = gold_views_path.read_text(encoding="utf-8").strip()
-            if gold_views_sql:
-                conn.execute("DROP VIEW IF EXISTS gold.daily_encounter_summary")
-                conn.execute(gold_views_sql)
-
-        patients_row = conn.execute("SELECT COUNT(*) FROM curated.dim_patients").fetchone()
-        encounters_row = conn.execute("SELECT COUNT(*) FROM curated.fact_encounters").fetchone()
-        unique_patients_row = conn.execute("SELECT COUNT(DISTINCT patient_id) FROM raw.patients").fetchone()
-        raw_encounters_row = conn.execute("SELECT COUNT(*) FROM raw.encounters").fetchone()
-
-        if (
-            patients_row is None
-            or encounters_row is None
-            or unique_patients_row is None
-            or raw_encounters_row is None
-        ):
-            raise RuntimeError("Failed to fetch row counts from DuckDB.")
-        patients_count = int(patients_row[0])
-        encounters_count = int(encounters_row[0])
-        unique_patients_count = int(unique_patients_row[0])
-        raw_encounters_count = int(raw_encounters_row[0])
-
-        if patients_count != unique_patients_count:
-            raise ValueError(
-                "Validation failed: curated.dim_patients count does not match unique raw patient_id count."
-            )
-        if encounters_count != raw_encounters_count:
-            raise ValueError(
-                "Validation failed: curated.fact_encounters count does not match raw.encounters row count."
-            )
-
-    print(f"load_day: wrote DuckDB file -> {db_path}")
+    print(f"load_day: wrote DuckDB file -> {active.db_path} (mode={mode})")
     print(
-        f"load_day: curated.dim_patients rows={patients_count}, "
-        f"curated.fact_encounters rows={encounters_count}"
+        f"load_day: curated.dim_patients rows={counts['patients']}, "
+        f"curated.fact_encounters rows={counts['encounters']}, "
+        f"curated.fact_vitals rows={counts['vitals']}, "
+        f"curated.fact_labs rows={counts['labs']}, "
+        f"curated.fact_notes rows={counts['notes']}"
     )
     print(
         f"load_day: validation passed "
-        f"(dim_patients={patients_count} == unique_raw_patients={unique_patients_count}, "
-        f"fact_encounters={encounters_count} == raw_encounters={raw_encounters_count})"
+        f"(dim_patients={counts['patients']} == unique_raw_patients={counts['unique_raw_patients']}, "
+        f"fact_encounters={counts['encounters']} == raw_encounters={counts['raw_encounters']}, "
+        f"fact_vitals={counts['vitals']} == raw_vitals={counts['raw_vitals']}, "
+        f"fact_labs={counts['labs']} == raw_labs={counts['raw_labs']}, "
+        f"fact_notes={counts['notes']} == raw_notes={counts['raw_notes']})"
     )
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+import duckdb
+
+try:
+    from .extract import DATASETS, OPTIONAL_DATASETS, resolve_input_file
+except ImportError:
+    from extract import DATASETS, OPTIONAL_DATASETS, resolve_input_file
+
+
+# Files whose content determines what a load writes (relative to etl_warehouse/); any change to
+# them changes pipeline_version(), so every day is reloaded once by the next run.
+PIPELINE_FILES = ["etl/*.py", "sql/*.sql", "quality/*.py", "schemas/*.json"]
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+class InputFile(TypedDict):
+    file_name: str
+    size_bytes: int
+    mtime_ns: int
+    content_hash: str
+
+
+class DayManifest(TypedDict):
+    source: str
+    day: str
+    pipeline_version: str
+    files: List[InputFile]
+
+
+@lru_cache(maxsize=1)
+def pipeline_version() -> str:
+    """
+    sha256 over the relative paths and contents of PIPELINE_FILES (computed once per process).
+    """
+    root = Path(__file__).resolve().parents[1]
+    digest = hashlib.sha256()
+    paths = sorted({path for pattern in PIPELINE_FILES for path in root.glob(pattern)})
+    for path in paths:
+        digest.update(path.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _recorded_files(conn: duckdb.DuckDBPyConnection, source: str, day: str) -> Dict[str, Tuple[int, int, str]]:
+    rows = conn.execute(
+        "SELECT file_name, size_bytes, mtime_ns, content_hash FROM ops.ingest_manifest WHERE source = ? AND day = ?",
+        [source, day],
+    ).fetchall()
+    return {row[0]: (int(row[1]), int(row[2]), row[3]) for row in rows}
+
+
+def fingerprint_day(conn: duckdb.DuckDBPyConnection, source: str, input_dir: Path) -> DayManifest:
+    """
+    Fingerprint the files the ETL would read for the day (extract.resolve_input_file).
+    A file whose size and mtime match its manifest row keeps the recorded hash; other files are
+    hashed (sha256), so a rerun over untouched inputs reads no file content.
+    """
+    day = input_dir.name
+    recorded = _recorded_files(conn, source, day)
+    files: List[InputFile] = []
+    for dataset in DATASETS + OPTIONAL_DATASETS:
+        path = resolve_input_file(input_dir, dataset)
+        if path is None:
+            continue
+        stat = path.stat()
+        previous = recorded.get(path.name)
+        if previous is not None and previous[:2] == (stat.st_size, stat.st_mtime_ns):
+            content_hash = previous[2]
+        else:
+            content_hash = _file_sha256(path)
+        files.append(
+            {
+                "file_name": path.name,
+                "size_bytes": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "content_hash": content_hash,
+            }
+        )
+    return {"source": source, "day": day, "pipeline_version": pipeline_version(), "files": files}
+
+
+def unchanged_since(conn: duckdb.DuckDBPyConnection, manifest: DayManifest, mode: str) -> Optional[datetime]:
+    """
+    When the warehouse already holds the day loaded from the same file contents by the same
+    pipeline version, return when it was loaded; otherwise None.
+    A replace load additionally requires that the manifest holds nothing but this day
+    (i.e. the last replace load was this day and nothing was loaded on top of it).
+    """
+    rows = conn.execute(
+        """
+        SELECT source, day, file_name, content_hash, pipeline_version, loaded_at
+        FROM ops.ingest_manifest
+        WHERE ? = 'replace' OR (source = ? AND day = ?)
+        """,
+        [mode, manifest["source"], manifest["day"]],
+    ).fetchall()
+    if not rows or not manifest["files"]:
+        return None
+    if any((row[0], row[1]) != (manifest["source"], manifest["day"]) for row in rows):
+        return None
+    if any(row[4] != manifest["pipeline_version"] for row in rows):
+        return None
+    recorded = {(row[2], row[3]) for row in rows}
+    current = {(entry["file_name"], entry["content_hash"]) for entry in manifest["files"]}
+    if recorded != current:
+        return None
+    return max(row[5] for row in rows)
+
+
+def record_manifest(
+    conn: duckdb.DuckDBPyConnection,
+    manifest: Optional[DayManifest],
+    mode: str,
+    run_id: str,
+) -> int:
+    """
+    Record the day's input files in ops.ingest_manifest (within the load's transaction, so the
+    manifest only describes committed loads). A replace load drops every previous row first, since
+    the days they describe are no longer in the warehouse. Returns the rows recorded.
+    """
+    if mode == "replace":
+        conn.execute("DELETE FROM ops.ingest_manifest")
+    if manifest is None:
+        return 0
+    conn.execute(
+        "DELETE FROM ops.ingest_manifest WHERE source = ? AND day = ?",
+        [manifest["source"], manifest["day"]],
+    )
+    if not manifest["files"]:
+        return 0
+    conn.executemany(
+        """
+        INSERT INTO ops.ingest_manifest
+            (source, day, file_name, size_bytes, mtime_ns, content_hash, pipeline_version, load_mode, run_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            [
+                manifest["source"],
+                manifest["day"],
+                entry["file_name"],
+                entry["size_bytes"],
+                entry["mtime_ns"],
+                entry["content_hash"],
+                manifest["pipeline_version"],
+                mode,
+                run_id,
+            ]
+            for entry in manifest["files"]
+        ],
+    )
+    return len(manifest["files"])
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from pathlib import Path
+from typing import List, Set, Tuple
+
+import duckdb
+
+try:
+    from .categoricals import bootstrap_categorical_types
+    from .gold import bootstrap_gold
+    from .note_search import bootstrap_note_index
+    from .risk_scores import bootstrap_risk_scores
+    from .vitals_rollups import bootstrap_vitals_rollups
+    from .vitals_wide import bootstrap_vitals_wide
+except ImportError:
+    from categoricals import bootstrap_categorical_types
+    from gold import bootstrap_gold
+    from note_search import bootstrap_note_index
+    from risk_scores import bootstrap_risk_scores
+    from vitals_rollups import bootstrap_vitals_rollups
+    from vitals_wide import bootstrap_vitals_wide
+
+
+# Applied in order. Each file is idempotent DDL (CREATE ... IF NOT EXISTS), so a changed file is
+# simply re-applied; categorical_types.sql goes through bootstrap_categorical_types (ENUM types used by the
+# other files + conversion of existing VARCHAR columns), vitals_wide.sql through bootstrap_vitals_wide
+# (initial pivot of existing vitals, ahead of risk_scores, which reads it), vitals_rollups.sql through
+# bootstrap_vitals_rollups (initial rollup build, ahead of gold, which reads the hourly rollup), gold_views.sql
+# through bootstrap_gold (view migration + initial refresh), note_search.sql through bootstrap_note_index
+# (initial index build over existing notes), risk_scores.sql through bootstrap_risk_scores (initial scoring
+# of existing vitals) and indexes.sql after drop_defined_indexes
+# (outside the transaction, so indexes whose definition changed are recreated).
+MIGRATIONS = [
+    "categorical_types.sql",
+    "schema.sql",
+    "vitals_wide.sql",
+    "vitals_rollups.sql",
+    "gold_views.sql",
+    "note_search.sql",
+    "risk_scores.sql",
+    "indexes.sql",
+]
+
+MIGRATIONS_TABLE_SQL = """
+    CREATE SCHEMA IF NOT EXISTS ops;
+    CREATE TABLE IF NOT EXISTS ops.schema_migrations (
+        name VARCHAR,
+        checksum VARCHAR,
+        applied_at TIMESTAMP DEFAULT current_timestamp
+    );
+"""
+
+
+def _checksum(sql: str) -> str:
+    return hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+
+def _applied(conn: duckdb.DuckDBPyConnection) -> Set[Tuple[str, str]]:
+    return {(row[0], row[1]) for row in conn.execute("SELECT name, checksum FROM ops.schema_migrations").fetchall()}
+
+
+def apply_migrations(conn: duckdb.DuckDBPyConnection, sql_dir: Path) -> List[str]:
+    """
+    Apply the DDL files in MIGRATIONS (from sql_dir) whose current content has not been applied yet.
+    Every application is recorded in ops.schema_migrations as (name, sha256 checksum), so an
+    unchanged warehouse costs one small SELECT. Returns the names of the files applied.
+    """
+    conn.execute(MIGRATIONS_TABLE_SQL)
+    applied = _applied(conn)
+
+    newly_applied: List[str] = []
+    for name in MIGRATIONS:
+        path = sql_dir / name
+        if not path.exists():
+            continue
+        sql = path.read_text(encoding="utf-8").strip()
+        checksum = _checksum(sql)
+        if not sql or (name, checksum) in applied:
+            continue
+
+        if name == "indexes.sql":
+            # DuckDB cannot recreate an index dropped in the same transaction
+            drop_defined_indexes(conn, sql)
+
+        conn.begin()
+        try:
+            if name == "categorical_types.sql":
+                bootstrap_categorical_types(conn, path)
+            elif name == "vitals_wide.sql":
+                bootstrap_vitals_wide(conn, path)
+            elif name == "vitals_rollups.sql":
+                bootstrap_vitals_rollups(conn, path)
+            elif name == "gold_views.sql":
+                bootstrap_gold(conn, path)
+            elif name == "note_search.sql":
+                bootstrap_note_index(conn, path)
+            elif name == "risk_scores.sql":
+                bootstrap_risk_scores(conn, path)
+            else:
+                conn.execute(sql)
+            conn.execute("INSERT INTO ops.schema_migrations (name, checksum) VALUES (?, ?)", [name, checksum])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        newly_applied.append(name)
+    return newly_applied
+
+
+def drop_defined_indexes(conn: duckdb.DuckDBPyConnection, indexes_sql: str) -> None:
+    """
+    Drop the raw/curated indexes named in indexes_sql, so a changed definition (earlier versions
+    created them UNIQUE) is recreated when the file is applied.
+    """
+    names = set(re.findall(r"INDEX\s+IF\s+NOT\s+EXISTS\s+(\w+)", indexes_sql, re.IGNORECASE))
+    for schema_name, index_name in conn.execute(
+        """
+        SELECT schema_name, index_name FROM duckdb_indexes()
+        WHERE database_name = current_database() AND schema_name IN ('raw', 'curated')
+        """
+    ).fetchall():
+        if index_name in names:
+            conn.execute(f"DROP INDEX {schema_name}.{index_name}")
+
+
+def bootstrap_warehouse(conn: duckdb.DuckDBPyConnection, schema_path: Path) -> None:
+    """
+    Bring the warehouse up to date with the MIGRATIONS files next to schema.sql,
+    applying only files that are new or changed since they were last applied. After a migration,
+    indexes.sql is re-applied (CREATE ... IF NOT EXISTS) for indexes a migration had to drop.
+    """
+    applied = apply_migrations(conn, schema_path.parent)
+    if applied:
+        print(f"bootstrap_warehouse: applied {', '.join(applied)}")
+        indexes_path = schema_path.with_name("indexes.sql")
+        if indexes_path.exists():
+            indexes_sql = indexes_path.read_text(encoding="utf-8").strip()
+            if indexes_sql:
+                conn.execute(indexes_sql)
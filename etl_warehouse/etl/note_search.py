@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import argparse
+import math
+import re
+from pathlib import Path
+from typing import List, Optional, TypedDict
+
+import duckdb
+
+
+NOTE_INDEX_TABLES = ["note_terms", "note_documents", "note_postings"]
+
+# Tokens are maximal runs of [a-z0-9] in the lowercased text; the same rule is applied in SQL
+# (index build) and in Python (query parsing), so both sides agree on what a term is.
+TOKEN_SPLIT_PATTERN = "[^a-z0-9]+"
+MIN_TOKEN_LENGTH = 2
+STOPWORDS = [
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "if", "in", "is", "it",
+    "no", "of", "on", "or", "the", "to", "with", "without",
+]
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+DEFAULT_SEARCH_LIMIT = 20
+
+NOTE_TOKENS_SELECT = """
+    SELECT note_id, encounter_id, term
+    FROM (
+        SELECT
+            note_id,
+            encounter_id,
+            unnest(string_split_regex(lower(text), '{pattern}')) AS term
+        FROM curated.fact_notes
+        WHERE text IS NOT NULL
+          {filter}
+    )
+    WHERE length(term) >= {min_length}
+      AND term NOT IN ({stopwords})
+"""
+
+# Postings carry the note's token_count, so scoring reads only the postings of the query terms.
+# {idf} is a CASE over term_id with the per-term IDF computed from NOTE_STATS_SQL / NOTE_DOC_FREQ_SQL.
+NOTE_SEARCH_SQL = """
+    WITH scored AS (
+        SELECT
+            p.note_id,
+            p.encounter_id,
+            SUM(
+                {idf} * p.term_freq * ({k1} + 1)
+                / (p.term_freq + {k1} * (1 - {b} + {b} * p.token_count / {avg_len}))
+            ) AS score
+        FROM curated.note_postings AS p
+        {scenario_join}
+        WHERE p.term_id IN ({term_ids})
+        GROUP BY p.note_id, p.encounter_id
+        HAVING COUNT(*) >= {min_matched}
+        ORDER BY score DESC, p.note_id
+        LIMIT ?
+    )
+    SELECT sc.note_id, sc.encounter_id, e.scenario, n.note_time, n.note_type, sc.score
+    FROM scored AS sc
+    JOIN curated.fact_notes AS n ON n.note_id = sc.note_id
+    JOIN curated.fact_encounters AS e ON e.encounter_id = sc.encounter_id
+    ORDER BY sc.score DESC, sc.note_id
+"""
+
+NOTE_STATS_SQL = "SELECT COUNT(*), AVG(token_count) FROM curated.note_documents"
+
+NOTE_DOC_FREQ_SQL = """
+    SELECT term_id, COUNT(*) AS doc_freq
+    FROM curated.note_postings
+    WHERE term_id IN ({term_ids})
+    GROUP BY term_id
+"""
+
+
+class NoteHit(TypedDict):
+    note_id: int
+    encounter_id: int
+    scenario: str
+    note_time: str  # ISO format
+    note_type: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms (lowercase, alphanumeric runs, stopwords and 1-char tokens dropped).
+    """
+    return [
+        term
+        for term in re.split(TOKEN_SPLIT_PATTERN, text.lower())
+        if len(term) >= MIN_TOKEN_LENGTH and term not in STOPWORDS
+    ]
+
+
+def _tokens_select(filter_sql: str) -> str:
+    return NOTE_TOKENS_SELECT.format(
+        pattern=TOKEN_SPLIT_PATTERN,
+        filter=filter_sql,
+        min_length=MIN_TOKEN_LENGTH,
+        stopwords=", ".join(f"'{word}'" for word in STOPWORDS),
+    )
+
+
+def bootstrap_note_index(conn: duckdb.DuckDBPyConnection, note_search_path: Path) -> None:
+    """
+    Create the note search tables from note_search.sql and build the index over any notes
+    already in curated.fact_notes when a table is created for the first time.
+    """
+    existing = {
+        row[0]
+        for row in conn.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE schema_name = 'curated'"
+        ).fetchall()
+    }
+    note_search_sql = note_search_path.read_text(encoding="utf-8").strip()
+    if note_search_sql:
+        conn.execute(note_search_sql)
+
+    if any(name not in existing for name in NOTE_INDEX_TABLES):
+        refresh_note_index(conn, full=True)
+
+
+def refresh_note_index(conn: duckdb.DuckDBPyConnection, full: bool = False) -> int:
+    """
+    Bring the inverted index over curated.fact_notes up to date. Returns the notes (re)indexed.
+
+    full=True rebuilds the index from every note (replace-mode loads, first creation).
+    Otherwise only the notes of the encounters in encounters_df are re-indexed: their postings
+    are deleted and rebuilt, matching how incremental loads replace notes per encounter.
+    New terms are appended to curated.note_terms; term ids are never reused. Postings are
+    inserted ordered by term_id so row-group zone maps narrow term lookups.
+    Runs in the caller's transaction.
+    """
+    if full:
+        scope_filter = ""
+        for name in ("note_postings", "note_documents", "note_terms"):
+            conn.execute(f"DELETE FROM curated.{name}")
+    else:
+        scope_filter = "AND encounter_id IN (SELECT encounter_id FROM encounters_df)"
+        for name in ("note_postings", "note_documents"):
+            conn.execute(
+                f"""
+                DELETE FROM curated.{name}
+                WHERE encounter_id IN (SELECT encounter_id FROM encounters_df)
+                """
+            )
+
+    conn.execute(f"CREATE OR REPLACE TEMP TABLE note_index_tokens AS {_tokens_select(scope_filter)}")
+    try:
+        conn.execute(
+            f"""
+            INSERT INTO curated.note_documents
+            SELECT
+                n.note_id,
+                n.encounter_id,
+                COALESCE(t.token_count, 0) AS token_count
+            FROM curated.fact_notes AS n
+            LEFT JOIN (
+                SELECT note_id, COUNT(*) AS token_count
+                FROM note_index_tokens
+                GROUP BY note_id
+            ) AS t ON t.note_id = n.note_id
+            WHERE TRUE {scope_filter}
+            ORDER BY n.note_id
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO curated.note_terms
+            SELECT
+                (SELECT COALESCE(MAX(term_id), 0) FROM curated.note_terms)
+                    + row_number() OVER (ORDER BY term) AS term_id,
+                term
+            FROM (
+                SELECT DISTINCT term FROM note_index_tokens
+                WHERE term NOT IN (SELECT term FROM curated.note_terms)
+            )
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO curated.note_postings
+            SELECT
+                v.term_id,
+                t.note_id,
+                t.encounter_id,
+                COUNT(*) AS term_freq,
+                d.token_count
+            FROM note_index_tokens AS t
+            JOIN curated.note_terms AS v ON v.term = t.term
+            JOIN (
+                SELECT note_id, COUNT(*) AS token_count
+                FROM note_index_tokens
+                GROUP BY note_id
+            ) AS d ON d.note_id = t.note_id
+            GROUP BY v.term_id, t.note_id, t.encounter_id, d.token_count
+            ORDER BY v.term_id, t.note_id
+            """
+        )
+        row = conn.execute("SELECT COUNT(DISTINCT note_id) FROM note_index_tokens").fetchone()
+    finally:
+        conn.execute("DROP TABLE IF EXISTS note_index_tokens")
+    return int(row[0]) if row else 0
+
+
+def search_notes(
+    conn: duckdb.DuckDBPyConnection,
+    query: str,
+    scenario: Optional[str] = None,
+    match_all: bool = True,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> List[NoteHit]:
+    """
+    Return the notes matching query, best BM25 score first.
+
+    match_all=True requires every query term in the note; otherwise any term matches.
+    scenario restricts hits to encounters of that scenario. Hits carry encounter_id and
+    note_id, so they join directly to curated.fact_encounters / curated.fact_notes.
+    Terms are resolved through curated.note_terms first; scoring reads only their postings
+    (which carry term_freq and the note's token_count), never the note text.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    term_ids = [
+        int(row[0])
+        for row in conn.execute(
+            "SELECT term_id FROM curated.note_terms WHERE term IN (SELECT unnest(?::VARCHAR[]))",
+            [terms],
+        ).fetchall()
+    ]
+    if not term_ids or (match_all and len(term_ids) < len(terms)):
+        return []
+
+    ids_sql = ", ".join(str(term_id) for term_id in term_ids)
+    stats = conn.execute(NOTE_STATS_SQL).fetchone()
+    n_docs, avg_len = (int(stats[0]), float(stats[1] or 0.0)) if stats else (0, 0.0)
+    doc_freq = dict(conn.execute(NOTE_DOC_FREQ_SQL.format(term_ids=ids_sql)).fetchall())
+    if not doc_freq or avg_len <= 0:
+        return []
+    idf = {
+        term_id: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for term_id, df in doc_freq.items()
+    }
+
+    sql = NOTE_SEARCH_SQL.format(
+        idf="CASE p.term_id " + " ".join(f"WHEN {term_id} THEN CAST({value!r} AS DOUBLE)" for term_id, value in idf.items()) + " END",
+        k1=BM25_K1,
+        b=BM25_B,
+        avg_len=f"CAST({avg_len!r} AS DOUBLE)",
+        scenario_join=(
+            "JOIN curated.fact_encounters AS se ON se.encounter_id = p.encounter_id AND se.scenario = ?"
+            if scenario is not None
+            else ""
+        ),
+        term_ids=ids_sql,
+        min_matched=len(term_ids) if match_all else 1,
+    )
+    params = ([scenario] if scenario is not None else []) + [int(limit)]
+    return [
+        {
+            "note_id": int(note_id),
+            "encounter_id": int(encounter_id),
+            "scenario": str(hit_scenario),
+            "note_time": note_time.isoformat(),
+            "note_type": str(note_type),
+            "score": float(score),
+        }
+        for note_id, encounter_id, hit_scenario, note_time, note_type, score in conn.execute(sql, params).fetchall()
+    ]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Ranked full-text search over curated.fact_notes.")
+    p.add_argument("query", help='Search terms, e.g. "lactate"')
+    p.add_argument("--scenario", default=None, help="Only encounters of this scenario (e.g. sepsis)")
+    p.add_argument("--any", action="store_true", help="Match notes containing any term (default: all terms)")
+    p.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT, help=f"Maximum hits (default: {DEFAULT_SEARCH_LIMIT})")
+    p.add_argument("--db", default="data/processed/clinical_warehouse.duckdb", help="DuckDB warehouse path")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with duckdb.connect(args.db, read_only=True) as conn:
+        hits = search_notes(conn, args.query, scenario=args.scenario, match_all=not args.any, limit=args.limit)
+
+    print(f"note_search: {len(hits)} hits for {args.query!r}" + (f" (scenario={args.scenario})" if args.scenario else ""))
+    for hit in hits:
+        print(
+            f"{hit['score']:>8.3f}  encounter_id={hit['encounter_id']} note_id={hit['note_id']} "
+            f"{hit['note_time']} {hit['note_type']} ({hit['scenario']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+try:
+    from ..quality.checks import format_result, persist_results, raise_on_failures, run_checks
+except ImportError:
+    # Script mode (python etl_warehouse/etl/<script>.py): quality/ is not importable as a package, so
+    # checks.py is loaded from its file under a qualified module name instead of putting quality/ on sys.path
+    _CHECKS_MODULE = "etl_warehouse_quality_checks"
+    if _CHECKS_MODULE not in sys.modules:
+        _spec = importlib.util.spec_from_file_location(
+            _CHECKS_MODULE, Path(__file__).resolve().parents[1] / "quality" / "checks.py"
+        )
+        if _spec is None or _spec.loader is None:
+            raise ImportError("Cannot load etl_warehouse/quality/checks.py")
+        _module = importlib.util.module_from_spec(_spec)
+        sys.modules[_CHECKS_MODULE] = _module
+        _spec.loader.exec_module(_module)
+    _checks = sys.modules[_CHECKS_MODULE]
+    format_result = _checks.format_result
+    persist_results = _checks.persist_results
+    raise_on_failures = _checks.raise_on_failures
+    run_checks = _checks.run_checks
+
+__all__ = ["format_result", "persist_results", "raise_on_failures", "run_checks"]
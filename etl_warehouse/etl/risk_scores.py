@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+
+# Vitals that make up an observation vector (NEWS2 also scores consciousness and supplemental
+# oxygen, which are not recorded; they are taken as alert / room air and contribute 0 points).
+SCORED_VITALS = ["heart_rate", "resp_rate", "temperature_c", "spo2", "systolic_bp"]
+
+# NEWS2 bands per parameter: (inclusive upper bounds, points per band). A value v falls in band
+# searchsorted(bounds, v), i.e. the first bound >= v, or the last band above every bound.
+NEWS2_BANDS: Dict[str, Tuple[List[float], List[int]]] = {
+    "resp_rate": ([8, 11, 20, 24], [3, 1, 0, 2, 3]),
+    "spo2": ([91, 93, 95], [3, 2, 1, 0]),
+    "systolic_bp": ([90, 100, 110, 219], [3, 2, 1, 0, 3]),
+    "heart_rate": ([40, 50, 90, 110, 130], [3, 1, 0, 1, 2, 3]),
+    "temperature_c": ([35.0, 36.0, 38.0, 39.0], [3, 1, 0, 1, 2]),
+}
+# SpO2 scale 2 (target 88-92%, hypercapnic respiratory failure), on room air
+NEWS2_SPO2_SCALE2_BANDS: Tuple[List[float], List[int]] = ([83, 85, 87], [3, 2, 1, 0])
+SPO2_SCALE2_SCENARIOS = ["copd_hypoxia"]
+
+NEWS2_RISK_LEVELS = ["low", "low_medium", "medium", "high"]
+
+# qSOFA: one point each for resp_rate >= 22 and systolic_bp <= 100 (mentation is not recorded)
+QSOFA_RESP_RATE_MIN = 22
+QSOFA_SYSTOLIC_BP_MAX = 100
+QSOFA_POSITIVE_MIN = 2
+
+RISK_SCORE_COLUMNS = [
+    "encounter_id",
+    "patient_id",
+    "event_time",
+    "scenario",
+    *SCORED_VITALS,
+    "spo2_scale",
+    "news2_score",
+    "news2_max_parameter_score",
+    "news2_risk",
+    "qsofa_score",
+    "qsofa_positive",
+]
+
+# One row per encounter observation time of a long vitals relation (streamed micro-batches) with the
+# readings of each scored vital at that time (several readings of one vital at the same time are averaged).
+OBSERVATIONS_SELECT = """
+    SELECT
+        v.encounter_id,
+        v.patient_id,
+        v.event_time,
+        e.scenario,
+        {vital_columns}
+    FROM {source} AS v
+    JOIN curated.fact_encounters AS e ON e.encounter_id = v.encounter_id
+    WHERE v.vital_type IN ({vital_types})
+      {filter}
+    GROUP BY v.encounter_id, v.patient_id, v.event_time, e.scenario
+    ORDER BY v.encounter_id, v.event_time
+"""
+
+# Batch mode reads the wide vitals layout, which already holds one row per observation time
+WIDE_OBSERVATIONS_SELECT = """
+    SELECT
+        v.encounter_id,
+        v.patient_id,
+        v.event_time,
+        e.scenario,
+        {vital_columns}
+    FROM curated.fact_vitals_wide AS v
+    JOIN curated.fact_encounters AS e ON e.encounter_id = v.encounter_id
+    WHERE ({any_vital})
+      {filter}
+    ORDER BY v.encounter_id, v.event_time
+"""
+
+LATEST_SCORES_SQL = """
+    SELECT encounter_id, event_time, {vitals}
+    FROM gold.encounter_risk_scores
+    WHERE encounter_id IN (SELECT unnest(?::BIGINT[]))
+    QUALIFY row_number() OVER (PARTITION BY encounter_id ORDER BY event_time DESC) = 1
+"""
+
+
+def _observations_select(source: str, filter_sql: str) -> str:
+    return OBSERVATIONS_SELECT.format(
+        vital_columns=",\n        ".join(
+            f"AVG(v.value) FILTER (WHERE v.vital_type = '{name}') AS {name}" for name in SCORED_VITALS
+        ),
+        source=source,
+        vital_types=", ".join(f"'{name}'" for name in SCORED_VITALS),
+        filter=filter_sql,
+    )
+
+
+def _wide_observations_select(filter_sql: str) -> str:
+    return WIDE_OBSERVATIONS_SELECT.format(
+        vital_columns=",\n        ".join(f"v.{name}" for name in SCORED_VITALS),
+        any_vital=" OR ".join(f"v.{name} IS NOT NULL" for name in SCORED_VITALS),
+        filter=filter_sql,
+    )
+
+
+def fill_observations(observations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Carry each vital forward within its encounter, so every row is the full observation vector
+    known at event_time. Rows must be ordered by encounter_id, event_time. Vitals not yet seen
+    in the encounter stay NaN.
+    """
+    n = len(observations)
+    encounter_ids = observations["encounter_id"].to_numpy(dtype="int64")
+    positions = np.arange(n)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = encounter_ids[1:] != encounter_ids[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0))
+
+    filled = observations.copy()
+    for name in SCORED_VITALS:
+        values = observations[name].to_numpy(dtype="float64", na_value=np.nan)
+        last_seen = np.maximum.accumulate(np.where(np.isnan(values), -1, positions))
+        filled[name] = np.where(last_seen >= group_start, values[np.maximum(last_seen, 0)], np.nan)
+    return filled
+
+
+def _band_points(values: np.ndarray, bands: Tuple[List[float], List[int]]) -> np.ndarray:
+    bounds, points = bands
+    band = np.searchsorted(np.asarray(bounds, dtype="float64"), values, side="left")
+    scored = np.asarray(points, dtype="int16")[np.minimum(band, len(points) - 1)]
+    return np.where(np.isnan(values), 0, scored).astype("int16")
+
+
+def score_observations(observations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score observation vectors (one row each, vitals as columns) with NEWS2 and qSOFA in a few
+    array operations over all rows. Missing vitals score 0. Returns the rows in RISK_SCORE_COLUMNS.
+    """
+    vitals = {name: observations[name].to_numpy(dtype="float64", na_value=np.nan) for name in SCORED_VITALS}
+    scale2 = observations["scenario"].isin(SPO2_SCALE2_SCENARIOS).to_numpy()
+
+    parameter_points = [
+        _band_points(vitals[name], NEWS2_BANDS[name]) for name in SCORED_VITALS if name != "spo2"
+    ]
+    parameter_points.append(
+        np.where(
+            scale2,
+            _band_points(vitals["spo2"], NEWS2_SPO2_SCALE2_BANDS),
+            _band_points(vitals["spo2"], NEWS2_BANDS["spo2"]),
+        )
+    )
+    points = np.vstack(parameter_points)
+    news2 = points.sum(axis=0).astype("int16")
+    max_points = points.max(axis=0).astype("int16")
+
+    qsofa = (
+        (vitals["resp_rate"] >= QSOFA_RESP_RATE_MIN).astype("int16")
+        + (vitals["systolic_bp"] <= QSOFA_SYSTOLIC_BP_MAX).astype("int16")
+    )
+
+    scored = observations[["encounter_id", "patient_id", "event_time", "scenario", *SCORED_VITALS]].copy()
+    scored["spo2_scale"] = np.where(scale2, 2, 1).astype("int16")
+    scored["news2_score"] = news2
+    scored["news2_max_parameter_score"] = max_points
+    low, low_medium, medium, high = NEWS2_RISK_LEVELS
+    scored["news2_risk"] = np.select(
+        [news2 >= 7, news2 >= 5, max_points >= 3],
+        [high, medium, low_medium],
+        default=low,
+    )
+    scored["qsofa_score"] = qsofa
+    scored["qsofa_positive"] = qsofa >= QSOFA_POSITIVE_MIN
+    return scored[RISK_SCORE_COLUMNS]
+
+
+def _insert_scores(conn: duckdb.DuckDBPyConnection, scores: pd.DataFrame, replace_existing: bool = False) -> None:
+    # scores are already ordered by encounter_id, event_time (the observation order)
+    conn.register("risk_scores_df", scores)
+    try:
+        if replace_existing:
+            conn.execute(
+                """
+                DELETE FROM gold.encounter_risk_scores AS r
+                USING risk_scores_df AS s
+                WHERE r.encounter_id = s.encounter_id AND r.event_time = s.event_time
+                """
+            )
+        conn.execute(
+            f"""
+            INSERT INTO gold.encounter_risk_scores
+            SELECT {", ".join(RISK_SCORE_COLUMNS)}
+            FROM risk_scores_df
+            """
+        )
+    finally:
+        conn.unregister("risk_scores_df")
+
+
+def bootstrap_risk_scores(conn: duckdb.DuckDBPyConnection, risk_scores_path: Path) -> None:
+    """
+    Create gold.encounter_risk_scores from risk_scores.sql and score the vitals already in
+    curated.fact_vitals_wide when the table is created for the first time.
+    """
+    existing = conn.execute(
+        """
+        SELECT COUNT(*) FROM duckdb_tables()
+        WHERE schema_name = 'gold' AND table_name = 'encounter_risk_scores'
+        """
+    ).fetchone()
+    risk_scores_sql = risk_scores_path.read_text(encoding="utf-8").strip()
+    if risk_scores_sql:
+        conn.execute(risk_scores_sql)
+
+    if not existing or not existing[0]:
+        refresh_risk_scores(conn)
+
+
+def refresh_risk_scores(conn: duckdb.DuckDBPyConnection, encounters: Optional[str] = None) -> int:
+    """
+    Batch mode: rescore encounters from curated.fact_vitals_wide. Returns the rows written.
+
+    encounters=None rescores every encounter (replace-mode loads, first creation); otherwise
+    encounters names a relation with the encounter_ids to rescore (their rows are replaced).
+    Observation vectors are read straight from the wide layout (kept current by refresh_gold,
+    which runs first), then filled and scored as arrays across all encounters at once.
+    Runs in the caller's transaction.
+    """
+    if encounters is None:
+        conn.execute("DELETE FROM gold.encounter_risk_scores")
+        scope_filter = ""
+    else:
+        conn.execute(
+            f"""
+            DELETE FROM gold.encounter_risk_scores
+            WHERE encounter_id IN (SELECT encounter_id FROM {encounters})
+            """
+        )
+        scope_filter = f"AND v.encounter_id IN (SELECT encounter_id FROM {encounters})"
+
+    observations = conn.execute(_wide_observations_select(scope_filter)).df()
+    if observations.empty:
+        return 0
+    scores = score_observations(fill_observations(observations))
+    _insert_scores(conn, scores)
+    return len(scores)
+
+
+class RiskScoreStream:
+    """
+    Incremental mode for streamed vitals: keeps the latest observation vector (and its time) per
+    encounter, so scoring a micro-batch costs O(rows in the batch) regardless of history.
+
+    The state of an encounter is read once from its latest gold.encounter_risk_scores row.
+    Readings at the encounter's latest scored time are merged into that row (a timestep split
+    across chunk files); readings older than it are out of order, and the encounter is rescored
+    in batch mode instead.
+    """
+
+    def __init__(self) -> None:
+        self.latest: Dict[int, Tuple[pd.Timestamp, np.ndarray]] = {}
+
+    def _load_latest(self, conn: duckdb.DuckDBPyConnection, encounter_ids: List[int]) -> None:
+        rows = conn.execute(LATEST_SCORES_SQL.format(vitals=", ".join(SCORED_VITALS)), [encounter_ids]).fetchall()
+        for row in rows:
+            self.latest[int(row[0])] = (
+                pd.Timestamp(row[1]),
+                np.array([np.nan if v is None else float(v) for v in row[2:]], dtype="float64"),
+            )
+
+    def score_batch(self, conn: duckdb.DuckDBPyConnection, vitals_relation: str) -> int:
+        """
+        Score the vitals in vitals_relation (already appended to curated.fact_vitals) and write
+        their rows to gold.encounter_risk_scores. Runs in the caller's transaction; returns rows written.
+        """
+        observations = conn.execute(_observations_select(vitals_relation, "")).df()
+        if observations.empty:
+            return 0
+
+        first_times = observations.groupby("encounter_id", sort=False)["event_time"].min()
+        unseen = [int(e) for e in first_times.index if int(e) not in self.latest]
+        if unseen:
+            self._load_latest(conn, unseen)
+
+        rescore: List[int] = []
+        seeds: List[Dict[str, object]] = []
+        merge = False
+        for encounter_id, first_time in first_times.items():
+            state = self.latest.get(int(encounter_id))
+            if state is None:
+                continue
+            latest_time, vector = state
+            if first_time < latest_time:
+                rescore.append(int(encounter_id))
+                continue
+            merge = merge or first_time == latest_time
+            seeds.append(
+                {"encounter_id": int(encounter_id), "event_time": latest_time, **dict(zip(SCORED_VITALS, vector))}
+            )
+
+        written = 0
+        if rescore:
+            conn.register("risk_rescore_df", pd.DataFrame({"encounter_id": rescore}))
+            try:
+                written += refresh_risk_scores(conn, encounters="risk_rescore_df")
+            finally:
+                conn.unregister("risk_rescore_df")
+            for encounter_id in rescore:
+                self.latest.pop(encounter_id, None)
+            observations = observations[~observations["encounter_id"].isin(rescore)]
+            if observations.empty:
+                return written
+
+        # Seed rows go first within their encounter, so forward fill starts from the known state
+        observations = observations.assign(_seed=False)
+        if seeds:
+            seed_frame = pd.DataFrame(seeds).assign(_seed=True)
+            observations = pd.concat([seed_frame, observations], ignore_index=True)
+        observations = observations.sort_values(
+            ["encounter_id", "event_time", "_seed"], ascending=[True, True, False], kind="stable"
+        ).reset_index(drop=True)
+        filled = fill_observations(observations)
+        filled = filled[~filled["_seed"].to_numpy(dtype=bool)].astype({"patient_id": "int64"})
+
+        scores = score_observations(filled)
+        _insert_scores(conn, scores, replace_existing=merge)
+        written += len(scores)
+
+        last_rows = filled.groupby("encounter_id", sort=False).tail(1)
+        vectors = last_rows[SCORED_VITALS].to_numpy(dtype="float64", na_value=np.nan)
+        for encounter_id, event_time, vector in zip(last_rows["encounter_id"], last_rows["event_time"], vectors):
+            self.latest[int(encounter_id)] = (pd.Timestamp(event_time), vector)
+        return written
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Early-warning score summary from gold.encounter_risk_scores.")
+    p.add_argument("--encounter-id", type=int, default=None, help="Print this encounter's score timeline instead")
+    p.add_argument("--db", default="data/processed/clinical_warehouse.duckdb", help="DuckDB warehouse path")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with duckdb.connect(args.db, read_only=True) as conn:
+        if args.encounter_id is not None:
+            rows = conn.execute(
+                f"""
+                SELECT event_time, {", ".join(SCORED_VITALS)}, news2_score, news2_risk, qsofa_score
+                FROM gold.encounter_risk_scores
+                WHERE encounter_id = ?
+                ORDER BY event_time
+                """,
+                [args.encounter_id],
+            ).fetchall()
+            print(f"risk_scores: encounter_id={args.encounter_id} observations={len(rows)}")
+            for row in rows:
+                vitals = " ".join(f"{name}={value}" for name, value in zip(SCORED_VITALS, row[1:6]))
+                print(f"{row[0].isoformat()} {vitals} news2={row[6]} ({row[7]}) qsofa={row[8]}")
+            return
+
+        rows = conn.execute(
+            """
+            SELECT
+                scenario,
+                COUNT(DISTINCT encounter_id) AS encounters,
+                COUNT(*) AS observations,
+                AVG(news2_score) AS mean_news2,
+                COUNT(DISTINCT encounter_id) FILTER (WHERE news2_risk = 'high') AS high_risk_encounters,
+                COUNT(DISTINCT encounter_id) FILTER (WHERE qsofa_positive) AS qsofa_positive_encounters
+            FROM gold.encounter_risk_scores
+            GROUP BY scenario
+            ORDER BY scenario
+            """
+        ).fetchall()
+
+    print("risk_scores: per scenario")
+    for scenario, encounters, observations, mean_news2, high, qsofa in rows:
+        print(
+            f"{scenario:<14} encounters={encounters} observations={observations} mean_news2={mean_news2:.2f} "
+            f"news2_high={high} qsofa_positive={qsofa}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,214 @@
 from __future__ import annotations
 
 import argparse
+import os
 from pathlib import Path
 
 try:
-    from .extract import extract_day
+    from .extract import extract_day, input_bytes
     from .transform import transform_day
-    from .load import load_day
+    from .validation import validate_labs, validate_notes, validate_vitals
+    from .instrumentation import RunRecorder, frame_rows
+    from .load import LOAD_MODES, load_day
+    from .manifest import fingerprint_day, unchanged_since
+    from .session import WarehouseSession, load_vitals_retention, load_warehouse_settings
+    from .vitals_rollups import compact_vitals
+    from .backfill import date_range, run_backfill
+    from .sql_engine import ETL_ENGINES, load_day_sql
+    from .quality_checks import persist_results
 except ImportError:
-    from extract import extract_day
+    from extract import extract_day, input_bytes
     from transform import transform_day
-    from load import load_day
+    from validation import validate_labs, validate_notes, validate_vitals
+    from instrumentation import RunRecorder, frame_rows
+    from load import LOAD_MODES, load_day
+    from manifest import fingerprint_day, unchanged_since
+    from session import WarehouseSession, load_vitals_retention, load_warehouse_settings
+    from vitals_rollups import compact_vitals
+    from backfill import date_range, run_backfill
+    from sql_engine import ETL_ENGINES, load_day_sql
+    from quality_checks import persist_results
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run batch ETL for one day.")
-    parser.add_argument("--date", required=True, help="YYYY-MM-DD")
+    parser = argparse.ArgumentParser(description="Run batch ETL for one day or backfill a date range.")
+    days = parser.add_mutually_exclusive_group(required=True)
+    days.add_argument("--date", help="YYYY-MM-DD")
+    days.add_argument("--start", help="Backfill start date YYYY-MM-DD (inclusive, requires --end)")
+    parser.add_argument("--end", help="Backfill end date YYYY-MM-DD (inclusive)")
     parser.add_argument("--source", required=True, choices=["sample", "raw"])
-    return parser.parse_args()
+    parser.add_argument(
+        "--load-mode",
+        default=None,
+        choices=LOAD_MODES,
+        help="replace: rebuild tables from this day; incremental: upsert this day and keep history "
+        "(default: replace for --date, incremental for backfills)",
+    )
+    parser.add_argument(
+        "--engine",
+        default="pandas",
+        choices=ETL_ENGINES,
+        help="pandas: extract/transform in pandas; sql: DuckDB reads, casts and validates the files directly",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Backfill (pandas engine): extract/transform worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=7,
+        help="Backfill: commit the writer connection every N loaded days (default: 7)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reload days even when their input files and the pipeline are unchanged since the last load "
+        "(ops.ingest_manifest)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=str(Path("data") / "processed" / "etl_runs.jsonl"),
+        help="Append per-stage metrics as JSON lines here (also stored in ops.etl_runs)",
+    )
+    args = parser.parse_args()
 
+    if args.start and not args.end:
+        parser.error("--start requires --end")
+    if args.end and not args.start:
+        parser.error("--end requires --start")
+    if args.start and args.load_mode == "replace":
+        parser.error("backfills always load incrementally; --load-mode replace is only valid with --date")
+    return args
 
-def main() -> None:
-    args = parse_args()
 
-    input_dir = Path("data") / args.source / args.date
-    db_path = Path("data") / "processed" / "clinical_warehouse.duckdb"
-    schema_path = Path("etl_warehouse") / "sql" / "schema.sql"
+def run(args: argparse.Namespace, recorder: RunRecorder, session: WarehouseSession) -> None:
+    db_path = session.db_path
+    schema_path = session.schema_path
+    if args.start:
+        days = date_range(args.start, args.end)
+        print("=== ETL BACKFILL START ===")
+        print(f"range: {args.start}..{args.end} ({len(days)} days)")
+        print(f"source: {args.source}")
+        print(f"engine: {args.engine}")
+        print(f"db_path: {db_path}")
+        print(f"workers: {args.workers}")
+        print(f"commit_every: {args.commit_every}")
+        run_backfill(
+            days,
+            source=args.source,
+            db_path=db_path,
+            schema_path=schema_path,
+            workers=args.workers,
+            commit_every=args.commit_every,
+            engine=args.engine,
+            recorder=recorder,
+            session=session,
+            force=args.force,
+        )
+        print("=== ETL BACKFILL COMPLETE ===")
+        return
 
+    load_mode = recorder.load_mode
+    input_dir = Path("data") / args.source / args.date
     print("=== ETL START ===")
     print(f"date: {args.date}")
     print(f"source: {args.source}")
     print(f"input_dir: {input_dir}")
     print(f"db_path: {db_path}")
     print(f"schema_path: {schema_path}")
+    print(f"load_mode: {load_mode}")
+    print(f"engine: {args.engine}")
 
-    raw_data = extract_day(input_dir)
+    manifest = fingerprint_day(session.conn, args.source, input_dir)
+    loaded_at = None if args.force else unchanged_since(session.conn, manifest, load_mode)
+    if loaded_at is not None:
+        print(
+            f"manifest: skip {args.date} (inputs and pipeline unchanged since {loaded_at:%Y-%m-%d %H:%M:%S}; "
+            "use --force to reload)"
+        )
+        print("=== ETL COMPLETE ===")
+        return
+
+    if args.engine == "sql":
+        load_day_sql(
+            input_dir,
+            db_path=db_path,
+            schema_path=schema_path,
+            mode=load_mode,
+            recorder=recorder,
+            session=session,
+            manifest=manifest,
+        )
+        print("=== ETL COMPLETE ===")
+        return
+
+    with recorder.stage("extract", day=args.date, bytes_read=input_bytes(input_dir)) as stage:
+        raw_data = extract_day(input_dir)
+        stage["rows_out"] = frame_rows(raw_data)
     print(
         "extract_day: rows "
         f"patients={len(raw_data['patients'])}, "
         f"encounters={len(raw_data['encounters'])}, "
-        f"vitals={len(raw_data['vitals'])}"
+        f"vitals={len(raw_data['vitals'])}, "
+        f"labs={len(raw_data['labs'])}, "
+        f"notes={len(raw_data['notes'])}"
+    )
+    with recorder.stage("transform", day=args.date, rows_in=frame_rows(raw_data)) as stage:
+        staged_data = transform_day(raw_data, validate=False)
+        stage["rows_out"] = frame_rows(staged_data)
+    with recorder.stage("validate_vitals", day=args.date, rows_in=len(staged_data["vitals"])) as stage:
+        validate_vitals(staged_data["vitals"], staged_data["encounters"])
+        stage["rows_out"] = len(staged_data["vitals"])
+    with recorder.stage("validate_labs", day=args.date, rows_in=len(staged_data["labs"])) as stage:
+        validate_labs(staged_data["labs"], staged_data["encounters"])
+        stage["rows_out"] = len(staged_data["labs"])
+    with recorder.stage("validate_notes", day=args.date, rows_in=len(staged_data["notes"])) as stage:
+        validate_notes(staged_data["notes"], staged_data["encounters"])
+        stage["rows_out"] = len(staged_data["notes"])
+    load_day(
+        staged_data,
+        db_path=db_path,
+        schema_path=schema_path,
+        mode=load_mode,
+        recorder=recorder,
+        day=args.date,
+        session=session,
+        manifest=manifest,
     )
-    staged_data = transform_day(raw_data)
-    load_day(staged_data, db_path=db_path, schema_path=schema_path)
 
     print("=== ETL COMPLETE ===")
 
 
+def main() -> None:
+    args = parse_args()
+
+    db_path = Path("data") / "processed" / "clinical_warehouse.duckdb"
+    schema_path = Path("etl_warehouse") / "sql" / "schema.sql"
+    load_mode = "incremental" if args.start else (args.load_mode or "replace")
+    recorder = RunRecorder(engine=args.engine, load_mode=load_mode, jsonl_path=Path(args.metrics_file))
+
+    # One connection for the whole run (settings from etl_warehouse/config.yaml)
+    with WarehouseSession(db_path, schema_path, settings=load_warehouse_settings()) as session:
+        try:
+            with recorder.stage("run", day=args.date):
+                run(args, recorder, session)
+            retention = load_vitals_retention()
+            if retention["raw_days"] is not None:
+                with recorder.stage("vitals_retention", day=args.date) as stage:
+                    stage["rows_out"] = compact_vitals(session.conn, retention["raw_days"])
+                print(f"vitals_retention: compacted {stage['rows_out']} raw vitals rows (raw_days={retention['raw_days']})")
+        finally:
+            # Record the run (including failed stages) in the warehouse it targeted
+            persisted = recorder.persist(session.conn)
+            print(f"etl_runs: run_id={recorder.run_id} stages={persisted} -> ops.etl_runs, {args.metrics_file}")
+            checked = persist_results(session.conn, recorder.quality_records)
+            failed = sum(1 for record in recorder.quality_records if record["status"] == "fail")
+            print(f"quality: run_id={recorder.run_id} results={checked} failed={failed} -> quality.results")
+            print(recorder.summary())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TypedDict
+
+import duckdb
+import yaml
+
+try:
+    from .migrations import bootstrap_warehouse
+except ImportError:
+    from migrations import bootstrap_warehouse
+
+
+DEFAULT_CONFIG_PATH = Path("etl_warehouse") / "config.yaml"
+
+
+class WarehouseSettings(TypedDict):
+    threads: Optional[int]
+    memory_limit: Optional[str]
+    temp_directory: Optional[str]
+
+
+class VitalsRetention(TypedDict):
+    raw_days: Optional[int]
+
+
+def _config_block(config_path: Path, name: str) -> Dict[str, Any]:
+    if not config_path.exists():
+        return {}
+    with config_path.open("r", encoding="utf-8") as f:
+        return (yaml.safe_load(f) or {}).get(name, {}) or {}
+
+
+def load_warehouse_settings(config_path: Path = DEFAULT_CONFIG_PATH) -> WarehouseSettings:
+    """
+    Read the `warehouse:` block of the ETL config. Missing file or keys leave DuckDB defaults.
+    """
+    cfg = _config_block(config_path, "warehouse")
+    threads = cfg.get("threads")
+    return {
+        "threads": int(threads) if threads is not None else None,
+        "memory_limit": cfg.get("memory_limit"),
+        "temp_directory": cfg.get("temp_directory"),
+    }
+
+
+def load_vitals_retention(config_path: Path = DEFAULT_CONFIG_PATH) -> VitalsRetention:
+    """
+    Read the `vitals_retention:` block of the ETL config. Missing file or keys keep all raw vitals.
+    """
+    cfg = _config_block(config_path, "vitals_retention")
+    raw_days = cfg.get("raw_days")
+    return {"raw_days": int(raw_days) if raw_days is not None else None}
+
+
+class WarehouseSession:
+    """
+    Owns one DuckDB connection to the warehouse for any number of loads.
+
+    The connection is opened with the configured threads / memory_limit / temp_directory and the
+    schema is brought up to date once (bootstrap_warehouse applies only new or changed DDL), so
+    backfills and streaming ingest pay the setup cost once per process instead of once per day/batch.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        schema_path: Path,
+        settings: Optional[WarehouseSettings] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.schema_path = schema_path
+        self.settings = settings if settings is not None else load_warehouse_settings()
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+
+    def _duckdb_config(self) -> Dict[str, Any]:
+        config: Dict[str, Any] = {}
+        if self.settings["threads"] is not None:
+            config["threads"] = self.settings["threads"]
+        if self.settings["memory_limit"]:
+            config["memory_limit"] = str(self.settings["memory_limit"])
+        if self.settings["temp_directory"]:
+            temp_dir = Path(self.settings["temp_directory"])
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            config["temp_directory"] = str(temp_dir)
+        return config
+
+    def open(self) -> duckdb.DuckDBPyConnection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = duckdb.connect(str(self.db_path), config=self._duckdb_config())
+            bootstrap_warehouse(self._conn, self.schema_path)
+        return self._conn
+
+    @property
+    def conn(self) -> duckdb.DuckDBPyConnection:
+        return self.open()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "WarehouseSession":
+        self.open()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+@contextmanager
+def session_scope(
+    session: Optional[WarehouseSession],
+    db_path: Path,
+    schema_path: Path,
+) -> Iterator[WarehouseSession]:
+    """
+    Yield the caller's session (left open), or a session opened and closed for this call only.
+    """
+    if session is not None:
+        yield session
+        return
+    with WarehouseSession(db_path, schema_path) as owned:
+        yield owned
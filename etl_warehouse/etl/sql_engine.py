@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+
+try:
+    from .extract import (
+        DATASETS,
+        LAB_COLUMNS,
+        NOTE_COLUMNS,
+        OPTIONAL_DATASETS,
+        input_bytes,
+        is_wide_vitals,
+        resolve_input_file,
+        unpivot_vitals_sql,
+    )
+    from .instrumentation import RunRecorder
+    from .load import LOAD_MODES, commit_day, write_staged_day
+    from .manifest import DayManifest
+    from .session import WarehouseSession, session_scope
+    from .validation import (
+        LAB_TEST_NAMES,
+        NOTE_TYPES,
+        REQUIRED_LABS_COLUMNS,
+        REQUIRED_NOTES_COLUMNS,
+        REQUIRED_VITALS_COLUMNS,
+    )
+except ImportError:
+    from extract import (
+        DATASETS,
+        LAB_COLUMNS,
+        NOTE_COLUMNS,
+        OPTIONAL_DATASETS,
+        input_bytes,
+        is_wide_vitals,
+        resolve_input_file,
+        unpivot_vitals_sql,
+    )
+    from instrumentation import RunRecorder
+    from load import LOAD_MODES, commit_day, write_staged_day
+    from manifest import DayManifest
+    from session import WarehouseSession, session_scope
+    from validation import (
+        LAB_TEST_NAMES,
+        NOTE_TYPES,
+        REQUIRED_LABS_COLUMNS,
+        REQUIRED_NOTES_COLUMNS,
+        REQUIRED_VITALS_COLUMNS,
+    )
+
+
+ETL_ENGINES = ["pandas", "sql"]
+
+STAGING_TABLES = ["patients_df", "encounters_df", "vitals_df", "labs_df", "notes_df"]
+
+# Casting rules mirror transform_day: IDs/timestamps on patients and encounters must parse
+# (CAST fails the load), vitals, labs and notes use TRY_CAST so bad values become nulls caught by
+# validation. Categorical columns are cast to their ENUM types (categorical_types.sql); values outside
+# the vocabulary become nulls. The vitals unit is not staged (it is derived from vital_type).
+STAGING_SQL = {
+    "patients": """
+        CREATE OR REPLACE TEMP TABLE patients_df AS
+        SELECT
+            CAST(patient_id AS BIGINT) AS patient_id,
+            CAST(age AS BIGINT) AS age,
+            TRY_CAST(sex AS sex_enum) AS sex
+        FROM {source}
+    """,
+    "encounters": """
+        CREATE OR REPLACE TEMP TABLE encounters_df AS
+        SELECT
+            CAST(encounter_id AS BIGINT) AS encounter_id,
+            CAST(patient_id AS BIGINT) AS patient_id,
+            CAST(admit_time AS TIMESTAMP) AS admit_time,
+            CAST(discharge_time AS TIMESTAMP) AS discharge_time,
+            TRY_CAST(scenario AS scenario_enum) AS scenario,
+            TRY_CAST(acuity AS acuity_enum) AS acuity,
+            date_diff('second', CAST(admit_time AS TIMESTAMP), CAST(discharge_time AS TIMESTAMP)) / 3600.0
+                AS los_hours
+        FROM {source}
+    """,
+    "vitals": """
+        CREATE OR REPLACE TEMP TABLE vitals_df AS
+        SELECT
+            TRY_CAST(encounter_id AS BIGINT) AS encounter_id,
+            TRY_CAST(patient_id AS BIGINT) AS patient_id,
+            TRY_CAST(event_time AS TIMESTAMP) AS event_time,
+            TRY_CAST(vital_type AS vital_type_enum) AS vital_type,
+            TRY_CAST(value AS DOUBLE) AS value,
+            TRY_CAST(source AS vital_source_enum) AS source
+        FROM {source}
+    """,
+    "labs": """
+        CREATE OR REPLACE TEMP TABLE labs_df AS
+        SELECT
+            TRY_CAST(lab_event_id AS BIGINT) AS lab_event_id,
+            TRY_CAST(encounter_id AS BIGINT) AS encounter_id,
+            TRY_CAST(patient_id AS BIGINT) AS patient_id,
+            TRY_CAST(event_time AS TIMESTAMP) AS event_time,
+            CAST(test_name AS VARCHAR) AS test_name,
+            TRY_CAST(value AS DOUBLE) AS value,
+            CAST(unit AS VARCHAR) AS unit
+        FROM {source}
+    """,
+    "notes": """
+        CREATE OR REPLACE TEMP TABLE notes_df AS
+        SELECT
+            TRY_CAST(note_id AS BIGINT) AS note_id,
+            TRY_CAST(encounter_id AS BIGINT) AS encounter_id,
+            TRY_CAST(patient_id AS BIGINT) AS patient_id,
+            TRY_CAST(note_time AS TIMESTAMP) AS note_time,
+            CAST(note_type AS VARCHAR) AS note_type,
+            CAST(text AS VARCHAR) AS text
+        FROM {source}
+    """,
+}
+
+# Stand-in source for an optional dataset the day does not have (stages an empty table)
+EMPTY_SOURCES = {
+    name: f"(SELECT * FROM (VALUES ({', '.join('NULL' for _ in columns)})) AS t({', '.join(columns)}) LIMIT 0)"
+    for name, columns in (("labs", LAB_COLUMNS), ("notes", NOTE_COLUMNS))
+}
+
+# Notes are JSON Lines: DuckDB streams them (plain, .gz or .zst by extension) with every field as text
+NOTES_JSON_COLUMNS = "{" + ", ".join(f"'{name}': 'VARCHAR'" for name in NOTE_COLUMNS) + "}"
+
+EVENT_CHECKS_SQL = """
+    SELECT
+        {null_counts},
+        COUNT(*) FILTER (WHERE v.encounter_id IS NOT NULL AND e.encounter_id IS NULL) AS missing_encounter,
+        COUNT(*) FILTER (WHERE e.encounter_id IS NOT NULL AND v.patient_id <> e.patient_id) AS patient_mismatch,
+        COUNT(*) FILTER (
+            WHERE e.encounter_id IS NOT NULL
+              AND (v.{time_column} < e.admit_time OR v.{time_column} > e.discharge_time)
+        ) AS outside_window
+    FROM {relation} AS v
+    LEFT JOIN encounters_df AS e ON v.encounter_id = e.encounter_id
+"""
+
+EVENT_SAMPLE_SQL = {
+    "missing_encounter": "e.encounter_id IS NULL",
+    "patient_mismatch": "e.encounter_id IS NOT NULL AND v.patient_id <> e.patient_id",
+    "outside_window": (
+        "e.encounter_id IS NOT NULL AND (v.{time_column} < e.admit_time OR v.{time_column} > e.discharge_time)"
+    ),
+}
+
+
+def _source_relation(path: Path) -> Tuple[str, list]:
+    if ".jsonl" in path.suffixes:
+        return f"read_json(?, format = 'newline_delimited', columns = {NOTES_JSON_COLUMNS})", [str(path)]
+    if path.suffix == ".parquet":
+        relation = "read_parquet(?)"
+    else:
+        relation = "read_csv(?, header = true, all_varchar = true)"
+    if is_wide_vitals(path):
+        # Staged in the long layout like vitals.*
+        relation = f"({unpivot_vitals_sql(relation)})"
+    return relation, [str(path)]
+
+
+def stage_day_sql(conn: duckdb.DuckDBPyConnection, input_dir: Path) -> Dict[str, int]:
+    """
+    Read the day's files directly with DuckDB (read_parquet / read_csv / read_json) into typed temp
+    tables patients_df / encounters_df / vitals_df / labs_df / notes_df (labs_df and notes_df are
+    empty when the day has no such file). Returns staged row counts.
+    """
+    if not input_dir.exists():
+        raise FileNotFoundError(f"Input folder not found: {input_dir}")
+
+    paths = {name: resolve_input_file(input_dir, name) for name in DATASETS}
+    missing = [f"{name}.csv|{name}.parquet" for name, path in paths.items() if path is None]
+    if missing:
+        raise FileNotFoundError(f"Missing required files in {input_dir}: {', '.join(missing)}")
+
+    for name in OPTIONAL_DATASETS:
+        paths[name] = resolve_input_file(input_dir, name)
+
+    counts: Dict[str, int] = {}
+    for name, path in paths.items():
+        if path is None:
+            source, params = EMPTY_SOURCES[name], []
+        else:
+            source, params = _source_relation(path)
+        conn.execute(STAGING_SQL[name].format(source=source), params)
+        row = conn.execute(f"SELECT COUNT(*) FROM {name}_df").fetchone()
+        counts[name] = int(row[0]) if row else 0
+    return counts
+
+
+def _validate_events_sql(
+    conn: duckdb.DuckDBPyConnection,
+    relation: str,
+    label: str,
+    required_columns: List[str],
+    sample_size: int,
+    time_column: str = "event_time",
+) -> None:
+    null_counts = ",\n        ".join(
+        f"COUNT(*) FILTER (WHERE v.{col} IS NULL) AS null_{col}" for col in required_columns
+    )
+    row = conn.execute(
+        EVENT_CHECKS_SQL.format(null_counts=null_counts, relation=relation, time_column=time_column)
+    ).fetchone()
+    if row is None:
+        raise RuntimeError(f"Failed to fetch {label.lower()} validation counts from DuckDB.")
+    counts = [int(v) for v in row]
+    missing_encounter, patient_mismatch, outside_window = counts[len(required_columns):]
+
+    # Required field validation (fail ETL if any required value is null)
+    violated = {col: count for col, count in zip(required_columns, counts) if count > 0}
+    if violated:
+        details = ", ".join(f"{col}={count}" for col, count in violated.items())
+        raise ValueError(f"{label} required-field validation failed: {details}")
+
+    def samples(check: str) -> str:
+        rows = conn.execute(
+            f"""
+            SELECT v.encounter_id, v.patient_id, v.{time_column}
+            FROM {relation} AS v
+            LEFT JOIN encounters_df AS e ON v.encounter_id = e.encounter_id
+            WHERE {EVENT_SAMPLE_SQL[check].format(time_column=time_column)}
+            LIMIT {int(sample_size)}
+            """
+        ).fetchall()
+        return "; ".join(f"encounter_id={r[0]}, patient_id={r[1]}, event_time={r[2]}" for r in rows)
+
+    # Referential integrity: events must map to a real encounter and matching patient.
+    if missing_encounter:
+        raise ValueError(
+            f"{label} referential integrity failed: "
+            f"{missing_encounter} rows have encounter_id not present in encounters "
+            f"(samples: {samples('missing_encounter')})"
+        )
+    if patient_mismatch:
+        raise ValueError(
+            f"{label} referential integrity failed: "
+            f"{patient_mismatch} rows have patient_id that does not match the encounter patient_id "
+            f"(samples: {samples('patient_mismatch')})"
+        )
+
+    # Core clinical time-window validation: event must occur during encounter.
+    if outside_window:
+        raise ValueError(
+            f"{label} time-window validation failed: "
+            f"{outside_window} rows have {time_column} outside admit_time..discharge_time "
+            f"(samples: {samples('outside_window')})"
+        )
+
+
+def _validate_key_and_domain_sql(
+    conn: duckdb.DuckDBPyConnection,
+    relation: str,
+    label: str,
+    key_column: str,
+    domain_column: str,
+    domain: List[str],
+) -> None:
+    row = conn.execute(
+        f"""
+        SELECT
+            COUNT(*) - COUNT(DISTINCT {key_column}) AS duplicates,
+            list_sort(list_distinct(
+                list({domain_column}) FILTER (WHERE NOT list_contains(?, {domain_column}))
+            )) AS unknown
+        FROM {relation}
+        """,
+        [domain],
+    ).fetchone()
+    if row is None:
+        raise RuntimeError(f"Failed to fetch {label.lower()} validation counts from DuckDB.")
+    duplicates, unknown = int(row[0]), row[1] or []
+    if duplicates:
+        raise ValueError(f"{label} key validation failed: {duplicates} rows repeat an existing {key_column}")
+    if unknown:
+        raise ValueError(f"{label} domain validation failed: unknown {domain_column} values {', '.join(unknown)}")
+
+
+def validate_vitals_sql(conn: duckdb.DuckDBPyConnection, sample_size: int = 5) -> None:
+    """
+    Same vitals rules as validation.validate_vitals, computed in one DuckDB scan over the
+    staged temp tables. Raises ValueError with sample offending rows.
+    """
+    _validate_events_sql(conn, "vitals_df", "Vitals", REQUIRED_VITALS_COLUMNS, sample_size)
+
+
+def validate_labs_sql(conn: duckdb.DuckDBPyConnection, sample_size: int = 5) -> None:
+    """
+    Same labs rules as validation.validate_labs, over the staged labs_df temp table.
+    """
+    _validate_events_sql(conn, "labs_df", "Labs", REQUIRED_LABS_COLUMNS, sample_size)
+    _validate_key_and_domain_sql(conn, "labs_df", "Labs", "lab_event_id", "test_name", LAB_TEST_NAMES)
+
+
+def validate_notes_sql(conn: duckdb.DuckDBPyConnection, sample_size: int = 5) -> None:
+    """
+    Same notes rules as validation.validate_notes, over the staged notes_df temp table.
+    """
+    _validate_events_sql(
+        conn, "notes_df", "Notes", REQUIRED_NOTES_COLUMNS, sample_size, time_column="note_time"
+    )
+    _validate_key_and_domain_sql(conn, "notes_df", "Notes", "note_id", "note_type", NOTE_TYPES)
+
+
+def drop_staging(conn: duckdb.DuckDBPyConnection) -> None:
+    for name in STAGING_TABLES:
+        conn.execute(f"DROP TABLE IF EXISTS temp.{name}")
+
+
+def run_day_sql(
+    conn: duckdb.DuckDBPyConnection,
+    input_dir: Path,
+    mode: str = "replace",
+    recorder: Optional[RunRecorder] = None,
+    manifest: Optional[DayManifest] = None,
+) -> Dict[str, int]:
+    """
+    SQL-native extract -> transform -> load for one day on an open connection (no pandas).
+    The caller owns the transaction. Returns the validated row counts for the day.
+    Reading and casting happen in one statement, so they are recorded as a single extract stage.
+    """
+    if recorder is None:
+        recorder = RunRecorder(engine="sql", load_mode=mode)
+    day = input_dir.name
+
+    try:
+        with recorder.stage("extract", day=day, bytes_read=input_bytes(input_dir)) as stage:
+            staged_counts = stage_day_sql(conn, input_dir)
+            stage["rows_out"] = sum(staged_counts.values())
+        with recorder.stage("validate_vitals", day=day, rows_in=staged_counts["vitals"]) as stage:
+            validate_vitals_sql(conn)
+            stage["rows_out"] = staged_counts["vitals"]
+        with recorder.stage("validate_labs", day=day, rows_in=staged_counts["labs"]) as stage:
+            validate_labs_sql(conn)
+            stage["rows_out"] = staged_counts["labs"]
+        with recorder.stage("validate_notes", day=day, rows_in=staged_counts["notes"]) as stage:
+            validate_notes_sql(conn)
+            stage["rows_out"] = staged_counts["notes"]
+        return write_staged_day(conn, mode=mode, recorder=recorder, day=day, manifest=manifest)
+    finally:
+        drop_staging(conn)
+
+
+def load_day_sql(
+    input_dir: Path,
+    db_path: Path,
+    schema_path: Path,
+    mode: str = "replace",
+    recorder: Optional[RunRecorder] = None,
+    session: Optional[WarehouseSession] = None,
+    manifest: Optional[DayManifest] = None,
+) -> None:
+    """
+    SQL-native counterpart of extract_day -> transform_day -> load_day for one day.
+    Uses session's connection when given, otherwise opens a session for this call.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode} (expected one of {', '.join(LOAD_MODES)})")
+    if recorder is None:
+        recorder = RunRecorder(engine="sql", load_mode=mode)
+
+    with session_scope(session, db_path, schema_path) as active:
+        conn = active.conn
+        counts = commit_day(
+            conn,
+            active.schema_path,
+            lambda: run_day_sql(conn, input_dir, mode=mode, recorder=recorder, manifest=manifest),
+            recorder,
+            mode=mode,
+            day=input_dir.name,
+        )
+
+    print(f"load_day_sql: wrote DuckDB file -> {active.db_path} (mode={mode})")
+    print(
+        f"load_day_sql: curated.dim_patients rows={counts['patients']}, "
+        f"curated.fact_encounters rows={counts['encounters']}, "
+        f"curated.fact_vitals rows={counts['vitals']}, "
+        f"curated.fact_labs rows={counts['labs']}, "
+        f"curated.fact_notes rows={counts['notes']}"
+    )
+    print(
+        f"load_day_sql: validation passed "
+        f"(dim_patients={counts['patients']} == unique_raw_patients={counts['unique_raw_patients']}, "
+        f"fact_encounters={counts['encounters']} == raw_encounters={counts['raw_encounters']}, "
+        f"fact_vitals={counts['vitals']} == raw_vitals={counts['raw_vitals']}, "
+        f"fact_labs={counts['labs']} == raw_labs={counts['raw_labs']}, "
+        f"fact_notes={counts['notes']} == raw_notes={counts['raw_notes']})"
+    )
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import duckdb
+import pandas as pd
+
+try:
+    from .gold import refresh_gold, track_vitals_changes
+    from .risk_scores import RiskScoreStream
+    from .session import WarehouseSession
+    from .transform import type_vitals
+    from .validation import EncounterIndex, validate_vitals
+except ImportError:
+    from gold import refresh_gold, track_vitals_changes
+    from risk_scores import RiskScoreStream
+    from session import WarehouseSession
+    from transform import type_vitals
+    from validation import EncounterIndex, validate_vitals
+
+
+class EncounterLookup:
+    """
+    In-memory EncounterIndex over curated.fact_encounters used to validate streamed vitals.
+    Reloaded from the warehouse when a batch references an encounter_id it has not seen yet
+    (e.g. after a newer day was loaded by the batch ETL).
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection) -> None:
+        self.conn = conn
+        self.index = self._load()
+
+    def _load(self) -> EncounterIndex:
+        encounters = self.conn.execute(
+            """
+            SELECT encounter_id, patient_id, admit_time, discharge_time
+            FROM curated.fact_encounters
+            """
+        ).df()
+        return EncounterIndex.from_frame(encounters)
+
+    def refresh(self) -> None:
+        self.index = self._load()
+
+    def ensure_covers(self, vitals: pd.DataFrame) -> None:
+        encounter_ids = vitals["encounter_id"].dropna().to_numpy(dtype="int64")
+        if not self.index.covers(encounter_ids):
+            self.refresh()
+
+
+class MicroBatchIngestor:
+    """
+    Tail a landing directory of vitals chunk files and append each one to raw.vitals and
+    curated.fact_vitals through a single long-lived connection.
+
+    Files are processed in name order. Each file is one micro-batch: typed and validated with the
+    same rules as transform_day, appended in one transaction (together with the refresh of
+    curated.fact_vitals_wide and the vitals rollups for the timesteps and buckets it touches, the incremental
+    scoring of its rows into gold.encounter_risk_scores and its row in ops.stream_chunks), then moved to
+    <landing>/done/. Readings whose (encounter_id, event_time, vital_type) key is already stored are
+    dropped from the batch, so streaming a day that was batch-loaded does not duplicate them. A file whose
+    content is already recorded in ops.stream_chunks (e.g. the move was interrupted after the commit) is
+    moved to done/ without being appended again.
+    Files that cannot be read or fail validation are moved to <landing>/rejected/ with a .error.txt next to them.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, landing_dir: Path) -> None:
+        self.conn = conn
+        self.landing_dir = landing_dir
+        self.done_dir = landing_dir / "done"
+        self.rejected_dir = landing_dir / "rejected"
+        self.done_dir.mkdir(parents=True, exist_ok=True)
+        self.rejected_dir.mkdir(parents=True, exist_ok=True)
+        self.lookup = EncounterLookup(conn)
+        self.risk_scores = RiskScoreStream()
+        self.rows_ingested = 0
+        self.batches_ingested = 0
+        self.batches_rejected = 0
+        self.batches_skipped = 0
+        self.readings_skipped = 0
+
+    def pending_files(self) -> List[Path]:
+        # Producers write hidden .tmp files and rename, so only complete chunks match
+        return sorted(p for p in self.landing_dir.glob("*.csv") if not p.name.startswith("."))
+
+    def _reject(self, path: Path, exc: Exception) -> None:
+        message = f"{type(exc).__name__}: {exc}"
+        os.replace(path, self.rejected_dir / path.name)
+        (self.rejected_dir / f"{path.name}.error.txt").write_text(message, encoding="utf-8")
+        self.batches_rejected += 1
+        print(f"stream_ingest: rejected {path.name}: {message}")
+
+    def _already_ingested(self, content_hash: str) -> bool:
+        row = self.conn.execute(
+            "SELECT chunk_name FROM ops.stream_chunks WHERE content_hash = ? LIMIT 1", [content_hash]
+        ).fetchone()
+        return row is not None
+
+    def _stage_new_readings(self, vitals: pd.DataFrame) -> int:
+        """
+        Copy the readings of vitals_batch_df whose (encounter_id, event_time, vital_type) is not in
+        curated.fact_vitals yet (nor earlier in the batch) into temp table stream_new_vitals.
+        Returns the rows staged. Only the batch's event dates are scanned.
+        """
+        event_dates = vitals["event_time"].dropna().dt.normalize()
+        first_date = event_dates.min().date() if len(event_dates) else None
+        last_date = event_dates.max().date() if len(event_dates) else None
+        self.conn.execute(
+            """
+            CREATE OR REPLACE TEMP TABLE stream_new_vitals AS
+            SELECT b.*
+            FROM vitals_batch_df AS b
+            ANTI JOIN (
+                SELECT encounter_id, event_time, vital_type
+                FROM curated.fact_vitals
+                WHERE event_date BETWEEN ? AND ?
+            ) AS f
+                ON f.encounter_id = b.encounter_id
+               AND f.event_time = b.event_time
+               AND f.vital_type = b.vital_type
+            QUALIFY row_number() OVER (PARTITION BY b.encounter_id, b.event_time, b.vital_type) = 1
+            """,
+            [first_date, last_date],
+        )
+        row = self.conn.execute("SELECT COUNT(*) FROM stream_new_vitals").fetchone()
+        return int(row[0]) if row else 0
+
+    def ingest_file(self, path: Path) -> Optional[int]:
+        """
+        Ingest one chunk file. Returns rows appended, or None if the batch was rejected or
+        had already been ingested. Readings already stored under the same
+        (encounter_id, event_time, vital_type) key (e.g. the day was also batch-loaded) are not
+        appended again.
+        """
+        data = path.read_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+        if self._already_ingested(content_hash):
+            os.replace(path, self.done_dir / path.name)
+            self.batches_skipped += 1
+            print(f"stream_ingest: skip {path.name} (already ingested)")
+            return None
+
+        # Empty, truncated or malformed chunks are rejected like invalid ones instead of
+        # stopping the tail loop (pandas parser errors are ValueErrors; missing columns KeyErrors)
+        try:
+            vitals = type_vitals(pd.read_csv(io.BytesIO(data)))
+            self.lookup.ensure_covers(vitals)
+            validate_vitals(vitals, self.lookup.index)
+        except (ValueError, KeyError) as exc:
+            self._reject(path, exc)
+            return None
+
+        self.conn.register("vitals_batch_df", vitals)
+        self.conn.begin()
+        try:
+            appended = self._stage_new_readings(vitals)
+            if appended:
+                self.conn.execute(
+                    """
+                    INSERT INTO raw.vitals
+                    SELECT
+                        encounter_id,
+                        patient_id,
+                        event_time,
+                        vital_type,
+                        value,
+                        source
+                    FROM stream_new_vitals
+                    """
+                )
+                self.conn.execute(
+                    """
+                    INSERT INTO curated.fact_vitals
+                    SELECT
+                        encounter_id,
+                        patient_id,
+                        CAST(event_time AS DATE) AS event_date,
+                        event_time,
+                        vital_type,
+                        value,
+                        source
+                    FROM stream_new_vitals
+                    ORDER BY event_date, encounter_id, event_time
+                    """
+                )
+                track_vitals_changes(self.conn, "stream_new_vitals")
+                refresh_gold(self.conn)
+                self.risk_scores.score_batch(self.conn, "stream_new_vitals")
+            self.conn.execute(
+                "INSERT INTO ops.stream_chunks (chunk_name, content_hash, rows_ingested) VALUES (?, ?, ?)",
+                [path.name, content_hash, appended],
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.execute("DROP TABLE IF EXISTS stream_new_vitals")
+            self.conn.unregister("vitals_batch_df")
+
+        os.replace(path, self.done_dir / path.name)
+        duplicates = len(vitals) - appended
+        if duplicates:
+            self.readings_skipped += duplicates
+            print(f"stream_ingest: {path.name} skipped {duplicates} readings already stored")
+        self.rows_ingested += appended
+        self.batches_ingested += 1
+        return appended
+
+    def drain(self) -> int:
+        """
+        Ingest every pending file once. Returns number of files processed.
+        """
+        files = self.pending_files()
+        for path in files:
+            landed_at = path.stat().st_mtime
+            rows = self.ingest_file(path)
+            if rows is not None:
+                latency = time.time() - landed_at
+                print(f"stream_ingest: {path.name} rows={rows} latency={latency:.2f}s")
+        return len(files)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-batch ingest of streamed vitals chunk files into DuckDB.")
+    parser.add_argument(
+        "--landing-dir",
+        default=str(Path("data") / "staged" / "landing" / "vitals"),
+        help="Directory the vitals producer writes chunk files to",
+    )
+    parser.add_argument("--poll-seconds", type=float, default=1.0, help="Wait between directory scans")
+    parser.add_argument("--once", action="store_true", help="Drain pending files once and exit")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    landing_dir = Path(args.landing_dir)
+    db_path = Path("data") / "processed" / "clinical_warehouse.duckdb"
+    schema_path = Path("etl_warehouse") / "sql" / "schema.sql"
+    landing_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=== STREAM INGEST START ===")
+    print(f"landing_dir: {landing_dir}")
+    print(f"db_path: {db_path}")
+
+    with WarehouseSession(db_path, schema_path) as session:
+        ingestor = MicroBatchIngestor(session.conn, landing_dir)
+        try:
+            while True:
+                processed = ingestor.drain()
+                if args.once:
+                    break
+                if processed == 0:
+                    time.sleep(args.poll_seconds)
+        except KeyboardInterrupt:
+            pass
+
+    print(
+        f"stream_ingest: batches={ingestor.batches_ingested} rows={ingestor.rows_ingested} "
+        f"rejected={ingestor.batches_rejected} skipped={ingestor.batches_skipped} "
+        f"duplicate_readings={ingestor.readings_skipped}"
+    )
+    print("=== STREAM INGEST STOPPED ===")
+
+
+if __name__ == "__main__":
+    main()
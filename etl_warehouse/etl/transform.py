@@ -3,17 +3,81 @@ from __future__ import annotations
 from typing import Dict
 import pandas as pd
 
+try:
+    from .categoricals import as_categorical
+    from .validation import validate_labs, validate_notes, validate_vitals
+except ImportError:
+    from categoricals import as_categorical
+    from validation import validate_labs, validate_notes, validate_vitals
 
-def transform_day(raw_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+
+def type_vitals(vitals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast raw vitals columns to warehouse-ready types (in place; returns the same frame).
+    Unparseable values become nulls and are caught by validation.validate_vitals.
+    vital_type and source become pd.Categorical; unit is dropped (derived from vital_type).
+    """
+    vitals["patient_id"] = pd.to_numeric(vitals["patient_id"], errors="coerce").astype("Int64")
+    vitals["encounter_id"] = pd.to_numeric(vitals["encounter_id"], errors="coerce").astype("Int64")
+    vitals["value"] = pd.to_numeric(vitals["value"], errors="coerce")
+    vitals["vital_type"] = as_categorical(vitals["vital_type"], "vital_type")
+    vitals["source"] = as_categorical(vitals["source"], "source")
+    if "unit" in vitals.columns:
+        del vitals["unit"]
+    vitals["event_time"] = pd.to_datetime(vitals["event_time"], errors="coerce")
+    return vitals
+
+
+def type_labs(labs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast raw labs columns to warehouse-ready types (in place; returns the same frame).
+    Unparseable values become nulls and are caught by validation.validate_labs.
+    """
+    labs["lab_event_id"] = pd.to_numeric(labs["lab_event_id"], errors="coerce").astype("Int64")
+    labs["encounter_id"] = pd.to_numeric(labs["encounter_id"], errors="coerce").astype("Int64")
+    labs["patient_id"] = pd.to_numeric(labs["patient_id"], errors="coerce").astype("Int64")
+    labs["event_time"] = pd.to_datetime(labs["event_time"], errors="coerce")
+    labs["test_name"] = labs["test_name"].astype("string")
+    labs["value"] = pd.to_numeric(labs["value"], errors="coerce").astype("float64")
+    labs["unit"] = labs["unit"].astype("string")
+    return labs
+
+
+def type_notes(notes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast raw notes columns to warehouse-ready types (in place; returns the same frame).
+    Unparseable values become nulls and are caught by validation.validate_notes.
+    """
+    notes["note_id"] = pd.to_numeric(notes["note_id"], errors="coerce").astype("Int64")
+    notes["encounter_id"] = pd.to_numeric(notes["encounter_id"], errors="coerce").astype("Int64")
+    notes["patient_id"] = pd.to_numeric(notes["patient_id"], errors="coerce").astype("Int64")
+    notes["note_time"] = pd.to_datetime(notes["note_time"], errors="coerce")
+    notes["note_type"] = notes["note_type"].astype("string")
+    notes["text"] = notes["text"].astype("string")
+    return notes
+
+
+def transform_day(raw_data: Dict[str, pd.DataFrame], validate: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Type and derive the day's frames. validate=False skips validate_vitals / validate_labs /
+    validate_notes so callers can run (and time) them as separate steps.
+    """
     patients = raw_data["patients"].copy()
     encounters = raw_data["encounters"].copy()
     vitals = raw_data["vitals"].copy()
+    labs = raw_data["labs"].copy()
+    notes = raw_data["notes"].copy()
 
     # Ensure integer IDs
     patients["patient_id"] = patients["patient_id"].astype(int)
     encounters["patient_id"] = encounters["patient_id"].astype(int)
     encounters["encounter_id"] = encounters["encounter_id"].astype(int)
 
+    # Fixed vocabularies as categoricals (loaded into the matching DuckDB ENUM columns)
+    patients["sex"] = as_categorical(patients["sex"], "sex")
+    encounters["scenario"] = as_categorical(encounters["scenario"], "scenario")
+    encounters["acuity"] = as_categorical(encounters["acuity"], "acuity")
+
     # Parse timestamps
     encounters["admit_time"] = pd.to_datetime(encounters["admit_time"])
     encounters["discharge_time"] = pd.to_datetime(encounters["discharge_time"])
@@ -22,55 +86,19 @@ def transform_day(raw_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
     delta = pd.to_datetime(encounters["discharge_time"]) - pd.to_datetime(encounters["admit_time"])
     encounters["los_hours"] = delta.dt.total_seconds() / 3600.0
 
-    # Vitals typing/parsing for warehouse readiness
-    vitals["patient_id"] = pd.to_numeric(vitals["patient_id"], errors="coerce").astype("Int64")
-    vitals["encounter_id"] = pd.to_numeric(vitals["encounter_id"], errors="coerce").astype("Int64")
-    vitals["value"] = pd.to_numeric(vitals["value"], errors="coerce")
-    vitals["vital_type"] = vitals["vital_type"].astype("string")
-    vitals["unit"] = vitals["unit"].astype("string")
-    vitals["event_time"] = pd.to_datetime(vitals["event_time"], errors="coerce")
-
-    # Required field validation (fail ETL if any required value is null)
-    required_vitals_cols = ["patient_id", "encounter_id", "event_time", "vital_type", "value"]
-    null_counts = vitals[required_vitals_cols].isna().sum()
-    violated = null_counts[null_counts > 0]
-    if not violated.empty:
-        details = ", ".join(f"{col}={int(count)}" for col, count in violated.items())
-        raise ValueError(f"Vitals required-field validation failed: {details}")
-
-    # Referential integrity: vitals must map to a real encounter and matching patient.
-    encounter_lookup = encounters[["encounter_id", "patient_id", "admit_time", "discharge_time"]].copy()
-    encounter_lookup = encounter_lookup.rename(columns={"patient_id": "encounter_patient_id"})
-    vitals_joined = vitals.merge(encounter_lookup, on="encounter_id", how="left")
-
-    missing_encounter_count = int(vitals_joined["encounter_patient_id"].isna().sum())
-    if missing_encounter_count > 0:
-        raise ValueError(
-            "Vitals referential integrity failed: "
-            f"{missing_encounter_count} rows have encounter_id not present in encounters"
-        )
-
-    patient_mismatch_count = int((vitals_joined["patient_id"] != vitals_joined["encounter_patient_id"]).sum())
-    if patient_mismatch_count > 0:
-        raise ValueError(
-            "Vitals referential integrity failed: "
-            f"{patient_mismatch_count} rows have patient_id that does not match the encounter patient_id"
-        )
-
-    # Core clinical time-window validation: event must occur during encounter.
-    outside_window = (
-        (vitals_joined["event_time"] < vitals_joined["admit_time"])
-        | (vitals_joined["event_time"] > vitals_joined["discharge_time"])
-    )
-    outside_window_count = int(outside_window.sum())
-    if outside_window_count > 0:
-        raise ValueError(
-            "Vitals time-window validation failed: "
-            f"{outside_window_count} rows have event_time outside admit_time..discharge_time"
-        )
+    # Vitals typing/parsing and validation for warehouse readiness
+    vitals = type_vitals(vitals)
+    labs = type_labs(labs)
+    notes = type_notes(notes)
+    if validate:
+        validate_vitals(vitals, encounters)
+        validate_labs(labs, encounters)
+        validate_notes(notes, encounters)
 
     return {
         "patients": patients,
         "encounters": encounters,
         "vitals": vitals,
+        "labs": labs,
+        "notes": notes,
     }
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from typing import List, Tuple, TypedDict, Union
+
+import numpy as np
+import pandas as pd
+
+
+REQUIRED_VITALS_COLUMNS = ["patient_id", "encounter_id", "event_time", "vital_type", "value"]
+
+REQUIRED_LABS_COLUMNS = ["lab_event_id", "patient_id", "encounter_id", "event_time", "test_name", "value"]
+
+# labs.schema.json test_name enum
+LAB_TEST_NAMES = ["WBC", "HGB", "PLT", "Na", "K", "Cr", "BUN", "Glucose", "Lactate", "Troponin"]
+
+REQUIRED_NOTES_COLUMNS = ["note_id", "patient_id", "encounter_id", "note_time", "note_type", "text"]
+
+# notes.schema.json note_type enum
+NOTE_TYPES = ["triage", "progress", "assessment_plan", "lab_review", "discharge"]
+
+SAMPLE_COLUMNS = ["encounter_id", "patient_id", "event_time"]
+
+
+class EventCheckResult(TypedDict):
+    missing_encounter: int
+    missing_encounter_samples: pd.DataFrame
+    patient_mismatch: int
+    patient_mismatch_samples: pd.DataFrame
+    outside_window: int
+    outside_window_samples: pd.DataFrame
+
+
+def _as_datetime_us(values: Union[pd.Series, np.ndarray]) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[us]").view(np.int64)
+
+
+class EncounterIndex:
+    """
+    Compact lookup from encounter_id to (patient_id, admit_time, discharge_time).
+
+    Encounters are held as four aligned NumPy arrays sorted by encounter_id; lookups are a single
+    vectorized searchsorted, so validating N vitals costs O(N log E) with no joined copy of the
+    vitals frame. Times are stored as int64 microseconds.
+    """
+
+    def __init__(
+        self,
+        encounter_ids: np.ndarray,
+        patient_ids: np.ndarray,
+        admit_times: np.ndarray,
+        discharge_times: np.ndarray,
+    ) -> None:
+        order = np.argsort(encounter_ids, kind="stable")
+        self.encounter_ids = np.asarray(encounter_ids, dtype=np.int64)[order]
+        self.patient_ids = np.asarray(patient_ids, dtype=np.int64)[order]
+        self.admit_times = _as_datetime_us(admit_times)[order]
+        # An encounter without a discharge_time yet has no upper bound (NULL compares false in the SQL engine)
+        discharge = np.asarray(discharge_times, dtype="datetime64[us]")
+        self.discharge_times = np.where(np.isnat(discharge), np.iinfo(np.int64).max, discharge.view(np.int64))[order]
+
+    @classmethod
+    def from_frame(cls, encounters: pd.DataFrame) -> "EncounterIndex":
+        return cls(
+            encounters["encounter_id"].to_numpy(dtype=np.int64),
+            encounters["patient_id"].to_numpy(dtype=np.int64),
+            encounters["admit_time"].to_numpy(),
+            encounters["discharge_time"].to_numpy(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.encounter_ids)
+
+    def locate(self, encounter_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (positions, found): positions into the index arrays (clipped, only meaningful
+        where found is True) and a boolean mask of ids present in the index.
+        """
+        if len(self.encounter_ids) == 0:
+            return np.zeros(len(encounter_ids), dtype=np.int64), np.zeros(len(encounter_ids), dtype=bool)
+        positions = np.searchsorted(self.encounter_ids, encounter_ids)
+        np.minimum(positions, len(self.encounter_ids) - 1, out=positions)
+        found = self.encounter_ids[positions] == encounter_ids
+        return positions, found
+
+    def covers(self, encounter_ids: np.ndarray) -> bool:
+        _, found = self.locate(np.unique(encounter_ids))
+        return bool(found.all())
+
+
+def check_events(
+    events: pd.DataFrame,
+    index: EncounterIndex,
+    sample_size: int = 5,
+    time_column: str = "event_time",
+) -> EventCheckResult:
+    """
+    Run referential-integrity and time-window checks for typed encounter events (vitals, labs,
+    notes) in one vectorized pass. Events must already have non-null required fields.
+    Returns the count and up to sample_size offending rows for each check (time column
+    reported as event_time).
+    """
+    encounter_ids = events["encounter_id"].to_numpy(dtype=np.int64)
+    positions, found = index.locate(encounter_ids)
+
+    missing = ~found
+    mismatch = found & (index.patient_ids[positions] != events["patient_id"].to_numpy(dtype=np.int64))
+
+    event_times = _as_datetime_us(events[time_column].to_numpy())
+    outside = found & (
+        (event_times < index.admit_times[positions]) | (event_times > index.discharge_times[positions])
+    )
+
+    def samples(mask: np.ndarray) -> pd.DataFrame:
+        rows = events.iloc[np.flatnonzero(mask)[:sample_size]].rename(columns={time_column: "event_time"})
+        return rows[SAMPLE_COLUMNS]
+
+    return {
+        "missing_encounter": int(missing.sum()),
+        "missing_encounter_samples": samples(missing),
+        "patient_mismatch": int(mismatch.sum()),
+        "patient_mismatch_samples": samples(mismatch),
+        "outside_window": int(outside.sum()),
+        "outside_window_samples": samples(outside),
+    }
+
+
+def _format_samples(samples: pd.DataFrame) -> str:
+    rows: List[str] = [
+        f"row {idx}: encounter_id={row.encounter_id}, patient_id={row.patient_id}, event_time={row.event_time}"
+        for idx, row in zip(samples.index, samples.itertuples(index=False))
+    ]
+    return "; ".join(rows)
+
+
+def _validate_events(
+    events: pd.DataFrame,
+    encounters: Union[pd.DataFrame, EncounterIndex],
+    label: str,
+    required_columns: List[str],
+    sample_size: int,
+    time_column: str = "event_time",
+) -> None:
+    # Required field validation (fail ETL if any required value is null)
+    null_counts = events[required_columns].isna().sum()
+    violated = null_counts[null_counts > 0]
+    if not violated.empty:
+        details = ", ".join(f"{col}={int(count)}" for col, count in violated.items())
+        raise ValueError(f"{label} required-field validation failed: {details}")
+
+    index = encounters if isinstance(encounters, EncounterIndex) else EncounterIndex.from_frame(encounters)
+    result = check_events(events, index, sample_size=sample_size, time_column=time_column)
+
+    # Referential integrity: events must map to a real encounter and matching patient.
+    if result["missing_encounter"]:
+        raise ValueError(
+            f"{label} referential integrity failed: "
+            f"{result['missing_encounter']} rows have encounter_id not present in encounters "
+            f"(samples: {_format_samples(result['missing_encounter_samples'])})"
+        )
+    if result["patient_mismatch"]:
+        raise ValueError(
+            f"{label} referential integrity failed: "
+            f"{result['patient_mismatch']} rows have patient_id that does not match the encounter patient_id "
+            f"(samples: {_format_samples(result['patient_mismatch_samples'])})"
+        )
+
+    # Core clinical time-window validation: event must occur during encounter.
+    if result["outside_window"]:
+        raise ValueError(
+            f"{label} time-window validation failed: "
+            f"{result['outside_window']} rows have {time_column} outside admit_time..discharge_time "
+            f"(samples: {_format_samples(result['outside_window_samples'])})"
+        )
+
+
+def validate_vitals(
+    vitals: pd.DataFrame,
+    encounters: Union[pd.DataFrame, EncounterIndex],
+    sample_size: int = 5,
+) -> None:
+    """
+    Validate typed vitals against encounters (a DataFrame or a prebuilt EncounterIndex).
+    Raises ValueError on required-field, referential-integrity or time-window violations;
+    errors include up to sample_size offending rows.
+    """
+    _validate_events(vitals, encounters, "Vitals", REQUIRED_VITALS_COLUMNS, sample_size)
+
+
+def validate_labs(
+    labs: pd.DataFrame,
+    encounters: Union[pd.DataFrame, EncounterIndex],
+    sample_size: int = 5,
+) -> None:
+    """
+    Validate typed labs: the vitals rules (required fields, referential integrity, time window)
+    plus a unique lab_event_id and a test_name from the labs.schema.json enum.
+    """
+    _validate_events(labs, encounters, "Labs", REQUIRED_LABS_COLUMNS, sample_size)
+
+    duplicates = int(labs["lab_event_id"].duplicated().sum())
+    if duplicates:
+        raise ValueError(f"Labs key validation failed: {duplicates} rows repeat an existing lab_event_id")
+
+    unknown = sorted(set(labs["test_name"].dropna().unique()) - set(LAB_TEST_NAMES))
+    if unknown:
+        raise ValueError(f"Labs domain validation failed: unknown test_name values {', '.join(map(str, unknown))}")
+
+
+def validate_notes(
+    notes: pd.DataFrame,
+    encounters: Union[pd.DataFrame, EncounterIndex],
+    sample_size: int = 5,
+) -> None:
+    """
+    Validate typed notes: required fields, referential integrity and note_time within the
+    encounter window, plus a unique note_id and a note_type from the notes.schema.json enum.
+    """
+    _validate_events(notes, encounters, "Notes", REQUIRED_NOTES_COLUMNS, sample_size, time_column="note_time")
+
+    duplicates = int(notes["note_id"].duplicated().sum())
+    if duplicates:
+        raise ValueError(f"Notes key validation failed: {duplicates} rows repeat an existing note_id")
+
+    unknown = sorted(set(notes["note_type"].dropna().unique()) - set(NOTE_TYPES))
+    if unknown:
+        raise ValueError(f"Notes domain validation failed: unknown note_type values {', '.join(map(str, unknown))}")
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, TypedDict
+
+import duckdb
+
+
+ROLLUP_TABLES = ["fact_vitals_5m", "fact_vitals_1h"]
+
+
+class VitalsTier(TypedDict):
+    name: str
+    table: str
+    bucket_minutes: int  # 0 for raw readings
+
+
+# Finest to coarsest. Each rollup is built from the tier before it.
+VITALS_TIERS: List[VitalsTier] = [
+    {"name": "raw", "table": "curated.fact_vitals", "bucket_minutes": 0},
+    {"name": "5m", "table": "curated.fact_vitals_5m", "bucket_minutes": 5},
+    {"name": "1h", "table": "curated.fact_vitals_1h", "bucket_minutes": 60},
+]
+
+DEFAULT_TREND_RESOLUTION_MINUTES = 60
+
+ROLLUP_FROM_RAW_SELECT = """
+    SELECT
+        encounter_id,
+        vital_type,
+        time_bucket(INTERVAL '{minutes} minutes', event_time) AS bucket_start,
+        COUNT(*) AS reading_count,
+        MIN(value) AS min_value,
+        MAX(value) AS max_value,
+        SUM(value) AS sum_value,
+        AVG(value) AS mean_value,
+        arg_max(value, event_time) AS last_value,
+        MAX(event_time) AS last_event_time
+    FROM {source}
+    WHERE {filter}
+    GROUP BY encounter_id, vital_type, time_bucket(INTERVAL '{minutes} minutes', event_time)
+    ORDER BY encounter_id, vital_type, bucket_start
+"""
+
+# Re-aggregates a finer rollup into coarser buckets; exact because sums, counts and last times carry over.
+ROLLUP_FROM_ROLLUP_SELECT = """
+    SELECT
+        encounter_id,
+        vital_type,
+        time_bucket(INTERVAL '{minutes} minutes', bucket_start) AS bucket_start,
+        SUM(reading_count) AS reading_count,
+        MIN(min_value) AS min_value,
+        MAX(max_value) AS max_value,
+        SUM(sum_value) AS sum_value,
+        SUM(sum_value) / SUM(reading_count) AS mean_value,
+        arg_max(last_value, last_event_time) AS last_value,
+        MAX(last_event_time) AS last_event_time
+    FROM {source}
+    WHERE {filter}
+    GROUP BY encounter_id, vital_type, time_bucket(INTERVAL '{minutes} minutes', bucket_start)
+    ORDER BY encounter_id, vital_type, bucket_start
+"""
+
+WATERMARK_SQL = "SELECT MAX(compacted_before) FROM ops.vitals_retention"
+
+
+class VitalsBucket(TypedDict):
+    encounter_id: int
+    vital_type: str
+    bucket_start: str  # ISO format
+    reading_count: int
+    min_value: float
+    max_value: float
+    mean_value: float
+    last_value: float
+
+
+class VitalsTrend(TypedDict):
+    tier: str
+    resolution_minutes: int
+    buckets: List[VitalsBucket]
+
+
+BUCKET_KEY = "encounter_id, vital_type, bucket_start"
+
+
+def _tier_select(tier: VitalsTier, minutes: int, filter_sql: str) -> str:
+    if tier["bucket_minutes"] == 0:
+        return ROLLUP_FROM_RAW_SELECT.format(minutes=minutes, source=tier["table"], filter=filter_sql)
+    return ROLLUP_FROM_ROLLUP_SELECT.format(minutes=minutes, source=tier["table"], filter=filter_sql)
+
+
+def _merge_into_tier(conn: duckdb.DuckDBPyConnection, tier: VitalsTier, delta: str) -> None:
+    """
+    Merge the 5-minute aggregates in temp table delta into tier's buckets: the touched buckets are
+    re-aggregated from their current row plus the delta (exact, like ROLLUP_FROM_ROLLUP_SELECT),
+    deleted and re-inserted. Other buckets are not read.
+    """
+    table = tier["table"]
+    minutes = tier["bucket_minutes"]
+    conn.execute(
+        "CREATE OR REPLACE TEMP TABLE vitals_rollup_tier_delta AS "
+        + ROLLUP_FROM_ROLLUP_SELECT.format(minutes=minutes, source=delta, filter="TRUE")
+    )
+    merged_source = f"""(
+        SELECT * FROM {table}
+        WHERE ({BUCKET_KEY}) IN (SELECT {BUCKET_KEY} FROM vitals_rollup_tier_delta)
+        UNION ALL
+        SELECT * FROM vitals_rollup_tier_delta
+    )"""
+    try:
+        conn.execute(
+            "CREATE OR REPLACE TEMP TABLE vitals_rollup_merged AS "
+            + ROLLUP_FROM_ROLLUP_SELECT.format(minutes=minutes, source=merged_source, filter="TRUE")
+        )
+        conn.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE ({BUCKET_KEY}) IN (SELECT {BUCKET_KEY} FROM vitals_rollup_tier_delta)
+            """
+        )
+        conn.execute(f"INSERT INTO {table} SELECT * FROM vitals_rollup_merged")
+    finally:
+        conn.execute("DROP TABLE IF EXISTS vitals_rollup_merged")
+        conn.execute("DROP TABLE IF EXISTS vitals_rollup_tier_delta")
+
+
+def compacted_before(conn: duckdb.DuckDBPyConnection) -> Optional[datetime]:
+    """
+    Retention watermark: raw vitals before this time were compacted into the rollups (None if never).
+    """
+    row = conn.execute(WATERMARK_SQL).fetchone()
+    return row[0] if row else None
+
+
+def bootstrap_vitals_rollups(conn: duckdb.DuckDBPyConnection, rollups_path: Path) -> None:
+    """
+    Create the rollup tables from vitals_rollups.sql and build them from curated.fact_vitals
+    when a rollup table is created for the first time.
+    """
+    existing = {
+        row[0]
+        for row in conn.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE schema_name = 'curated'"
+        ).fetchall()
+    }
+    rollups_sql = rollups_path.read_text(encoding="utf-8").strip()
+    if rollups_sql:
+        conn.execute(rollups_sql)
+
+    if any(name not in existing for name in ROLLUP_TABLES):
+        refresh_vitals_rollups(conn)
+
+
+def refresh_vitals_rollups(
+    conn: duckdb.DuckDBPyConnection,
+    encounters: Optional[str] = None,
+    appended: Optional[str] = None,
+) -> None:
+    """
+    Bring curated.fact_vitals_5m / fact_vitals_1h up to date with curated.fact_vitals.
+
+    With neither encounters nor appended, both rollups are rebuilt from the raw vitals and the
+    retention history is cleared (replace-mode loads, first creation).
+
+    encounters names a relation with encounter_ids whose readings were replaced (incremental day
+    loads): for each, every 5-minute bucket from the retention watermark on (all of them if nothing
+    was compacted; from its first raw reading if re-loaded readings start before the watermark) is
+    deleted and re-aggregated from raw, so buckets whose raw rows were compacted away are kept while
+    buckets of replaced readings never outlive them. Hourly buckets of those encounters are then
+    rebuilt from the 5-minute rollup.
+
+    appended names a relation of readings appended to curated.fact_vitals (encounter_id, vital_type,
+    event_time, value; e.g. a streamed micro-batch): they are aggregated into 5-minute buckets and
+    merged into just the 5-minute and hourly buckets they fall into, so the cost is O(rows appended)
+    regardless of the encounters' history (also exact for buckets whose raw rows were compacted).
+    Readings of encounters also in encounters are covered by the re-aggregation above.
+    Runs in the caller's transaction.
+    """
+    five_min, hourly = VITALS_TIERS[1], VITALS_TIERS[2]
+    if encounters is None and appended is None:
+        conn.execute("DELETE FROM curated.fact_vitals_5m")
+        conn.execute("DELETE FROM curated.fact_vitals_1h")
+        conn.execute("DELETE FROM ops.vitals_retention")
+        conn.execute("INSERT INTO curated.fact_vitals_5m " + _tier_select(VITALS_TIERS[0], 5, "TRUE"))
+        conn.execute("INSERT INTO curated.fact_vitals_1h " + _tier_select(five_min, hourly["bucket_minutes"], "TRUE"))
+        return
+
+    if encounters is not None:
+        _refresh_encounters(conn, encounters)
+
+    if appended is not None:
+        appended_filter = "TRUE"
+        if encounters is not None:
+            appended_filter = f"encounter_id NOT IN (SELECT encounter_id FROM {encounters})"
+        conn.execute(
+            "CREATE OR REPLACE TEMP TABLE vitals_rollup_delta AS "
+            + ROLLUP_FROM_RAW_SELECT.format(minutes=five_min["bucket_minutes"], source=appended, filter=appended_filter)
+        )
+        try:
+            _merge_into_tier(conn, five_min, "vitals_rollup_delta")
+            _merge_into_tier(conn, hourly, "vitals_rollup_delta")
+        finally:
+            conn.execute("DROP TABLE IF EXISTS vitals_rollup_delta")
+
+
+def _refresh_encounters(conn: duckdb.DuckDBPyConnection, encounters: str) -> None:
+    five_min, hourly = VITALS_TIERS[1], VITALS_TIERS[2]
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE vitals_rollup_scope AS
+        SELECT
+            t.encounter_id,
+            CASE WHEN w.compacted_before IS NOT NULL THEN least(r.first_bucket, w.compacted_before) END AS lower_bound
+        FROM (SELECT DISTINCT encounter_id FROM {encounters}) AS t
+        LEFT JOIN (
+            SELECT encounter_id, time_bucket(INTERVAL '5 minutes', MIN(event_time)) AS first_bucket
+            FROM curated.fact_vitals
+            WHERE encounter_id IN (SELECT encounter_id FROM {encounters})
+            GROUP BY encounter_id
+        ) AS r ON r.encounter_id = t.encounter_id
+        CROSS JOIN ({WATERMARK_SQL}) AS w (compacted_before)
+        """
+    )
+    try:
+        conn.execute(
+            """
+            DELETE FROM curated.fact_vitals_5m AS v
+            USING vitals_rollup_scope AS s
+            WHERE v.encounter_id = s.encounter_id
+              AND (s.lower_bound IS NULL OR v.bucket_start >= s.lower_bound)
+            """
+        )
+        scope_filter = "encounter_id IN (SELECT encounter_id FROM vitals_rollup_scope)"
+        conn.execute("INSERT INTO curated.fact_vitals_5m " + _tier_select(VITALS_TIERS[0], 5, scope_filter))
+        conn.execute(f"DELETE FROM curated.fact_vitals_1h WHERE {scope_filter}")
+        conn.execute(
+            "INSERT INTO curated.fact_vitals_1h "
+            + _tier_select(five_min, hourly["bucket_minutes"], scope_filter)
+        )
+    finally:
+        conn.execute("DROP TABLE IF EXISTS vitals_rollup_scope")
+
+
+def compact_vitals(conn: duckdb.DuckDBPyConnection, raw_days: int) -> int:
+    """
+    Apply the raw vitals retention policy: keep raw readings from the newest raw_days loaded days on
+    (days are encounter admit dates, so readings of long stays that run past the newest day do not move
+    the cutoff) in curated.fact_vitals / curated.fact_vitals_wide / raw.vitals and delete older ones,
+    which stay available in the rollups (kept current by every load). The cutoff never moves backwards,
+    so readings re-loaded from before an earlier cutoff are compacted again. Runs in its own
+    transaction; returns the curated rows deleted.
+    """
+    if raw_days < 1:
+        raise ValueError(f"raw_days must be at least 1 (got {raw_days})")
+
+    conn.begin()
+    try:
+        row = conn.execute(
+            f"""
+            SELECT greatest(
+                CAST(MAX(CAST(admit_time AS DATE)) - {int(raw_days) - 1} AS TIMESTAMP),
+                ({WATERMARK_SQL})
+            )
+            FROM curated.fact_encounters
+            """
+        ).fetchone()
+        cutoff = row[0] if row else None
+        if cutoff is None:
+            conn.commit()
+            return 0
+
+        raw_deleted = conn.execute("DELETE FROM raw.vitals WHERE event_time < ?", [cutoff]).fetchone()
+        curated_deleted = conn.execute("DELETE FROM curated.fact_vitals WHERE event_time < ?", [cutoff]).fetchone()
+        conn.execute("DELETE FROM curated.fact_vitals_wide WHERE event_time < ?", [cutoff])
+        raw_rows = int(raw_deleted[0]) if raw_deleted else 0
+        curated_rows = int(curated_deleted[0]) if curated_deleted else 0
+        if raw_rows or curated_rows:
+            conn.execute(
+                """
+                INSERT INTO ops.vitals_retention (compacted_before, raw_rows_deleted, curated_rows_deleted)
+                VALUES (?, ?, ?)
+                """,
+                [cutoff, raw_rows, curated_rows],
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return curated_rows
+
+
+def pick_vitals_tier(
+    conn: duckdb.DuckDBPyConnection,
+    start: Optional[datetime],
+    resolution_minutes: int,
+) -> VitalsTier:
+    """
+    Return the coarsest tier whose buckets divide resolution_minutes and that covers readings
+    from start on (raw vitals only cover the time after the retention watermark).
+    Raises ValueError when no tier can serve the request.
+    """
+    if resolution_minutes < 1:
+        raise ValueError(f"resolution_minutes must be at least 1 (got {resolution_minutes})")
+
+    watermark = compacted_before(conn)
+    for tier in reversed(VITALS_TIERS):
+        if tier["bucket_minutes"] == 0:
+            if watermark is None or (start is not None and start >= watermark):
+                return tier
+        elif resolution_minutes % tier["bucket_minutes"] == 0:
+            return tier
+    raise ValueError(
+        f"No vitals tier serves a {resolution_minutes}-minute resolution from {start or 'the beginning'}: "
+        f"raw vitals before {watermark} were compacted (finest rollup: {VITALS_TIERS[1]['bucket_minutes']} minutes)"
+    )
+
+
+def query_vitals_trend(
+    conn: duckdb.DuckDBPyConnection,
+    encounter_id: Optional[int] = None,
+    vital_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution_minutes: int = DEFAULT_TREND_RESOLUTION_MINUTES,
+) -> VitalsTrend:
+    """
+    Return vitals per encounter_id / vital_type / resolution_minutes bucket in [start, end),
+    read from the coarsest tier that can serve it (pick_vitals_tier) and re-bucketed to the
+    requested resolution, so an hourly trend reads the hourly rollup instead of every reading.
+    """
+    tier = pick_vitals_tier(conn, start, resolution_minutes)
+    time_column = "event_time" if tier["bucket_minutes"] == 0 else "bucket_start"
+
+    conditions: List[str] = []
+    params: List[object] = []
+    if encounter_id is not None:
+        conditions.append("encounter_id = ?")
+        params.append(int(encounter_id))
+    if vital_type is not None:
+        conditions.append("vital_type = ?")
+        params.append(vital_type)
+    if start is not None:
+        conditions.append(f"{time_column} >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append(f"{time_column} < ?")
+        params.append(end)
+
+    sql = _tier_select(tier, resolution_minutes, " AND ".join(conditions) or "TRUE")
+    buckets: List[VitalsBucket] = [
+        {
+            "encounter_id": int(row[0]),
+            "vital_type": str(row[1]),
+            "bucket_start": row[2].isoformat(),
+            "reading_count": int(row[3]),
+            "min_value": float(row[4]),
+            "max_value": float(row[5]),
+            "mean_value": float(row[7]),
+            "last_value": float(row[8]),
+        }
+        for row in conn.execute(sql, params).fetchall()
+    ]
+    return {"tier": tier["name"], "resolution_minutes": resolution_minutes, "buckets": buckets}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Vitals trends from the rollup tiers, and raw vitals retention.")
+    p.add_argument("--db", default="data/processed/clinical_warehouse.duckdb", help="DuckDB warehouse path")
+    commands = p.add_subparsers(dest="command", required=True)
+
+    trend = commands.add_parser("trend", help="Print a vitals trend from the coarsest tier that serves it")
+    trend.add_argument("--encounter-id", type=int, default=None)
+    trend.add_argument("--vital-type", default=None, help="e.g. heart_rate")
+    trend.add_argument("--start", default=None, help="Range start (ISO timestamp, inclusive)")
+    trend.add_argument("--end", default=None, help="Range end (ISO timestamp, exclusive)")
+    trend.add_argument(
+        "--resolution",
+        type=int,
+        default=DEFAULT_TREND_RESOLUTION_MINUTES,
+        help=f"Bucket size in minutes (default: {DEFAULT_TREND_RESOLUTION_MINUTES})",
+    )
+
+    compact = commands.add_parser("compact", help="Compact raw vitals older than the newest N days into the rollups")
+    compact.add_argument("--raw-days", type=int, required=True)
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "compact":
+        with duckdb.connect(args.db) as conn:
+            deleted = compact_vitals(conn, args.raw_days)
+            watermark = compacted_before(conn)
+        print(f"vitals_retention: compacted {deleted} raw vitals rows (raw kept from {watermark})")
+        return
+
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) if args.end else None
+    with duckdb.connect(args.db, read_only=True) as conn:
+        trend = query_vitals_trend(
+            conn,
+            encounter_id=args.encounter_id,
+            vital_type=args.vital_type,
+            start=start,
+            end=end,
+            resolution_minutes=args.resolution,
+        )
+
+    print(
+        f"vitals_trend: {len(trend['buckets'])} buckets "
+        f"(resolution={trend['resolution_minutes']}m, tier={trend['tier']})"
+    )
+    for bucket in trend["buckets"]:
+        print(
+            f"encounter_id={bucket['encounter_id']} {bucket['vital_type']} {bucket['bucket_start']} "
+            f"n={bucket['reading_count']} min={bucket['min_value']:.1f} max={bucket['max_value']:.1f} "
+            f"mean={bucket['mean_value']:.1f} last={bucket['last_value']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
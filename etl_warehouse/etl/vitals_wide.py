@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+
+try:
+    from .categoricals import VITAL_TYPES
+except ImportError:
+    from categoricals import VITAL_TYPES
+
+
+# Pivot of curated.fact_vitals: several readings of one vital type at the same time are averaged
+# (as for the risk score observation vectors); a timestep whose readings disagree on source is
+# attributed to the first source in vital_source_enum order (monitor).
+WIDE_FROM_LONG_SELECT = """
+    SELECT
+        encounter_id,
+        patient_id,
+        event_date,
+        event_time,
+        MIN(source) AS source,
+        {vital_columns}
+    FROM curated.fact_vitals
+    WHERE {filter}
+    GROUP BY encounter_id, patient_id, event_date, event_time
+    ORDER BY event_date, encounter_id, event_time
+"""
+
+
+def _wide_select(filter_sql: str) -> str:
+    return WIDE_FROM_LONG_SELECT.format(
+        vital_columns=",\n        ".join(
+            f"AVG(value) FILTER (WHERE vital_type = '{name}') AS {name}" for name in VITAL_TYPES
+        ),
+        filter=filter_sql,
+    )
+
+
+def bootstrap_vitals_wide(conn: duckdb.DuckDBPyConnection, vitals_wide_path: Path) -> None:
+    """
+    Create curated.fact_vitals_wide from vitals_wide.sql and build it from curated.fact_vitals
+    when the table is created for the first time.
+    """
+    existing = conn.execute(
+        """
+        SELECT COUNT(*) FROM duckdb_tables()
+        WHERE schema_name = 'curated' AND table_name = 'fact_vitals_wide'
+        """
+    ).fetchone()
+    vitals_wide_sql = vitals_wide_path.read_text(encoding="utf-8").strip()
+    if vitals_wide_sql:
+        conn.execute(vitals_wide_sql)
+
+    if not existing or not existing[0]:
+        refresh_vitals_wide(conn)
+
+
+def refresh_vitals_wide(
+    conn: duckdb.DuckDBPyConnection,
+    encounters: Optional[str] = None,
+    appended: Optional[str] = None,
+) -> None:
+    """
+    Bring curated.fact_vitals_wide up to date with curated.fact_vitals.
+
+    With neither encounters nor appended, the whole table is rebuilt (replace-mode loads, first
+    creation). encounters names a relation with encounter_ids whose readings were replaced: their
+    wide rows are deleted and re-pivoted from the long rows, so re-loaded and compacted readings are
+    reflected. appended names a relation of readings appended to curated.fact_vitals (encounter_id,
+    event_time, ...; e.g. a streamed micro-batch): only the timesteps they fall into are re-pivoted,
+    so the cost does not grow with the encounters' history.
+    Runs in the caller's transaction.
+    """
+    if encounters is None and appended is None:
+        conn.execute("DELETE FROM curated.fact_vitals_wide")
+        conn.execute("INSERT INTO curated.fact_vitals_wide " + _wide_select("TRUE"))
+        return
+
+    if encounters is not None:
+        scope_filter = f"encounter_id IN (SELECT encounter_id FROM {encounters})"
+        conn.execute(f"DELETE FROM curated.fact_vitals_wide WHERE {scope_filter}")
+        conn.execute("INSERT INTO curated.fact_vitals_wide " + _wide_select(scope_filter))
+
+    if appended is not None:
+        timestep_filter = f"(encounter_id, event_time) IN (SELECT encounter_id, event_time FROM {appended})"
+        if encounters is not None:
+            timestep_filter += f" AND encounter_id NOT IN (SELECT encounter_id FROM {encounters})"
+        conn.execute(f"DELETE FROM curated.fact_vitals_wide WHERE {timestep_filter}")
+        conn.execute("INSERT INTO curated.fact_vitals_wide " + _wide_select(timestep_filter))
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import argparse
+import json
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, TypedDict
+
+import duckdb
+
+
+QUALITY_DIR = Path(__file__).resolve().parent
+SCHEMAS_DIR = QUALITY_DIR.parent / "schemas"
+EXPECTATIONS_PATH = QUALITY_DIR / "expectations.md"
+
+SEVERITIES = ["warn", "fail"]
+
+RESULT_FIELDS = [
+    "run_id",
+    "day",
+    "dataset",
+    "table_name",
+    "check_name",
+    "column_name",
+    "severity",
+    "status",
+    "failed_rows",
+    "row_count",
+]
+
+
+class Check(TypedDict):
+    check_name: str
+    column_name: Optional[str]
+    severity: str
+    failed_rows_sql: str  # aggregate over the joined rows counting violations
+
+
+class TableChecks(TypedDict):
+    dataset: str
+    table: str
+    raw_table: str
+    primary_key: List[str]
+    joins: List[str]
+    checks: List[Check]
+
+
+class RowExpectation(TypedDict):
+    dataset: str
+    check_name: str
+    rule: str
+    severity: str
+
+
+class CheckResult(TypedDict):
+    dataset: str
+    table_name: str
+    check_name: str
+    column_name: Optional[str]
+    severity: str
+    status: str  # pass | warn | fail
+    failed_rows: int
+    row_count: int
+
+
+class QualityRecord(CheckResult):
+    run_id: str
+    day: Optional[str]
+
+
+class QualityReport(TypedDict):
+    row_counts: Dict[str, int]
+    raw_row_counts: Dict[str, int]
+    results: List[CheckResult]
+
+
+def _severity(value: Any, default: str = "fail") -> str:
+    severity = str(value or default)
+    if severity not in SEVERITIES:
+        raise ValueError(f"Unknown check severity: {severity} (expected one of {', '.join(SEVERITIES)})")
+    return severity
+
+
+def _sql_literal(value: Any) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def load_table_schemas(schemas_dir: Path = SCHEMAS_DIR) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the table contracts (staged_*.schema.json) keyed by dataset. Empty placeholder files are skipped.
+    """
+    schemas: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(schemas_dir.glob("staged_*.schema.json")):
+        text = path.read_text(encoding="utf-8").strip()
+        if not text:
+            continue
+        schema = json.loads(text)
+        schemas[str(schema["dataset"])] = schema
+    return schemas
+
+
+def parse_expectations(expectations_path: Path = EXPECTATIONS_PATH) -> List[RowExpectation]:
+    """
+    Parse the row expectations table (| dataset | check | rule | severity | description |) from expectations.md.
+    """
+    if not expectations_path.exists():
+        return []
+    expectations: List[RowExpectation] = []
+    for line in expectations_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line.startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        if len(cells) < 4 or cells[0] in ("dataset", "") or set(cells[0]) <= {"-", " "}:
+            continue
+        expectations.append(
+            {
+                "dataset": cells[0],
+                "check_name": cells[1],
+                "rule": cells[2],
+                "severity": _severity(cells[3]),
+            }
+        )
+    return expectations
+
+
+def compile_table_checks(
+    schema: Dict[str, Any],
+    schemas: Dict[str, Dict[str, Any]],
+    expectations: List[RowExpectation],
+) -> TableChecks:
+    """
+    Turn one table contract and its row expectations into aggregate expressions over a single scan.
+    The table is aliased by its dataset name and each foreign-key parent (LEFT JOIN) by the referenced dataset.
+    """
+    dataset = str(schema["dataset"])
+    alias = dataset
+    checks: List[Check] = []
+
+    for field in schema.get("fields", []):
+        column = str(field["name"])
+        constraints = field.get("constraints") or {}
+        severity = _severity(constraints.get("severity"))
+        qualified = f"{alias}.{column}"
+        if field.get("required"):
+            checks.append(
+                {
+                    "check_name": f"{column}_not_null",
+                    "column_name": column,
+                    "severity": "fail",
+                    "failed_rows_sql": f"COUNT(*) FILTER (WHERE {qualified} IS NULL)",
+                }
+            )
+        if "enum" in constraints:
+            values = ", ".join(_sql_literal(value) for value in constraints["enum"])
+            checks.append(
+                {
+                    "check_name": f"{column}_accepted_values",
+                    "column_name": column,
+                    "severity": severity,
+                    "failed_rows_sql": f"COUNT(*) FILTER (WHERE {qualified} NOT IN ({values}))",
+                }
+            )
+        bounds = []
+        if "min" in constraints:
+            bounds.append(f"{qualified} < {_sql_literal(constraints['min'])}")
+        if "max" in constraints:
+            bounds.append(f"{qualified} > {_sql_literal(constraints['max'])}")
+        if bounds:
+            checks.append(
+                {
+                    "check_name": f"{column}_range",
+                    "column_name": column,
+                    "severity": severity,
+                    "failed_rows_sql": f"COUNT(*) FILTER (WHERE {' OR '.join(bounds)})",
+                }
+            )
+
+    primary_key = [str(column) for column in schema.get("primary_key", [])]
+    if primary_key:
+        if len(primary_key) == 1:
+            unique_sql = f"COUNT({alias}.{primary_key[0]}) - COUNT(DISTINCT {alias}.{primary_key[0]})"
+        else:
+            key_tuple = ", ".join(f"{alias}.{column}" for column in primary_key)
+            unique_sql = f"COUNT(*) - COUNT(DISTINCT ({key_tuple}))"
+        checks.append(
+            {
+                "check_name": "primary_key_unique",
+                "column_name": ", ".join(primary_key),
+                "severity": "fail",
+                "failed_rows_sql": unique_sql,
+            }
+        )
+
+    joins: List[str] = []
+    for foreign_key in schema.get("foreign_keys", []):
+        column = str(foreign_key["field"])
+        parent_dataset, parent_column = str(foreign_key["references"]).split(".", 1)
+        if parent_dataset not in schemas:
+            raise ValueError(f"{dataset}.{column} references unknown dataset: {parent_dataset}")
+        joins.append(
+            f"LEFT JOIN {schemas[parent_dataset]['table']} AS {parent_dataset} "
+            f"ON {parent_dataset}.{parent_column} = {alias}.{column}"
+        )
+        checks.append(
+            {
+                "check_name": f"{column}_references_{parent_dataset}",
+                "column_name": column,
+                "severity": "fail",
+                "failed_rows_sql": (
+                    f"COUNT(*) FILTER (WHERE {alias}.{column} IS NOT NULL AND {parent_dataset}.{parent_column} IS NULL)"
+                ),
+            }
+        )
+
+    for expectation in expectations:
+        if expectation["dataset"] != dataset:
+            continue
+        checks.append(
+            {
+                "check_name": expectation["check_name"],
+                "column_name": None,
+                "severity": expectation["severity"],
+                "failed_rows_sql": f"COUNT(*) FILTER (WHERE NOT COALESCE(({expectation['rule']}), TRUE))",
+            }
+        )
+
+    return {
+        "dataset": dataset,
+        "table": str(schema["table"]),
+        "raw_table": str(schema.get("raw_table", "")),
+        "primary_key": primary_key,
+        "joins": joins,
+        "checks": checks,
+    }
+
+
+@lru_cache(maxsize=None)
+def load_registry(
+    schemas_dir: Path = SCHEMAS_DIR,
+    expectations_path: Path = EXPECTATIONS_PATH,
+) -> Tuple[TableChecks, ...]:
+    """
+    Compile every table contract plus expectations.md into TableChecks (cached per process).
+    """
+    schemas = load_table_schemas(schemas_dir)
+    expectations = parse_expectations(expectations_path)
+    unknown = sorted({expectation["dataset"] for expectation in expectations} - set(schemas))
+    if unknown:
+        raise ValueError(f"expectations.md references datasets without a schema: {', '.join(unknown)}")
+    return tuple(compile_table_checks(schema, schemas, expectations) for schema in schemas.values())
+
+
+def table_checks_sql(table_checks: TableChecks, scope: Optional[Tuple[str, str]] = None) -> str:
+    """
+    One SELECT computing row_count, the raw distinct-key count and every check's failed-row count.
+    scope=(column, relation) restricts both the curated and raw tables to keys present in relation.
+    """
+    alias = table_checks["dataset"]
+    where = ""
+    raw_where = ""
+    if scope is not None:
+        column, relation = scope
+        where = f"WHERE {alias}.{column} IN (SELECT {column} FROM {relation})"
+        raw_where = f"WHERE {column} IN (SELECT {column} FROM {relation})"
+
+    metrics = ["COUNT(*) AS row_count"]
+    if table_checks["raw_table"]:
+        keys = table_checks["primary_key"]
+        raw_key = keys[0] if len(keys) == 1 else f"({', '.join(keys)})"
+        raw_count = f"COUNT(DISTINCT {raw_key})" if keys else "COUNT(*)"
+        metrics.append(f"(SELECT {raw_count} FROM {table_checks['raw_table']} {raw_where}) AS raw_row_count")
+    else:
+        metrics.append("NULL AS raw_row_count")
+    metrics.extend(check["failed_rows_sql"] for check in table_checks["checks"])
+
+    select_list = ",\n        ".join(metrics)
+    joins = "\n    ".join(table_checks["joins"])
+    return f"""
+    SELECT
+        {select_list}
+    FROM {table_checks['table']} AS {alias}
+    {joins}
+    {where}
+    """
+
+
+def run_checks(
+    conn: duckdb.DuckDBPyConnection,
+    scopes: Optional[Dict[str, Tuple[str, str]]] = None,
+    registry: Optional[Tuple[TableChecks, ...]] = None,
+) -> QualityReport:
+    """
+    Run all registered checks: one scan per curated table, all metrics computed in that scan.
+
+    scopes maps dataset -> (key column, relation) to check only the rows loaded for a day
+    (e.g. ("encounter_id", "encounters_df")); datasets without a scope are checked in full.
+    Does not raise on failures; see raise_on_failures.
+    """
+    if registry is None:
+        registry = load_registry()
+    scopes = scopes or {}
+
+    report: QualityReport = {"row_counts": {}, "raw_row_counts": {}, "results": []}
+    for table_checks in registry:
+        dataset = table_checks["dataset"]
+        row = conn.execute(table_checks_sql(table_checks, scopes.get(dataset))).fetchone()
+        if row is None:
+            raise RuntimeError(f"Failed to fetch quality metrics for {table_checks['table']}.")
+        row_count = int(row[0])
+        report["row_counts"][dataset] = row_count
+
+        results: List[Tuple[Check, int]] = []
+        if row[1] is not None:
+            raw_row_count = int(row[1])
+            report["raw_row_counts"][dataset] = raw_row_count
+            results.append(
+                (
+                    {
+                        "check_name": "matches_raw_row_count",
+                        "column_name": None,
+                        "severity": "fail",
+                        "failed_rows_sql": "",
+                    },
+                    abs(row_count - raw_row_count),
+                )
+            )
+        results.extend(zip(table_checks["checks"], (int(value) for value in row[2:])))
+
+        for check, failed_rows in results:
+            report["results"].append(
+                {
+                    "dataset": dataset,
+                    "table_name": table_checks["table"],
+                    "check_name": check["check_name"],
+                    "column_name": check["column_name"],
+                    "severity": check["severity"],
+                    "status": check["severity"] if failed_rows > 0 else "pass",
+                    "failed_rows": failed_rows,
+                    "row_count": row_count,
+                }
+            )
+    return report
+
+
+def format_result(result: CheckResult) -> str:
+    return (
+        f"{result['table_name']}.{result['check_name']}: "
+        f"{result['failed_rows']} of {result['row_count']} rows ({result['severity']})"
+    )
+
+
+def raise_on_failures(report: QualityReport) -> None:
+    """
+    Raise ValueError listing every check with status fail.
+    """
+    failures = [result for result in report["results"] if result["status"] == "fail"]
+    if failures:
+        raise ValueError(
+            "Validation failed: quality checks failed:\n" + "\n".join(f"  - {format_result(r)}" for r in failures)
+        )
+
+
+def result_records(results: List[CheckResult], run_id: str, day: Optional[str] = None) -> List[QualityRecord]:
+    """
+    Tag results with the run and day they belong to, ready for persist_results.
+    """
+    return [
+        {
+            "run_id": run_id,
+            "day": day,
+            "dataset": result["dataset"],
+            "table_name": result["table_name"],
+            "check_name": result["check_name"],
+            "column_name": result["column_name"],
+            "severity": result["severity"],
+            "status": result["status"],
+            "failed_rows": result["failed_rows"],
+            "row_count": result["row_count"],
+        }
+        for result in results
+    ]
+
+
+def persist_results(conn: duckdb.DuckDBPyConnection, records: Sequence[Mapping[str, Any]]) -> int:
+    """
+    Insert QualityRecords (or RunRecorder.quality_records) into quality.results.
+    Returns number of rows inserted.
+    """
+    if records:
+        conn.executemany(
+            f"INSERT INTO quality.results ({', '.join(RESULT_FIELDS)}) "
+            f"VALUES ({', '.join('?' for _ in RESULT_FIELDS)})",
+            [[record[field] for field in RESULT_FIELDS] for record in records],
+        )
+    return len(records)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Run the data quality checks over the whole warehouse.")
+    p.add_argument("--db", default="data/processed/clinical_warehouse.duckdb", help="DuckDB warehouse path")
+    p.add_argument("--no-record", action="store_true", help="Print results only, do not write quality.results")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with duckdb.connect(args.db, read_only=args.no_record) as conn:
+        report = run_checks(conn)
+        if not args.no_record:
+            run_id = uuid.uuid4().hex
+            persisted = persist_results(conn, result_records(report["results"], run_id))
+            print(f"quality: run_id={run_id} results={persisted} -> quality.results")
+
+    for result in report["results"]:
+        if result["status"] != "pass":
+            print(f"quality: {result['status'].upper()} {format_result(result)}")
+    passed = sum(1 for result in report["results"] if result["status"] == "pass")
+    print(f"quality: {passed}/{len(report['results'])} checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+-- ENUM types of the fixed-vocabulary columns (same values, same order as etl/categoricals.py).
+-- Values are stored as 1-byte dictionary codes; comparisons with string literals work as before.
+-- Applied ahead of schema.sql by bootstrap_categorical_types, which also converts the VARCHAR
+-- columns of warehouses created before these types existed.
+
+CREATE TYPE IF NOT EXISTS vital_type_enum AS ENUM (
+    'heart_rate', 'resp_rate', 'temperature_c', 'spo2', 'systolic_bp', 'diastolic_bp'
+);
+
+CREATE TYPE IF NOT EXISTS vital_source_enum AS ENUM ('monitor', 'manual');
+
+CREATE TYPE IF NOT EXISTS scenario_enum AS ENUM ('routine', 'chest_pain', 'sepsis', 'copd_hypoxia');
+
+CREATE TYPE IF NOT EXISTS acuity_enum AS ENUM ('low', 'medium', 'high');
+
+CREATE TYPE IF NOT EXISTS sex_enum AS ENUM ('M', 'F', 'U');
@@ -1,15 +1,25 @@
-CREATE VIEW gold.daily_encounter_summary AS
+-- Gold aggregates: materialized tables refreshed by etl/gold.py for the encounter dates touched
+-- by each load, and views over curated tables that are themselves kept current.
+
+CREATE TABLE IF NOT EXISTS gold.daily_encounter_summary (
+    encounter_date DATE,
+    scenario scenario_enum,
+    acuity acuity_enum,
+    encounter_count BIGINT,
+    avg_los_hours DOUBLE PRECISION,
+    min_los_hours DOUBLE PRECISION,
+    max_los_hours DOUBLE PRECISION
+);
+
+-- Per encounter / vital type / hour, served from the hourly rollup (which also covers raw vitals
+-- compacted by the retention policy), so it needs no refresh of its own.
+CREATE OR REPLACE VIEW gold.hourly_vitals_summary AS
 SELECT
-    CAST(admit_time AS DATE) AS encounter_date,
-    scenario,
-    acuity,
-    COUNT(*) AS encounter_count,
-    AVG(los_hours) AS avg_los_hours,
-    MIN(los_hours) AS min_los_hours,
-    MAX(los_hours) AS max_los_hours
-FROM curated.fact_encounters
-WHERE admit_time IS NOT NULL
-GROUP BY
-    CAST(admit_time AS DATE),
-    scenario,
-    acuity;
+    encounter_id,
+    vital_type,
+    bucket_start AS hour_start,
+    reading_count,
+    min_value,
+    max_value,
+    mean_value
+FROM curated.fact_vitals_1h;
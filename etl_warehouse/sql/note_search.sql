@@ -0,0 +1,21 @@
+-- Inverted index over curated.fact_notes.text, maintained by etl/note_search.py
+-- alongside each load (full rebuild in replace mode, per-encounter in incremental mode).
+
+CREATE TABLE IF NOT EXISTS curated.note_terms (
+    term_id INTEGER,
+    term VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS curated.note_documents (
+    note_id BIGINT,
+    encounter_id BIGINT,
+    token_count INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS curated.note_postings (
+    term_id INTEGER,
+    note_id BIGINT,
+    encounter_id BIGINT,
+    term_freq INTEGER,
+    token_count INTEGER
+);
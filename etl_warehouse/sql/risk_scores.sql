@@ -0,0 +1,21 @@
+-- Early-warning scores (NEWS2, qSOFA) per encounter observation time, maintained by etl/risk_scores.py:
+-- batch loads rescore the encounters they write, stream_ingest.py scores streamed vitals incrementally.
+-- Vital columns hold the observation vector scored at event_time (latest reading of each vital so far).
+
+CREATE TABLE IF NOT EXISTS gold.encounter_risk_scores (
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    event_time TIMESTAMP,
+    scenario scenario_enum,
+    heart_rate DOUBLE PRECISION,
+    resp_rate DOUBLE PRECISION,
+    temperature_c DOUBLE PRECISION,
+    spo2 DOUBLE PRECISION,
+    systolic_bp DOUBLE PRECISION,
+    spo2_scale SMALLINT,
+    news2_score SMALLINT,
+    news2_max_parameter_score SMALLINT,
+    news2_risk VARCHAR,
+    qsofa_score SMALLINT,
+    qsofa_positive BOOLEAN
+);
@@ -1,11 +1,13 @@
 CREATE SCHEMA IF NOT EXISTS raw;
 CREATE SCHEMA IF NOT EXISTS curated;
 CREATE SCHEMA IF NOT EXISTS gold;
+CREATE SCHEMA IF NOT EXISTS ops;
+CREATE SCHEMA IF NOT EXISTS quality;
 
 CREATE TABLE IF NOT EXISTS raw.patients (
     patient_id BIGINT,
     age BIGINT,
-    sex VARCHAR
+    sex sex_enum
 );
 
 CREATE TABLE IF NOT EXISTS raw.encounters (
@@ -13,15 +15,15 @@ CREATE TABLE IF NOT EXISTS raw.encounters (
     patient_id BIGINT,
     admit_time TIMESTAMP,
     discharge_time TIMESTAMP,
-    scenario VARCHAR,
-    acuity VARCHAR,
+    scenario scenario_enum,
+    acuity acuity_enum,
     los_hours DOUBLE PRECISION
 );
 
 CREATE TABLE IF NOT EXISTS curated.dim_patients (
     patient_id BIGINT,
     age BIGINT,
-    sex VARCHAR
+    sex sex_enum
 );
 
 CREATE TABLE IF NOT EXISTS curated.fact_encounters (
@@ -29,7 +31,142 @@ CREATE TABLE IF NOT EXISTS curated.fact_encounters (
     patient_id BIGINT,
     admit_time TIMESTAMP,
     discharge_time TIMESTAMP,
-    scenario VARCHAR,
-    acuity VARCHAR,
+    scenario scenario_enum,
+    acuity acuity_enum,
     los_hours DOUBLE PRECISION
 );
+
+CREATE TABLE IF NOT EXISTS raw.vitals (
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    event_time TIMESTAMP,
+    vital_type vital_type_enum,
+    value DOUBLE PRECISION,
+    source vital_source_enum
+);
+
+-- Rows are inserted ordered by (event_date, encounter_id, event_time) so DuckDB zone maps
+-- prune row groups for per-day and per-encounter scans. unit is not stored per row: join
+-- curated.dim_vital_types on vital_type.
+CREATE TABLE IF NOT EXISTS curated.fact_vitals (
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    event_date DATE,
+    event_time TIMESTAMP,
+    vital_type vital_type_enum,
+    value DOUBLE PRECISION,
+    source vital_source_enum
+);
+
+-- Unit of each vital type (etl/categoricals.py UNIT_BY_VITAL_TYPE)
+CREATE OR REPLACE TABLE curated.dim_vital_types AS
+SELECT CAST(vital_type AS vital_type_enum) AS vital_type, unit
+FROM (
+    VALUES
+        ('heart_rate', 'bpm'),
+        ('resp_rate', 'breaths/min'),
+        ('temperature_c', 'C'),
+        ('spo2', '%'),
+        ('systolic_bp', 'mmHg'),
+        ('diastolic_bp', 'mmHg')
+) AS t(vital_type, unit);
+
+CREATE TABLE IF NOT EXISTS raw.labs (
+    lab_event_id BIGINT,
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    event_time TIMESTAMP,
+    test_name VARCHAR,
+    value DOUBLE PRECISION,
+    unit VARCHAR
+);
+
+-- Same physical order as curated.fact_vitals: (event_date, encounter_id, event_time).
+CREATE TABLE IF NOT EXISTS curated.fact_labs (
+    lab_event_id BIGINT,
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    event_date DATE,
+    event_time TIMESTAMP,
+    test_name VARCHAR,
+    value DOUBLE PRECISION,
+    unit VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS raw.notes (
+    note_id BIGINT,
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    note_time TIMESTAMP,
+    note_type VARCHAR,
+    text VARCHAR
+);
+
+-- Ordered by (note_date, encounter_id, note_time); text is compressed by DuckDB's string codecs.
+CREATE TABLE IF NOT EXISTS curated.fact_notes (
+    note_id BIGINT,
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    note_date DATE,
+    note_time TIMESTAMP,
+    note_type VARCHAR,
+    text VARCHAR
+);
+
+-- One row per ETL stage per run (etl/instrumentation.py). started_at is UTC; cpu_s is process
+-- CPU time (includes DuckDB threads); peak_rss_bytes is the process high-water mark at stage end.
+CREATE TABLE IF NOT EXISTS ops.etl_runs (
+    run_id VARCHAR,
+    day VARCHAR,
+    stage VARCHAR,
+    engine VARCHAR,
+    load_mode VARCHAR,
+    status VARCHAR,
+    started_at TIMESTAMP,
+    wall_s DOUBLE PRECISION,
+    cpu_s DOUBLE PRECISION,
+    peak_rss_bytes BIGINT,
+    rows_in BIGINT,
+    rows_out BIGINT,
+    bytes_read BIGINT
+);
+
+-- One row per input file of each (source, day) currently loaded (etl/manifest.py). pipeline_version
+-- hashes the ETL code/DDL that loaded it; a replace load clears the manifest before recording its day.
+CREATE TABLE IF NOT EXISTS ops.ingest_manifest (
+    source VARCHAR,
+    day VARCHAR,
+    file_name VARCHAR,
+    size_bytes BIGINT,
+    mtime_ns BIGINT,
+    content_hash VARCHAR,
+    pipeline_version VARCHAR,
+    load_mode VARCHAR,
+    run_id VARCHAR,
+    loaded_at TIMESTAMP DEFAULT current_timestamp
+);
+
+-- One row per vitals chunk file appended by stream_ingest.py, recorded in the chunk's transaction;
+-- a chunk whose content_hash (sha256) is already here is not appended again.
+CREATE TABLE IF NOT EXISTS ops.stream_chunks (
+    chunk_name VARCHAR,
+    content_hash VARCHAR,
+    rows_ingested BIGINT,
+    ingested_at TIMESTAMP DEFAULT current_timestamp
+);
+
+-- One row per data quality check per loaded day (quality/checks.py); failed_rows counts violations
+-- among row_count rows checked, status is pass / warn / fail.
+CREATE TABLE IF NOT EXISTS quality.results (
+    run_id VARCHAR,
+    day VARCHAR,
+    dataset VARCHAR,
+    table_name VARCHAR,
+    check_name VARCHAR,
+    column_name VARCHAR,
+    severity VARCHAR,
+    status VARCHAR,
+    failed_rows BIGINT,
+    row_count BIGINT,
+    checked_at TIMESTAMP DEFAULT current_timestamp
+);
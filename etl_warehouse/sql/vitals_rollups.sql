@@ -0,0 +1,38 @@
+-- Multi-resolution vitals rollups, maintained by etl/vitals_rollups.py as part of the gold refresh
+-- of each load. bucket_start is the start of the 5-minute / 1-hour bucket; sum_value and
+-- last_event_time let coarser buckets be re-aggregated exactly from finer ones.
+
+CREATE TABLE IF NOT EXISTS curated.fact_vitals_5m (
+    encounter_id BIGINT,
+    vital_type vital_type_enum,
+    bucket_start TIMESTAMP,
+    reading_count BIGINT,
+    min_value DOUBLE PRECISION,
+    max_value DOUBLE PRECISION,
+    sum_value DOUBLE PRECISION,
+    mean_value DOUBLE PRECISION,
+    last_value DOUBLE PRECISION,
+    last_event_time TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS curated.fact_vitals_1h (
+    encounter_id BIGINT,
+    vital_type vital_type_enum,
+    bucket_start TIMESTAMP,
+    reading_count BIGINT,
+    min_value DOUBLE PRECISION,
+    max_value DOUBLE PRECISION,
+    sum_value DOUBLE PRECISION,
+    mean_value DOUBLE PRECISION,
+    last_value DOUBLE PRECISION,
+    last_event_time TIMESTAMP
+);
+
+-- One row per retention run that compacted raw vitals; raw rows with event_time < MAX(compacted_before)
+-- live only in the rollups.
+CREATE TABLE IF NOT EXISTS ops.vitals_retention (
+    compacted_before TIMESTAMP,
+    raw_rows_deleted BIGINT,
+    curated_rows_deleted BIGINT,
+    compacted_at TIMESTAMP DEFAULT current_timestamp
+);
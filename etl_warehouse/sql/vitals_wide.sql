@@ -0,0 +1,18 @@
+-- Wide (pivoted) vitals: one row per (encounter_id, event_time) with a column per vital type, maintained
+-- by etl/vitals_wide.py from curated.fact_vitals (the long layout) as part of the gold refresh of each
+-- load. A vital type without a reading at event_time is NULL; source is the timestep's capture source.
+-- Same physical order as curated.fact_vitals: (event_date, encounter_id, event_time).
+
+CREATE TABLE IF NOT EXISTS curated.fact_vitals_wide (
+    encounter_id BIGINT,
+    patient_id BIGINT,
+    event_date DATE,
+    event_time TIMESTAMP,
+    source vital_source_enum,
+    heart_rate DOUBLE PRECISION,
+    resp_rate DOUBLE PRECISION,
+    temperature_c DOUBLE PRECISION,
+    spo2 DOUBLE PRECISION,
+    systolic_bp DOUBLE PRECISION,
+    diastolic_bp DOUBLE PRECISION
+);
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+import pytest
+import yaml
+
+# Tests import the pipelines as packages (etl_warehouse.etl.*, data_generator.*) from the repo root
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+SCHEMA_PATH = REPO_ROOT / "etl_warehouse" / "sql" / "schema.sql"
+WAREHOUSE_CONFIG_PATH = REPO_ROOT / "etl_warehouse" / "config.yaml"
+
+# data_generator/config.yaml scaled down so a generated day takes well under a second
+SMALL_GENERATOR_CONFIG = {
+    "patients": {"initial_count": 40, "new_patients_per_day": 3},
+    "encounters": {"count_per_day": 12},
+}
+
+
+def generator_config(**sections: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    data_generator/config.yaml with SMALL_GENERATOR_CONFIG and the given per-section overrides applied.
+    """
+    config = yaml.safe_load((REPO_ROOT / "data_generator" / "config.yaml").read_text(encoding="utf-8"))
+    for overrides in (SMALL_GENERATOR_CONFIG, sections):
+        for section, values in overrides.items():
+            config[section] = {**config.get(section, {}), **copy.deepcopy(values)}
+    return config
+
+
+def warehouse_tables(db_path: Path) -> Dict[str, pd.DataFrame]:
+    """
+    Every raw, curated and gold table of a warehouse file, rows sorted, keyed by schema.table.
+    """
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        names = conn.execute(
+            "SELECT schema_name || '.' || table_name FROM duckdb_tables() "
+            "WHERE schema_name IN ('raw', 'curated', 'gold') ORDER BY 1"
+        ).fetchall()
+        return {name: conn.execute(f"SELECT * FROM {name} ORDER BY ALL").df() for (name,) in names}
+
+
+@pytest.fixture(scope="session")
+def generate_days(tmp_path_factory: pytest.TempPathFactory) -> Callable[..., Path]:
+    """
+    Generate a date range with generate_daily_batch.py's range mode into a fresh workspace
+    (data/raw/<day>/ and data_generator/state/ under it) and return the workspace.
+    Keyword arguments override config sections, e.g. vitals={"engine": "numpy"}.
+    """
+    from data_generator.generate_daily_batch import run_range
+
+    def generate(
+        start: str, end: str, file_format: str = "csv", workers: int = 1, **sections: Dict[str, Any]
+    ) -> Path:
+        workspace = tmp_path_factory.mktemp("workspace")
+        args = argparse.Namespace(start=start, end=end, mode="raw", format=file_format, workers=workers)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.chdir(workspace)
+            run_range(args, generator_config(**sections))
+        return workspace
+
+    return generate
+
+
+@pytest.fixture(scope="session")
+def raw_days(generate_days: Callable[..., Path]) -> Path:
+    """
+    Workspace holding three generated CSV days, 2026-01-01..2026-01-03 (read-only for tests).
+    """
+    return generate_days("2026-01-01", "2026-01-03")
+
+
+@pytest.fixture
+def run_etl(tmp_path: Path) -> Callable[..., Path]:
+    """
+    Run run_etl.py's run() for a workspace into tmp_path / <db_name> and return the database path.
+    Keyword arguments are run_etl.py options (date or start/end, engine, load_mode, force, ...).
+    """
+    from etl_warehouse.etl.instrumentation import RunRecorder
+    from etl_warehouse.etl.run_etl import run
+    from etl_warehouse.etl.session import WarehouseSession, load_warehouse_settings
+
+    def run_in(workspace: Path, db_name: str = "warehouse.duckdb", **options: Any) -> Path:
+        args = argparse.Namespace(
+            date=None, start=None, end=None, source="raw", load_mode=None, engine="pandas",
+            workers=1, commit_every=7, force=False,
+        )
+        for name, value in options.items():
+            setattr(args, name, value)
+        load_mode = "incremental" if args.start else (args.load_mode or "replace")
+        recorder = RunRecorder(engine=args.engine, load_mode=load_mode)
+        db_path = tmp_path / db_name
+        settings = load_warehouse_settings(WAREHOUSE_CONFIG_PATH)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.chdir(workspace)
+            with WarehouseSession(db_path, SCHEMA_PATH, settings=settings) as session:
+                run(args, recorder, session)
+        return db_path
+
+    return run_in
+
+
+@pytest.fixture
+def warehouse() -> Iterator[duckdb.DuckDBPyConnection]:
+    """
+    An empty in-memory warehouse with every migration applied.
+    """
+    from etl_warehouse.etl.migrations import bootstrap_warehouse
+
+    conn = duckdb.connect()
+    bootstrap_warehouse(conn, SCHEMA_PATH)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def add_encounter(warehouse: duckdb.DuckDBPyConnection) -> Callable[..., None]:
+    """
+    Insert a curated encounter (patient_id = 100 + encounter_id).
+    """
+
+    def add(encounter_id: int, admit_time: str = "2026-01-01 06:00:00", scenario: str = "routine") -> None:
+        warehouse.execute(
+            "INSERT INTO curated.fact_encounters VALUES (?, ?, CAST(? AS TIMESTAMP), NULL, ?, 'medium', NULL)",
+            [encounter_id, 100 + encounter_id, admit_time, scenario],
+        )
+
+    return add
+
+
+@pytest.fixture
+def append_vitals(warehouse: duckdb.DuckDBPyConnection) -> Callable[..., int]:
+    """
+    Append (encounter_id, event_time, vital_type, value) readings the way stream_ingest does:
+    curated vitals, then the derived tables, then risk scoring when a RiskScoreStream is given.
+    Returns the risk score rows written.
+    """
+
+    def append(readings: List[Tuple[int, Any, str, float]], stream: Optional[Any] = None) -> int:
+        from etl_warehouse.etl.gold import refresh_gold, track_vitals_changes
+
+        batch = pd.DataFrame(readings, columns=["encounter_id", "event_time", "vital_type", "value"])
+        batch["event_time"] = pd.to_datetime(batch["event_time"])
+        batch["patient_id"] = batch["encounter_id"] + 100
+        warehouse.register("vitals_batch_df", batch)
+        try:
+            warehouse.execute(
+                """
+                INSERT INTO curated.fact_vitals
+                SELECT encounter_id, patient_id, CAST(event_time AS DATE), event_time, vital_type, value, 'monitor'
+                FROM vitals_batch_df
+                """
+            )
+            track_vitals_changes(warehouse, "vitals_batch_df")
+            refresh_gold(warehouse)
+            return stream.score_batch(warehouse, "vitals_batch_df") if stream is not None else 0
+        finally:
+            warehouse.unregister("vitals_batch_df")
+
+    return append
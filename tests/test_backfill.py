@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pytest
+
+from conftest import warehouse_tables
+from etl_warehouse.etl.backfill import date_range
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_backfill_matches_day_by_day_loads(raw_days: Path, run_etl: Callable[..., Path], workers: int) -> None:
+    for day in date_range("2026-01-01", "2026-01-03"):
+        daily_db = run_etl(raw_days, db_name="daily.duckdb", date=day, load_mode="incremental")
+    backfill_db = run_etl(
+        raw_days, db_name="backfill.duckdb", start="2026-01-01", end="2026-01-03", workers=workers, commit_every=2
+    )
+
+    daily, backfill = warehouse_tables(daily_db), warehouse_tables(backfill_db)
+    assert list(backfill) == list(daily)
+    for name, frame in daily.items():
+        pd.testing.assert_frame_equal(backfill[name], frame, obj=name)
+    assert len(daily["curated.fact_encounters"]) > 0
+
+
+def test_date_range_rejects_a_reversed_range() -> None:
+    assert date_range("2026-01-30", "2026-02-01") == ["2026-01-30", "2026-01-31", "2026-02-01"]
+    with pytest.raises(ValueError, match="before start date"):
+        date_range("2026-01-03", "2026-01-01")
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+
+from etl_warehouse.etl.categoricals import (
+    CATEGORICAL_COLUMNS,
+    as_categorical,
+    bootstrap_categorical_types,
+    enum_type_sql,
+)
+from etl_warehouse.etl.extract import categorical_select_sql
+
+TYPES_PATH = Path(__file__).resolve().parents[1] / "etl_warehouse" / "sql" / "categorical_types.sql"
+
+
+@pytest.mark.parametrize("column", sorted(CATEGORICAL_COLUMNS))
+def test_enum_types_match_the_pandas_vocabulary(warehouse: duckdb.DuckDBPyConnection, column: str) -> None:
+    enum_type, categories = CATEGORICAL_COLUMNS[column]
+    assert warehouse.execute(f"SELECT enum_range(NULL::{enum_type})").fetchone()[0] == categories
+    assert duckdb.sql(f"SELECT enum_range(NULL::{enum_type_sql(column)})").fetchone()[0] == categories
+
+
+def test_as_categorical_nulls_values_outside_the_vocabulary() -> None:
+    typed = as_categorical(pd.Series(["spo2", "heart_rate", "pulse", None, "spo2"]), "vital_type")
+    assert list(typed.cat.categories) == CATEGORICAL_COLUMNS["vital_type"][1]
+    assert not typed.cat.ordered
+    assert typed.isna().tolist() == [False, False, True, True, False]
+    assert typed.astype(object).where(typed.notna(), None).tolist() == ["spo2", "heart_rate", None, None, "spo2"]
+
+
+def test_enum_columns_round_trip_through_duckdb(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path) -> None:
+    values = ["manual", "monitor", "manual", "pager"]
+    batch = pd.DataFrame(
+        {
+            "encounter_id": [1, 1, 2, 2],
+            "patient_id": [101, 101, 102, 102],
+            "event_date": pd.to_datetime(["2026-01-01"] * 4).date,
+            "event_time": pd.to_datetime(["2026-01-01 06:00", "2026-01-01 07:00"] * 2),
+            "vital_type": as_categorical(pd.Series(["spo2", "heart_rate", "resp_rate", "pulse"]), "vital_type"),
+            "value": [97.0, 80.0, 18.0, 60.0],
+            "source": as_categorical(pd.Series(values), "source"),
+        }
+    )
+    warehouse.register("batch_df", batch)
+    warehouse.execute("INSERT INTO curated.fact_vitals SELECT * FROM batch_df")
+    stored = warehouse.execute(
+        "SELECT CAST(vital_type AS VARCHAR), CAST(source AS VARCHAR) FROM curated.fact_vitals ORDER BY value"
+    ).fetchall()
+    assert stored == [("resp_rate", "manual"), (None, None), ("heart_rate", "monitor"), ("spo2", "manual")]
+
+    # Read back into pandas (and through the Parquet extract path) the values are the same categoricals
+    read_back = as_categorical(warehouse.execute("SELECT source FROM curated.fact_vitals").df()["source"], "source")
+    assert read_back.dtype == batch["source"].dtype
+    path = tmp_path / "vitals.parquet"
+    warehouse.execute(f"COPY (SELECT * FROM batch_df) TO '{path}' (FORMAT parquet)")
+    extracted = duckdb.execute(categorical_select_sql("vitals"), [str(path)]).df()
+    assert as_categorical(extracted["source"], "source").equals(batch["source"])
+
+
+def test_bootstrap_converts_varchar_columns_to_enums() -> None:
+    conn = duckdb.connect()
+    conn.execute("CREATE SCHEMA curated")
+    conn.execute("CREATE TABLE curated.fact_encounters (encounter_id BIGINT, scenario VARCHAR, acuity VARCHAR)")
+    conn.execute("INSERT INTO curated.fact_encounters VALUES (1, 'sepsis', 'high'), (2, 'flu', 'urgent')")
+    conn.execute("CREATE INDEX idx_encounter_scenario ON curated.fact_encounters (scenario)")
+
+    bootstrap_categorical_types(conn, TYPES_PATH)
+
+    types = dict(
+        conn.execute(
+            "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = 'fact_encounters'"
+        ).fetchall()
+    )
+    assert types["scenario"].startswith("ENUM") and types["acuity"].startswith("ENUM")
+    assert conn.execute(
+        "SELECT encounter_id, scenario, acuity FROM curated.fact_encounters ORDER BY encounter_id"
+    ).fetchall() == [(1, "sepsis", "high"), (2, None, None)]
+    conn.close()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, List
+
+import pandas as pd
+import pytest
+
+from etl_warehouse.etl.extract import extract_day, resolve_input_file
+from etl_warehouse.etl.transform import transform_day
+
+
+@pytest.mark.parametrize(
+    "dataset, names",
+    [
+        ("vitals", ["vitals.csv", "vitals.parquet"]),
+        ("vitals", ["vitals.csv", "vitals_wide.csv"]),
+        ("encounters", ["encounters.parquet", "encounters.csv"]),
+        ("notes", ["notes.jsonl", "notes.jsonl.gz"]),
+    ],
+)
+def test_resolve_input_file_rejects_ambiguous_candidates(tmp_path: Path, dataset: str, names: List[str]) -> None:
+    for name in names:
+        (tmp_path / name).write_bytes(b"")
+    with pytest.raises(ValueError, match=f"Ambiguous {dataset} input"):
+        resolve_input_file(tmp_path, dataset)
+
+
+def test_resolve_input_file_single_candidate(tmp_path: Path) -> None:
+    (tmp_path / "vitals_wide.parquet").write_bytes(b"")
+    assert resolve_input_file(tmp_path, "vitals") == tmp_path / "vitals_wide.parquet"
+    assert resolve_input_file(tmp_path, "labs") is None
+
+
+def test_parquet_and_csv_days_extract_to_the_same_frames(generate_days: Callable[..., Path], raw_days: Path) -> None:
+    parquet_days = generate_days("2026-01-01", "2026-01-03", file_format="parquet")
+    for day in ["2026-01-01", "2026-01-02", "2026-01-03"]:
+        assert (parquet_days / "data" / "raw" / day / "vitals.parquet").exists()
+        from_csv = transform_day(extract_day(raw_days / "data" / "raw" / day))
+        from_parquet = transform_day(extract_day(parquet_days / "data" / "raw" / day))
+        assert list(from_parquet) == list(from_csv)
+        for name, frame in from_csv.items():
+            assert len(frame) > 0, (day, name)
+            pd.testing.assert_frame_equal(from_parquet[name], frame, obj=f"{day} {name}")
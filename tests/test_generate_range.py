@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+
+def _tree(workspace: Path) -> Dict[str, bytes]:
+    """
+    Every generated file (data/raw and data_generator/state) by path relative to the workspace.
+    """
+    return {
+        str(path.relative_to(workspace)): path.read_bytes()
+        for root in ["data/raw", "data_generator/state"]
+        for path in sorted((workspace / root).rglob("*"))
+        if path.is_file()
+    }
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet"])
+def test_range_output_does_not_depend_on_workers(generate_days: Callable[..., Path], file_format: str) -> None:
+    serial = _tree(generate_days("2026-01-01", "2026-01-04", file_format=file_format, workers=1))
+    parallel = _tree(generate_days("2026-01-01", "2026-01-04", file_format=file_format, workers=3))
+    assert sorted(parallel) == sorted(serial)
+    assert len([name for name in serial if name.startswith("data/raw/")]) >= 4 * 4
+    for name, content in serial.items():
+        assert parallel[name] == content, name
+
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from data_generator.generators.labs import LAB_EVENT_ID_STRIDE, generate_labs_columns_for_day
+
+DAY = "2026-01-01"
+SEED = 42
+
+
+def _encounters() -> List[Dict[str, Any]]:
+    """
+    Two 30h encounters per scenario.
+    """
+    scenarios = ["routine", "chest_pain", "sepsis", "copd_hypoxia"] * 2
+    return [
+        {
+            "encounter_id": i + 1,
+            "patient_id": 500 + i,
+            "scenario": scenario,
+            "admit_time": f"2026-01-01T{i:02d}:15:00",
+            "discharge_time": f"2026-01-02T{i + 6:02d}:15:00",
+        }
+        for i, scenario in enumerate(scenarios)
+    ]
+
+
+def test_same_seed_reproduces_the_batch() -> None:
+    first = generate_labs_columns_for_day(DAY, _encounters(), {}, SEED)
+    again = generate_labs_columns_for_day(DAY, _encounters(), {}, SEED)
+    assert len(first["lab_event_id"]) > 0
+    for name, values in first.items():
+        np.testing.assert_array_equal(values, again[name])
+
+
+def test_other_seed_keeps_the_schedule_but_draws_new_values() -> None:
+    first = pd.DataFrame(generate_labs_columns_for_day(DAY, _encounters(), {}, SEED))
+    other = pd.DataFrame(generate_labs_columns_for_day(DAY, _encounters(), {}, SEED + 1))
+    # The panels ordered per encounter are fixed by the scenario; turnarounds and values are random
+    for frame in (first, other):
+        frame.sort_values(["encounter_id", "test_name", "event_time"], inplace=True, ignore_index=True)
+    pd.testing.assert_series_equal(first["test_name"], other["test_name"])
+    pd.testing.assert_series_equal(first["encounter_id"], other["encounter_id"])
+    assert (first["value"] != other["value"]).mean() > 0.5
+    assert (first["event_time"] != other["event_time"]).any()
+
+
+def test_results_follow_the_scenario_panels() -> None:
+    encounters = _encounters()
+    labs = pd.DataFrame(generate_labs_columns_for_day(DAY, encounters, {}, SEED))
+    scenario_of = {e["encounter_id"]: e["scenario"] for e in encounters}
+    labs["scenario"] = labs["encounter_id"].map(scenario_of)
+
+    assert labs["lab_event_id"].is_unique
+    assert (labs["lab_event_id"] // LAB_EVENT_ID_STRIDE == labs["encounter_id"]).all()
+    assert (labs["patient_id"] == labs["encounter_id"] + 499).all()
+    admit = labs["encounter_id"].map({e["encounter_id"]: pd.Timestamp(e["admit_time"]) for e in encounters})
+    discharge = labs["encounter_id"].map({e["encounter_id"]: pd.Timestamp(e["discharge_time"]) for e in encounters})
+    assert labs["event_time"].between(admit, discharge).all()
+
+    tests_by_scenario = labs.groupby("scenario")["test_name"].agg(set)
+    assert "Troponin" in tests_by_scenario["chest_pain"] and "Lactate" not in tests_by_scenario["chest_pain"]
+    assert "Lactate" in tests_by_scenario["sepsis"] and "Troponin" not in tests_by_scenario["sepsis"]
+    assert not {"Troponin", "Lactate"} & tests_by_scenario["routine"]
+    # Troponin is capped at three draws; a 30h sepsis stay gets lactate at 0, 6, ..., 30h
+    troponin = labs[labs["test_name"] == "Troponin"].groupby("encounter_id").size()
+    lactate = labs[labs["test_name"] == "Lactate"].groupby("encounter_id").size()
+    assert troponin.tolist() == [3, 3] and lactate.tolist() == [6, 6]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import duckdb
+import pandas as pd
+
+from conftest import warehouse_tables
+
+DAYS = ["2026-01-01", "2026-01-02", "2026-01-03"]
+
+
+def test_incremental_reload_of_a_day_is_idempotent(raw_days: Path, run_etl: Callable[..., Path]) -> None:
+    for day in DAYS:
+        db_path = run_etl(raw_days, date=day, load_mode="incremental")
+    before = warehouse_tables(db_path)
+    assert len(before["curated.fact_vitals"]) > 0
+
+    run_etl(raw_days, date=DAYS[1], load_mode="incremental", force=True)
+
+    after = warehouse_tables(db_path)
+    assert {name: len(frame) for name, frame in after.items()} == {name: len(frame) for name, frame in before.items()}
+    for name in ["raw.vitals", "curated.fact_encounters", "curated.fact_vitals", "curated.fact_labs"]:
+        pd.testing.assert_frame_equal(after[name], before[name], obj=name)
+
+
+def test_incremental_loads_keep_every_day(raw_days: Path, run_etl: Callable[..., Path]) -> None:
+    for day in DAYS:
+        db_path = run_etl(raw_days, date=day, load_mode="incremental")
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        encounter_days = conn.execute("SELECT DISTINCT CAST(admit_time AS DATE) FROM curated.fact_encounters ORDER BY 1")
+        assert [str(row[0]) for row in encounter_days.fetchall()] == DAYS
+
+    # Replace mode keeps only the day it loads
+    db_path = run_etl(raw_days, db_name="replace.duckdb", date=DAYS[2], load_mode="replace")
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        encounter_days = conn.execute("SELECT DISTINCT CAST(admit_time AS DATE) FROM curated.fact_encounters")
+        assert [str(row[0]) for row in encounter_days.fetchall()] == [DAYS[2]]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from etl_warehouse.etl.manifest import fingerprint_day, record_manifest, unchanged_since
+
+SOURCE = "raw"
+
+
+def _write_day(root: Path, day: str) -> Path:
+    input_dir = root / SOURCE / day
+    input_dir.mkdir(parents=True)
+    for dataset in ["patients", "encounters", "vitals"]:
+        (input_dir / f"{dataset}.csv").write_text(f"{dataset},{day}\n", encoding="utf-8")
+    return input_dir
+
+
+def _load(conn: duckdb.DuckDBPyConnection, input_dir: Path, mode: str) -> None:
+    record_manifest(conn, fingerprint_day(conn, SOURCE, input_dir), mode, run_id="test")
+
+
+def test_unchanged_since_unloaded_day(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path) -> None:
+    manifest = fingerprint_day(warehouse, SOURCE, _write_day(tmp_path, "2026-01-01"))
+    assert unchanged_since(warehouse, manifest, mode="incremental") is None
+    assert unchanged_since(warehouse, manifest, mode="replace") is None
+
+
+@pytest.mark.parametrize("mode", ["replace", "incremental"])
+def test_unchanged_since_same_inputs(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path, mode: str) -> None:
+    input_dir = _write_day(tmp_path, "2026-01-01")
+    _load(warehouse, input_dir, mode)
+    # a touched file with the same content is re-hashed and still matches
+    os.utime(input_dir / "vitals.csv", ns=(1, 1))
+
+    assert unchanged_since(warehouse, fingerprint_day(warehouse, SOURCE, input_dir), mode) is not None
+
+
+def test_unchanged_since_changed_content(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path) -> None:
+    input_dir = _write_day(tmp_path, "2026-01-01")
+    _load(warehouse, input_dir, "incremental")
+    (input_dir / "vitals.csv").write_text("vitals,changed\n", encoding="utf-8")
+
+    assert unchanged_since(warehouse, fingerprint_day(warehouse, SOURCE, input_dir), "incremental") is None
+
+
+def test_unchanged_since_added_file(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path) -> None:
+    input_dir = _write_day(tmp_path, "2026-01-01")
+    _load(warehouse, input_dir, "incremental")
+    (input_dir / "labs.csv").write_text("labs\n", encoding="utf-8")
+
+    assert unchanged_since(warehouse, fingerprint_day(warehouse, SOURCE, input_dir), "incremental") is None
+
+
+def test_unchanged_since_other_pipeline_version(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path) -> None:
+    input_dir = _write_day(tmp_path, "2026-01-01")
+    _load(warehouse, input_dir, "incremental")
+    manifest = fingerprint_day(warehouse, SOURCE, input_dir)
+    manifest["pipeline_version"] = "0" * 64
+
+    assert unchanged_since(warehouse, manifest, "incremental") is None
+
+
+def test_unchanged_since_replace_requires_only_this_day(warehouse: duckdb.DuckDBPyConnection, tmp_path: Path) -> None:
+    first = _write_day(tmp_path, "2026-01-01")
+    _load(warehouse, first, "replace")
+    _load(warehouse, _write_day(tmp_path, "2026-01-02"), "incremental")
+    manifest = fingerprint_day(warehouse, SOURCE, first)
+
+    assert unchanged_since(warehouse, manifest, "incremental") is not None
+    assert unchanged_since(warehouse, manifest, "replace") is None
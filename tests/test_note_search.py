@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Callable, Dict, List
+
+import duckdb
+import pytest
+
+from etl_warehouse.etl.note_search import BM25_B, BM25_K1, refresh_note_index, search_notes, tokenize
+
+NOTES = {
+    1: (1, "Lactate 4.2, lactate repeated: lactate elevated."),
+    2: (1, "Sepsis workup: lactate elevated with fever, hypotension and rising WBC noted overnight."),
+    3: (2, "Chest pain with troponin 0.04; ECG unchanged."),
+    4: (2, "Lactate normal."),
+    5: (3, "Patient stable and comfortable."),
+}
+
+
+def _insert_notes(conn: duckdb.DuckDBPyConnection, notes: Dict[int, tuple]) -> None:
+    for note_id, (encounter_id, text) in notes.items():
+        conn.execute(
+            "INSERT INTO curated.fact_notes "
+            "VALUES (?, ?, ?, DATE '2026-01-01', TIMESTAMP '2026-01-01 08:00:00', 'progress', ?)",
+            [note_id, encounter_id, 100 + encounter_id, text],
+        )
+
+
+@pytest.fixture
+def indexed(warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None]) -> duckdb.DuckDBPyConnection:
+    add_encounter(1, scenario="sepsis")
+    add_encounter(2, scenario="chest_pain")
+    add_encounter(3)
+    _insert_notes(warehouse, NOTES)
+    refresh_note_index(warehouse, full=True)
+    return warehouse
+
+
+def _bm25(query: str, notes: Dict[int, tuple]) -> Dict[int, float]:
+    """
+    Brute-force BM25 over the note texts (any-term match).
+    """
+    docs = {note_id: Counter(tokenize(text)) for note_id, (_, text) in notes.items()}
+    avg_len = sum(sum(terms.values()) for terms in docs.values()) / len(docs)
+    scores: Dict[int, float] = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for terms in docs.values() if term in terms)
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for note_id, terms in docs.items():
+            tf = terms[term]
+            if tf:
+                length = sum(terms.values())
+                scores[note_id] = scores.get(note_id, 0.0) + idf * tf * (BM25_K1 + 1) / (
+                    tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+                )
+    return scores
+
+
+def _ranking(hits: List[dict]) -> List[int]:
+    return [hit["note_id"] for hit in hits]
+
+
+def test_tokenize_drops_stopwords_and_single_characters() -> None:
+    assert tokenize("Lactate 4.2, the WBC is rising (x2)") == ["lactate", "wbc", "rising", "x2"]
+
+
+def test_search_ranks_by_bm25(indexed: duckdb.DuckDBPyConnection) -> None:
+    hits = search_notes(indexed, "lactate", match_all=False)
+    assert _ranking(hits) == [1, 4, 2]
+    expected = _bm25("lactate", NOTES)
+    assert [hit["score"] for hit in hits] == pytest.approx([expected[note_id] for note_id in _ranking(hits)])
+    assert [(hit["encounter_id"], hit["scenario"]) for hit in hits] == [(1, "sepsis"), (2, "chest_pain"), (1, "sepsis")]
+
+
+def test_match_all_scenario_and_limit(indexed: duckdb.DuckDBPyConnection) -> None:
+    assert _ranking(search_notes(indexed, "elevated LACTATE")) == [1, 2]
+    assert _ranking(search_notes(indexed, "lactate fever", match_all=False)) == [2, 1, 4]
+    assert _ranking(search_notes(indexed, "lactate", scenario="chest_pain")) == [4]
+    assert _ranking(search_notes(indexed, "lactate", limit=1)) == [1]
+    assert search_notes(indexed, "lactate ferritin") == []
+    assert search_notes(indexed, "the and") == []
+
+
+def test_incremental_refresh_reindexes_only_loaded_encounters(indexed: duckdb.DuckDBPyConnection) -> None:
+    terms_before = dict(indexed.execute("SELECT term, term_id FROM curated.note_terms").fetchall())
+    indexed.execute("DELETE FROM curated.fact_notes WHERE note_id = 4")
+    _insert_notes(indexed, {6: (2, "Repeat lactate pending; procalcitonin ordered.")})
+    indexed.execute("CREATE TEMP TABLE encounters_df AS SELECT 2::BIGINT AS encounter_id")
+    try:
+        assert refresh_note_index(indexed) == 2
+    finally:
+        indexed.execute("DROP TABLE encounters_df")
+
+    notes = {note_id: note for note_id, note in NOTES.items() if note_id != 4}
+    notes[6] = (2, "Repeat lactate pending; procalcitonin ordered.")
+    hits = search_notes(indexed, "lactate", match_all=False)
+    expected = _bm25("lactate", notes)
+    assert sorted(_ranking(hits)) == sorted(expected)
+    assert [hit["score"] for hit in hits] == pytest.approx(sorted(expected.values(), reverse=True))
+    assert _ranking(search_notes(indexed, "procalcitonin")) == [6]
+    terms_after = dict(indexed.execute("SELECT term, term_id FROM curated.note_terms").fetchall())
+    assert {term: terms_after[term] for term in terms_before} == terms_before
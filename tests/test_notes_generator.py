@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from data_generator.generators.notes import NOTES_COMPRESSIONS, iter_notes_for_day, write_notes_jsonl
+from etl_warehouse.etl.extract import read_notes_jsonl
+
+DAY = "2026-01-01"
+SEED = 42
+
+
+def _encounters() -> List[Dict[str, Any]]:
+    """
+    One 36h encounter per scenario and acuity.
+    """
+    rows = []
+    for i, (scenario, acuity) in enumerate(
+        (scenario, acuity)
+        for scenario in ["routine", "chest_pain", "sepsis", "copd_hypoxia"]
+        for acuity in ["low", "medium", "high"]
+    ):
+        rows.append(
+            {
+                "encounter_id": i + 1,
+                "patient_id": 700 + i,
+                "scenario": scenario,
+                "acuity": acuity,
+                "admit_time": f"2026-01-01T{i:02d}:00:00",
+                "discharge_time": f"2026-01-02T{i + 12:02d}:00:00",
+            }
+        )
+    return rows
+
+
+def test_same_seed_reproduces_the_notes() -> None:
+    first = list(iter_notes_for_day(DAY, _encounters(), {}, SEED))
+    assert len(first) > 0
+    assert list(iter_notes_for_day(DAY, _encounters(), {}, SEED)) == first
+
+    other = list(iter_notes_for_day(DAY, _encounters(), {}, SEED + 1))
+    assert [row["note_type"] for row in other] == [row["note_type"] for row in first]
+    assert [row["text"] for row in other] != [row["text"] for row in first]
+
+
+def test_each_encounter_gets_a_complete_note_timeline() -> None:
+    encounters = _encounters()
+    notes = pd.DataFrame(iter_notes_for_day(DAY, encounters, {}, SEED))
+    notes["note_time"] = pd.to_datetime(notes["note_time"])
+    assert notes["note_id"].is_unique
+
+    progress_counts = {}
+    for encounter in encounters:
+        timeline = notes[notes["encounter_id"] == encounter["encounter_id"]]
+        assert timeline["note_time"].is_monotonic_increasing
+        assert timeline["note_type"].iloc[0] == "triage" and timeline["note_type"].iloc[-1] == "discharge"
+        assert timeline["note_time"].between(encounter["admit_time"], encounter["discharge_time"]).all()
+        assert encounter["acuity"] in timeline["text"].iloc[0]
+        progress_counts[encounter["acuity"]] = int((timeline["note_type"] == "progress").sum())
+    # Progress notes every 24h / 12h / 8h by acuity
+    assert progress_counts == {"low": 1, "medium": 2, "high": 4}
+
+
+@pytest.mark.parametrize("compression", list(NOTES_COMPRESSIONS))
+def test_compressed_notes_read_back_unchanged(tmp_path: Path, compression: str) -> None:
+    notes = list(iter_notes_for_day(DAY, _encounters(), {}, SEED))
+    for other in NOTES_COMPRESSIONS:
+        if other != compression:
+            write_notes_jsonl(notes[:1], tmp_path, compression=other)
+
+    path, written = write_notes_jsonl(iter(notes), tmp_path, compression=compression)
+    assert written == len(notes)
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+    pd.testing.assert_frame_equal(read_notes_jsonl(path), pd.DataFrame(notes).astype(object), check_dtype=False)
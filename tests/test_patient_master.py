@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from data_generator.generators.patients import PATIENT_MASTER_DTYPE, PatientMaster
+
+RECORD = PATIENT_MASTER_DTYPE.itemsize
+
+
+def _master(path: Path, count: int) -> PatientMaster:
+    master = PatientMaster(path)
+    master.append([30 + i % 50 for i in range(count)], ["F" if i % 2 else "M" for i in range(count)])
+    return master
+
+
+def test_append_assigns_consecutive_ids(tmp_path: Path) -> None:
+    master = _master(tmp_path / "master.bin", 3)
+    assert master.append([70, 71], ["F", "M"]) == 2
+    assert master.append([], []) == 0
+
+    assert master.patient_ids.tolist() == [1, 2, 3, 4, 5]
+    assert master.next_patient_id == 6
+    assert master.rows_for([5, 1, 5]) == [
+        {"patient_id": 1, "age": 30, "sex": "M"},
+        {"patient_id": 5, "age": 71, "sex": "M"},
+    ]
+    with pytest.raises(KeyError):
+        master.rows_for([6])
+
+
+def test_flush_appends_only_new_rows(tmp_path: Path) -> None:
+    path = tmp_path / "master.bin"
+    master = _master(path, 3)
+    assert master.flush() == 3
+    assert master.flush() == 0
+    first = path.read_bytes()
+
+    master.append([40], ["F"])
+    assert master.flush() == 1
+    assert path.stat().st_size == 4 * RECORD
+    assert path.read_bytes()[: len(first)] == first
+    assert PatientMaster.load(path).patient_ids.tolist() == [1, 2, 3, 4]
+
+
+def test_torn_record_is_cut_on_load(tmp_path: Path) -> None:
+    path = tmp_path / "master.bin"
+    _master(path, 2).flush()
+    with path.open("ab") as f:
+        f.write(b"\x07" * (RECORD // 2))
+
+    master = PatientMaster.load(path)
+    assert len(master) == 2
+    assert path.stat().st_size == 2 * RECORD
+
+    master.append([50], ["M"])
+    master.flush()
+    assert PatientMaster.load(path).rows_for([3]) == [{"patient_id": 3, "age": 50, "sex": "M"}]
+
+
+def test_flush_overwrites_stray_bytes(tmp_path: Path) -> None:
+    path = tmp_path / "master.bin"
+    master = _master(path, 2)
+    master.flush()
+    with path.open("ab") as f:
+        f.write(b"\x07" * (RECORD + 3))
+
+    master.append([50], ["F"])
+    master.flush()
+    assert path.stat().st_size == 3 * RECORD
+    assert PatientMaster.load(path).patient_ids.tolist() == [1, 2, 3]
+
+
+def test_truncate_undoes_appends_and_flushes(tmp_path: Path) -> None:
+    path = tmp_path / "master.bin"
+    master = _master(path, 3)
+    master.flush()
+    master.append([60, 61], ["F", "F"])
+    master.flush()
+    master.append([62], ["M"])
+
+    master.truncate(3)
+    assert len(master) == 3
+    assert path.stat().st_size == 3 * RECORD
+    assert master.next_patient_id == 4
+
+    # rows appended after the undo take the freed ids and land right after the kept records
+    master.append([63], ["F"])
+    master.flush()
+    assert PatientMaster.load(path).rows_for([4]) == [{"patient_id": 4, "age": 63, "sex": "F"}]
+
+
+def test_flushed_prefix_pickles_as_path_and_size(tmp_path: Path) -> None:
+    path = tmp_path / "master.bin"
+    master = _master(path, 1000)
+    master.flush()
+    master.append([20], ["M"])
+
+    prefix = master.prefix(500)
+    payload = pickle.dumps(prefix)
+    assert len(payload) < 1000
+
+    restored = pickle.loads(payload)
+    assert isinstance(restored._rows, np.memmap)
+    assert restored.patient_ids.tolist() == list(range(1, 501))
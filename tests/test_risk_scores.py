@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Callable, List, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl_warehouse.etl.risk_scores import (
+    RISK_SCORE_COLUMNS,
+    SCORED_VITALS,
+    RiskScoreStream,
+    refresh_risk_scores,
+    score_observations,
+)
+
+# (value, NEWS2 points) on both sides of every band edge
+BAND_EDGES = {
+    "resp_rate": [(8, 3), (9, 1), (11, 1), (12, 0), (20, 0), (21, 2), (24, 2), (25, 3)],
+    "spo2": [(91, 3), (92, 2), (93, 2), (94, 1), (95, 1), (96, 0)],
+    "systolic_bp": [(90, 3), (91, 2), (100, 2), (101, 1), (110, 1), (111, 0), (219, 0), (220, 3)],
+    "heart_rate": [(40, 3), (41, 1), (50, 1), (51, 0), (90, 0), (91, 1), (110, 1), (111, 2), (130, 2), (131, 3)],
+    "temperature_c": [(35.0, 3), (35.1, 1), (36.0, 1), (36.1, 0), (38.0, 0), (38.1, 1), (39.0, 1), (39.1, 2)],
+}
+SPO2_SCALE2_EDGES = [(83, 3), (84, 2), (85, 2), (86, 1), (87, 1), (88, 0), (100, 0)]
+
+NORMAL_VITALS = {"heart_rate": 70.0, "resp_rate": 16.0, "temperature_c": 37.0, "spo2": 98.0, "systolic_bp": 120.0}
+
+T0 = pd.Timestamp("2026-01-01 08:00:00")
+T1 = pd.Timestamp("2026-01-01 08:15:00")
+
+
+def _observations(rows: List[Tuple[str, dict]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"encounter_id": i + 1, "patient_id": 100 + i, "event_time": T0, "scenario": scenario, **vitals}
+            for i, (scenario, vitals) in enumerate(rows)
+        ]
+    )
+
+
+def _single_vital_scores(vital: str, values: List[float], scenario: str = "routine") -> pd.DataFrame:
+    """
+    Score observations that hold only `vital` (other vitals missing, scoring 0).
+    """
+    missing = {name: np.nan for name in SCORED_VITALS}
+    return score_observations(_observations([(scenario, {**missing, vital: value}) for value in values]))
+
+
+@pytest.mark.parametrize("vital", sorted(BAND_EDGES))
+def test_news2_points_at_scale1_band_edges(vital: str) -> None:
+    values, expected = zip(*BAND_EDGES[vital])
+    scores = _single_vital_scores(vital, list(values))
+    assert scores["news2_score"].tolist() == list(expected)
+    assert scores["news2_max_parameter_score"].tolist() == list(expected)
+
+
+def test_news2_points_at_spo2_scale2_band_edges() -> None:
+    values, expected = zip(*SPO2_SCALE2_EDGES)
+    scores = _single_vital_scores("spo2", list(values), scenario="copd_hypoxia")
+    assert scores["spo2_scale"].unique().tolist() == [2]
+    assert scores["news2_score"].tolist() == list(expected)
+
+
+def test_missing_vitals_score_zero() -> None:
+    scores = _single_vital_scores("resp_rate", [np.nan, 5.0])
+    assert scores["news2_score"].tolist() == [0, 3]
+    assert scores["qsofa_score"].tolist() == [0, 0]
+
+
+def test_score_observations_risk_levels() -> None:
+    observations = _observations(
+        [
+            ("routine", NORMAL_VITALS),
+            ("routine", {**NORMAL_VITALS, "resp_rate": 8.0}),  # one parameter at 3
+            ("sepsis", {**NORMAL_VITALS, "heart_rate": 115.0, "resp_rate": 22.0, "temperature_c": 38.5}),  # 2+2+1
+            ("sepsis", {**NORMAL_VITALS, "heart_rate": 135.0, "resp_rate": 26.0, "systolic_bp": 95.0}),  # 3+3+2
+            ("routine", {name: np.nan for name in SCORED_VITALS}),
+        ]
+    )
+    scores = score_observations(observations)
+
+    assert list(scores.columns) == RISK_SCORE_COLUMNS
+    assert scores["news2_score"].tolist() == [0, 3, 5, 8, 0]
+    assert scores["news2_max_parameter_score"].tolist() == [0, 3, 2, 3, 0]
+    assert scores["news2_risk"].tolist() == ["low", "low_medium", "medium", "high", "low"]
+    assert scores["qsofa_score"].tolist() == [0, 0, 1, 2, 0]
+    assert scores["qsofa_positive"].tolist() == [False, False, False, True, False]
+
+
+def test_score_observations_spo2_scale2_for_copd() -> None:
+    observations = _observations(
+        [
+            ("routine", {**NORMAL_VITALS, "spo2": 88.0}),
+            ("copd_hypoxia", {**NORMAL_VITALS, "spo2": 88.0}),
+            ("copd_hypoxia", {**NORMAL_VITALS, "spo2": 83.0}),
+        ]
+    )
+    scores = score_observations(observations)
+
+    assert scores["spo2_scale"].tolist() == [1, 2, 2]
+    assert scores["news2_score"].tolist() == [3, 0, 3]
+    assert scores["news2_risk"].tolist() == ["low_medium", "low", "low_medium"]
+
+
+def _scores(conn: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    return conn.execute(
+        "SELECT * EXCLUDE (scenario, news2_risk) FROM gold.encounter_risk_scores ORDER BY encounter_id, event_time"
+    ).df()
+
+
+def _assert_matches_batch_scoring(conn: duckdb.DuckDBPyConnection) -> pd.DataFrame:
+    streamed = _scores(conn)
+    refresh_risk_scores(conn)
+    pd.testing.assert_frame_equal(streamed, _scores(conn), check_dtype=False)
+    return streamed
+
+
+def test_score_batch_in_order(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1)
+    stream = RiskScoreStream()
+
+    assert append_vitals([(1, T0, "heart_rate", 135.0), (1, T0, "resp_rate", 26.0)], stream) == 1
+    assert append_vitals([(1, T1, "spo2", 91.0)], stream) == 1
+
+    scores = _assert_matches_batch_scoring(warehouse)
+    # the second observation carries heart and respiratory rate forward: 3 + 3 + 3
+    assert scores["news2_score"].tolist() == [6, 9]
+    assert stream.latest[1][0] == T1
+
+
+def test_score_batch_same_timestamp_merges_row(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1)
+    stream = RiskScoreStream()
+
+    append_vitals([(1, T0, "heart_rate", 135.0)], stream)
+    append_vitals([(1, T0, "resp_rate", 26.0), (1, T1, "systolic_bp", 95.0)], stream)
+
+    scores = _assert_matches_batch_scoring(warehouse)
+    assert scores["event_time"].tolist() == [T0, T1]
+    assert scores["news2_score"].tolist() == [6, 8]
+
+
+def test_score_batch_out_of_order_rescores_encounter(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1)
+    add_encounter(2, scenario="copd_hypoxia")
+    stream = RiskScoreStream()
+
+    append_vitals([(1, T1, "heart_rate", 135.0), (2, T0, "spo2", 88.0)], stream)
+    # encounter 1 gets a reading older than its latest score; encounter 2 stays in order
+    append_vitals([(1, T0, "resp_rate", 26.0), (2, T1, "resp_rate", 26.0)], stream)
+
+    scores = _assert_matches_batch_scoring(warehouse)
+    assert scores[["encounter_id", "news2_score"]].values.tolist() == [[1, 3], [1, 6], [2, 0], [2, 3]]
+    assert 1 not in stream.latest
+    assert stream.latest[2][0] == T1
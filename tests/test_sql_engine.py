@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Callable
+
+import duckdb
+import pandas as pd
+import pytest
+
+from conftest import warehouse_tables
+from etl_warehouse.etl.backfill import stage_day
+from etl_warehouse.etl.sql_engine import (
+    drop_staging,
+    stage_day_sql,
+    validate_labs_sql,
+    validate_notes_sql,
+    validate_vitals_sql,
+)
+
+DAY = "2026-01-02"
+
+
+def _corrupt_vitals(frame: pd.DataFrame) -> None:
+    frame.loc[[3, 40], "encounter_id"] = 999999
+
+
+def _mismatch_patients(frame: pd.DataFrame) -> None:
+    frame.loc[[5, 6, 7], "patient_id"] = frame.loc[[5, 6, 7], "patient_id"] + 1
+
+
+def _shift_before_admit(frame: pd.DataFrame) -> None:
+    frame.loc[[10], "event_time"] = "2020-01-01T00:00:00"
+
+
+def _blank_values(frame: pd.DataFrame) -> None:
+    frame.loc[[1, 2], "value"] = None
+
+
+def _repeat_lab_ids(frame: pd.DataFrame) -> None:
+    frame.loc[[4, 9], "lab_event_id"] = frame.loc[0, "lab_event_id"]
+
+
+def _unknown_test_name(frame: pd.DataFrame) -> None:
+    frame.loc[[0], "test_name"] = "Ferritin"
+
+
+def test_engines_load_the_same_warehouse(raw_days: Path, run_etl: Callable[..., Path]) -> None:
+    pandas_db = run_etl(raw_days, db_name="pandas.duckdb", start="2026-01-01", end="2026-01-03", engine="pandas")
+    sql_db = run_etl(raw_days, db_name="sql.duckdb", start="2026-01-01", end="2026-01-03", engine="sql")
+    expected, loaded = warehouse_tables(pandas_db), warehouse_tables(sql_db)
+    assert list(loaded) == list(expected)
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(loaded[name], frame, obj=name)
+
+
+def test_engines_stage_the_same_rows(raw_days: Path, warehouse: duckdb.DuckDBPyConnection) -> None:
+    staged, _ = stage_day(raw_days / "data" / "raw" / DAY)
+    counts = stage_day_sql(warehouse, raw_days / "data" / "raw" / DAY)
+    try:
+        for name, frame in staged.items():
+            assert counts[name] == len(frame) > 0, name
+            sql_rows = warehouse.execute(f"SELECT * FROM {name}_df").df()
+            assert list(sql_rows.columns) == [c for c in frame.columns if c != "unit" or name != "vitals"]
+            for column in sql_rows.columns:
+                left = sql_rows[column].astype(object).where(sql_rows[column].notna(), None)
+                right = frame[column].astype(object).where(frame[column].notna(), None)
+                assert sorted(left.map(str)) == sorted(right.map(str)), (name, column)
+    finally:
+        drop_staging(warehouse)
+
+
+@pytest.mark.parametrize(
+    "dataset, corrupt, message",
+    [
+        ("vitals", _corrupt_vitals, "Vitals referential integrity failed: 2 rows have encounter_id not present"),
+        ("vitals", _mismatch_patients, "Vitals referential integrity failed: 3 rows have patient_id that does not"),
+        ("vitals", _shift_before_admit, "Vitals time-window validation failed: 1 rows have event_time outside"),
+        ("vitals", _blank_values, "Vitals required-field validation failed: value=2"),
+        ("labs", _mismatch_patients, "Labs referential integrity failed: 3 rows have patient_id that does not"),
+        ("labs", _repeat_lab_ids, "Labs key validation failed: 2 rows repeat an existing lab_event_id"),
+        ("labs", _unknown_test_name, "Labs domain validation failed: unknown test_name values Ferritin"),
+    ],
+)
+def test_engines_reject_the_same_bad_rows(
+    raw_days: Path,
+    warehouse: duckdb.DuckDBPyConnection,
+    tmp_path: Path,
+    dataset: str,
+    corrupt: Callable[[pd.DataFrame], None],
+    message: str,
+) -> None:
+    day_dir = tmp_path / DAY
+    shutil.copytree(raw_days / "data" / "raw" / DAY, day_dir)
+    frame = pd.read_csv(day_dir / f"{dataset}.csv")
+    corrupt(frame)
+    frame.to_csv(day_dir / f"{dataset}.csv", index=False)
+
+    with pytest.raises(ValueError, match=message):
+        stage_day(day_dir)
+    stage_day_sql(warehouse, day_dir)
+    try:
+        with pytest.raises(ValueError, match=message):
+            validate_vitals_sql(warehouse)
+            validate_labs_sql(warehouse)
+            validate_notes_sql(warehouse)
+    finally:
+        drop_staging(warehouse)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import duckdb
+
+from conftest import generator_config
+from data_generator.streaming.vitals_producer import (
+    ChunkFileSink,
+    iter_vitals_in_event_order,
+    load_encounters,
+    produce,
+)
+from etl_warehouse.etl.stream_ingest import MicroBatchIngestor
+from etl_warehouse.quality.checks import run_checks
+
+DAY = "2026-01-02"
+
+VITALS_KEY = "encounter_id, event_time, vital_type"
+
+
+def _produce_day(workspace: Path, landing_dir: Path, chunk_rows: int = 400) -> int:
+    """
+    Stream the day's vitals every 30 minutes: every other timestep is one the batch files
+    (hourly) already hold.
+    """
+    encounters = load_encounters(workspace / "data" / "raw" / DAY)
+    vitals_cfg = {**generator_config()["vitals"], "frequency_minutes": 30}
+    rows = iter_vitals_in_event_order(encounters, vitals_cfg, seed=42)
+    sink = ChunkFileSink(landing_dir, prefix=f"vitals-{DAY}", chunk_rows=chunk_rows)
+    return produce(rows, sink, flush_seconds=0)
+
+
+def _key_counts(conn: duckdb.DuckDBPyConnection, table: str) -> tuple:
+    return conn.execute(f"SELECT COUNT(*), COUNT(DISTINCT ({VITALS_KEY})) FROM {table}").fetchone()
+
+
+def test_streaming_a_batch_loaded_day_keeps_keys_unique(
+    raw_days: Path, run_etl: Callable[..., Path], tmp_path: Path
+) -> None:
+    db_path = run_etl(raw_days, date=DAY)
+    landing_dir = tmp_path / "landing"
+    produced = _produce_day(raw_days, landing_dir)
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        loaded, _ = _key_counts(conn, "curated.fact_vitals")
+        readings_5m = conn.execute("SELECT SUM(reading_count) FROM curated.fact_vitals_5m").fetchone()[0]
+
+        ingestor = MicroBatchIngestor(conn, landing_dir)
+        ingestor.drain()
+        assert ingestor.batches_ingested > 1 and ingestor.batches_rejected == 0
+        assert 0 < ingestor.rows_ingested < produced
+        assert ingestor.rows_ingested + ingestor.readings_skipped == produced
+
+        for table in ["raw.vitals", "curated.fact_vitals"]:
+            rows, keys = _key_counts(conn, table)
+            assert rows == keys == loaded + ingestor.rows_ingested
+        assert conn.execute("SELECT SUM(reading_count) FROM curated.fact_vitals_5m").fetchone()[0] == (
+            readings_5m + ingestor.rows_ingested
+        )
+        failed = [result for result in run_checks(conn)["results"] if result["status"] == "fail"]
+        assert failed == []
+    finally:
+        conn.close()
+
+
+def test_restreamed_readings_in_new_chunks_are_skipped(
+    raw_days: Path, run_etl: Callable[..., Path], tmp_path: Path
+) -> None:
+    db_path = run_etl(raw_days, date=DAY)
+    landing_dir = tmp_path / "landing"
+    _produce_day(raw_days, landing_dir)
+
+    conn = duckdb.connect(str(db_path))
+    try:
+        ingestor = MicroBatchIngestor(conn, landing_dir)
+        ingestor.drain()
+        rows_after_first_stream = _key_counts(conn, "curated.fact_vitals")
+
+        # the same readings again, cut into differently sized chunks (so the content hashes differ)
+        produced = _produce_day(raw_days, landing_dir, chunk_rows=700)
+        appended = ingestor.rows_ingested
+        skipped = ingestor.readings_skipped
+        ingestor.drain()
+        assert ingestor.batches_skipped == 0
+        assert (ingestor.rows_ingested, ingestor.readings_skipped) == (appended, skipped + produced)
+        assert _key_counts(conn, "curated.fact_vitals") == rows_after_first_stream
+    finally:
+        conn.close()
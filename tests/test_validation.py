@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl_warehouse.etl.validation import EncounterIndex, check_events, validate_vitals
+
+
+def _encounters() -> pd.DataFrame:
+    """
+    Fifty encounters admitted hourly with 6h stays (in shuffled order); encounter 50 has not been
+    discharged yet.
+    """
+    admit = pd.date_range("2026-01-01 00:00", periods=50, freq="h")
+    encounters = pd.DataFrame(
+        {
+            "encounter_id": np.arange(1, 51, dtype=np.int64),
+            "patient_id": np.arange(101, 151, dtype=np.int64),
+            "admit_time": admit,
+            "discharge_time": admit + pd.Timedelta(hours=6),
+        }
+    )
+    encounters.loc[encounters["encounter_id"] == 50, "discharge_time"] = pd.NaT
+    return encounters.sample(frac=1, random_state=0)
+
+
+def _events(encounters: pd.DataFrame, rows: int = 5000, seed: int = 7) -> pd.DataFrame:
+    """
+    Events spread over encounter ids 1..55 (51..55 unknown), with some wrong patients and some
+    times before admit or after discharge.
+    """
+    rng = np.random.default_rng(seed)
+    encounter_ids = rng.integers(1, 56, rows)
+    patient_ids = encounter_ids + 100
+    patient_ids[rng.random(rows) < 0.05] += 1
+    admit = pd.Series(encounters["admit_time"].to_numpy(), index=encounters["encounter_id"])
+    base = admit.reindex(encounter_ids).fillna(pd.Timestamp("2026-01-01")).to_numpy()
+    offsets = pd.to_timedelta(rng.integers(-60, 8 * 60, rows), unit="min").to_numpy()
+    return pd.DataFrame({"encounter_id": encounter_ids, "patient_id": patient_ids, "event_time": base + offsets})
+
+
+def _merge_reference(events: pd.DataFrame, encounters: pd.DataFrame) -> dict:
+    """
+    The counts of the join-based validation the encounter index replaced.
+    """
+    joined = events.merge(encounters, on="encounter_id", how="left", suffixes=("", "_encounter"))
+    found = joined["patient_id_encounter"].notna()
+    return {
+        "missing_encounter": int((~found).sum()),
+        "patient_mismatch": int((found & (joined["patient_id"] != joined["patient_id_encounter"])).sum()),
+        "outside_window": int(
+            ((joined["event_time"] < joined["admit_time"]) | (joined["event_time"] > joined["discharge_time"])).sum()
+        ),
+    }
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_check_events_matches_the_merge_reference(seed: int) -> None:
+    encounters = _encounters()
+    events = _events(encounters, seed=seed)
+    result = check_events(events, EncounterIndex.from_frame(encounters), sample_size=3)
+
+    expected = _merge_reference(events, encounters)
+    assert {name: result[name] for name in expected} == expected
+    assert all(expected.values())
+    assert len(result["missing_encounter_samples"]) == 3
+    assert (result["missing_encounter_samples"]["encounter_id"] > 50).all()
+
+
+def test_window_bounds_are_inclusive_and_open_encounters_unbounded() -> None:
+    encounters = _encounters()
+    first = encounters[encounters["encounter_id"] == 1].iloc[0]
+    still_admitted = encounters[encounters["encounter_id"] == 50].iloc[0]
+    events = pd.DataFrame(
+        {
+            "encounter_id": [1, 1, 1, 1, 50, 50],
+            "patient_id": [101, 101, 101, 101, 150, 150],
+            "event_time": [
+                first["admit_time"],
+                first["discharge_time"],
+                first["admit_time"] - pd.Timedelta(seconds=1),
+                first["discharge_time"] + pd.Timedelta(seconds=1),
+                still_admitted["admit_time"] + pd.Timedelta(days=30),
+                still_admitted["admit_time"] - pd.Timedelta(seconds=1),
+            ],
+        }
+    )
+    result = check_events(events, EncounterIndex.from_frame(encounters))
+    assert result["outside_window"] == 3
+    assert result["outside_window_samples"].index.tolist() == [2, 3, 5]
+
+
+def test_validate_vitals_reports_the_first_failing_check() -> None:
+    encounters = _encounters()
+    vitals = pd.DataFrame(
+        {
+            "encounter_id": [1, 2, 99],
+            "patient_id": [101, 999, 199],
+            "event_time": pd.to_datetime(["2026-01-01 00:30", "2026-01-01 01:30", "2026-01-01 02:30"]),
+            "vital_type": ["spo2"] * 3,
+            "value": [97.0, 98.0, None],
+        }
+    )
+    with pytest.raises(ValueError, match="required-field validation failed: value=1"):
+        validate_vitals(vitals, encounters)
+    vitals["value"] = 97.0
+    with pytest.raises(ValueError, match=r"1 rows have encounter_id not present .*row 2: encounter_id=99"):
+        validate_vitals(vitals, encounters)
+    with pytest.raises(ValueError, match="1 rows have patient_id that does not match"):
+        validate_vitals(vitals.iloc[:2], EncounterIndex.from_frame(encounters))
+    validate_vitals(vitals.iloc[:1], encounters)
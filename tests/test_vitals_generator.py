@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from data_generator.generators.vitals import (
+    DEFAULT_SCENARIO_RANGES,
+    UNIT_BY_VITAL_TYPE,
+    VITAL_FIELDS,
+    VITAL_SOURCES,
+    VITAL_TYPES,
+    generate_vitals_columns_for_day,
+    generate_vitals_for_day,
+    write_vitals_columns_csv,
+    write_vitals_columns_parquet,
+    write_vitals_csv,
+    write_vitals_parquet,
+)
+
+DAY = "2026-01-01"
+SEED = 20260101
+
+
+def _encounters() -> List[Dict[str, Any]]:
+    """
+    Twenty 24h encounters per scenario, admitted on the hour or at odd minutes (a discharge
+    before admit yields no vitals).
+    """
+    rows = []
+    for i, scenario in enumerate(sorted(DEFAULT_SCENARIO_RANGES) * 20):
+        rows.append(
+            {
+                "encounter_id": i + 1,
+                "patient_id": 1000 + i,
+                "scenario": scenario,
+                "admit_time": f"2026-01-01T{i % 24:02d}:{(i * 7) % 60:02d}:00",
+                "discharge_time": f"2026-01-02T{i % 24:02d}:00:00",
+            }
+        )
+    rows.append({**rows[0], "encounter_id": len(rows) + 1, "discharge_time": "2025-12-31T23:00:00"})
+    return rows
+
+
+@pytest.fixture(scope="module")
+def engines() -> Dict[str, pd.DataFrame]:
+    """
+    Both engines' output for the same encounters and seed, as long frames with string codes.
+    """
+    encounters = _encounters()
+    rows = pd.DataFrame(generate_vitals_for_day(DAY, encounters, {}, SEED), columns=VITAL_FIELDS)
+    rows["event_time"] = pd.to_datetime(rows["event_time"])
+
+    columns = generate_vitals_columns_for_day(DAY, encounters, {}, SEED)
+    numpy_rows = pd.DataFrame(
+        {
+            "encounter_id": columns["encounter_id"],
+            "patient_id": columns["patient_id"],
+            "event_time": pd.to_datetime(columns["event_time"]).as_unit("us"),
+            "vital_type": np.array(VITAL_TYPES)[columns["vital_type"]],
+            "value": columns["value"],
+            "source": np.array(VITAL_SOURCES)[columns["source"]],
+        }
+    )
+    numpy_rows["unit"] = numpy_rows["vital_type"].map(UNIT_BY_VITAL_TYPE)
+    numpy_rows = numpy_rows[VITAL_FIELDS]
+    scenario_of = {e["encounter_id"]: e["scenario"] for e in encounters}
+    for frame in (rows, numpy_rows):
+        frame["scenario"] = frame["encounter_id"].map(scenario_of)
+    return {"python": rows, "numpy": numpy_rows}
+
+
+def test_engines_emit_the_same_readings_in_the_same_order(engines: Dict[str, pd.DataFrame]) -> None:
+    keys = ["encounter_id", "patient_id", "event_time", "vital_type", "unit"]
+    pd.testing.assert_frame_equal(engines["python"][keys], engines["numpy"][keys])
+    # Every timestep carries one source for all of its vital types
+    for frame in engines.values():
+        assert (frame.groupby(["encounter_id", "event_time"])["source"].nunique() == 1).all()
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_values_stay_within_scenario_bounds_and_rounding(engines: Dict[str, pd.DataFrame], engine: str) -> None:
+    frame = engines[engine]
+    for (scenario, vital_type), values in frame.groupby(["scenario", "vital_type"])["value"]:
+        bounds = DEFAULT_SCENARIO_RANGES[scenario][vital_type]
+        assert values.between(bounds["min"], bounds["max"]).all(), (scenario, vital_type)
+        scale = 10 if vital_type == "temperature_c" else 1
+        assert np.allclose(values * scale, np.round(values * scale)), (scenario, vital_type)
+
+
+def test_engines_draw_from_the_same_distributions(engines: Dict[str, pd.DataFrame]) -> None:
+    quantiles = [0.1, 0.25, 0.5, 0.75, 0.9]
+    by_group = {
+        engine: frame.groupby(["scenario", "vital_type"])["value"].quantile(quantiles)
+        for engine, frame in engines.items()
+    }
+    for (scenario, vital_type, q), python_value in by_group["python"].items():
+        bounds = DEFAULT_SCENARIO_RANGES[scenario][vital_type]
+        width = bounds["max"] - bounds["min"]
+        numpy_value = by_group["numpy"][(scenario, vital_type, q)]
+        assert abs(python_value - numpy_value) <= 0.1 * width + 1, (scenario, vital_type, q)
+
+    for frame in engines.values():
+        assert (frame["source"] == "monitor").mean() == pytest.approx(0.85, abs=0.03)
+
+
+def test_numpy_engine_is_deterministic_per_seed() -> None:
+    encounters = _encounters()
+    first = generate_vitals_columns_for_day(DAY, encounters, {}, SEED)
+    again = generate_vitals_columns_for_day(DAY, encounters, {}, SEED)
+    other = generate_vitals_columns_for_day(DAY, encounters, {}, SEED + 1)
+    for field, values in first.items():
+        np.testing.assert_array_equal(values, again[field])
+    assert not np.array_equal(first["value"], other["value"])
+
+
+def test_engines_write_the_same_file_schema(tmp_path: Path) -> None:
+    encounters = _encounters()
+    python_dir, numpy_dir = tmp_path / "python", tmp_path / "numpy"
+    rows = generate_vitals_for_day(DAY, encounters, {}, SEED)
+    columns = generate_vitals_columns_for_day(DAY, encounters, {}, SEED)
+    write_vitals_csv(rows, python_dir)
+    write_vitals_parquet(rows, python_dir)
+    write_vitals_columns_csv(columns, numpy_dir)
+    write_vitals_columns_parquet(columns, numpy_dir)
+
+    python_csv = pd.read_csv(python_dir / "vitals.csv")
+    numpy_csv = pd.read_csv(numpy_dir / "vitals.csv")
+    assert list(python_csv.columns) == list(numpy_csv.columns) == VITAL_FIELDS
+    assert python_csv.dtypes.equals(numpy_csv.dtypes)
+    assert pq.read_schema(python_dir / "vitals.parquet").equals(pq.read_schema(numpy_dir / "vitals.parquet"))
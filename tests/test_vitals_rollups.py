@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import Callable, List, Tuple
+
+import duckdb
+import pandas as pd
+
+from etl_warehouse.etl.vitals_rollups import compact_vitals, refresh_vitals_rollups
+
+ROLLUP_COLUMNS = "encounter_id, vital_type, bucket_start, reading_count, min_value, max_value, sum_value, mean_value, last_value, last_event_time"
+
+
+def _rollup(conn: duckdb.DuckDBPyConnection, table: str) -> pd.DataFrame:
+    return conn.execute(
+        f"SELECT {ROLLUP_COLUMNS} FROM curated.{table} ORDER BY encounter_id, vital_type, bucket_start"
+    ).df()
+
+
+def test_appended_batches_match_full_rebuild(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1)
+    add_encounter(2)
+    append_vitals(
+        [
+            (1, "2026-01-01 08:01:00", "heart_rate", 70.0),
+            (1, "2026-01-01 08:02:00", "heart_rate", 80.0),
+            (1, "2026-01-01 08:07:00", "heart_rate", 90.0),
+            (1, "2026-01-01 09:10:00", "spo2", 95.0),
+        ]
+    )
+    # lands in existing 5-minute and hourly buckets (a new last reading and a new minimum), a new
+    # 5-minute bucket of an existing hour and a new encounter
+    append_vitals(
+        [
+            (1, "2026-01-01 08:03:30", "heart_rate", 60.0),
+            (1, "2026-01-01 08:20:00", "heart_rate", 110.0),
+            (2, "2026-01-01 08:05:00", "resp_rate", 18.0),
+        ]
+    )
+    # a reading older than the bucket's last one does not change its last value
+    append_vitals([(1, "2026-01-01 08:00:30", "heart_rate", 100.0), (1, "2026-01-01 09:00:00", "spo2", 97.0)])
+
+    appended = {table: _rollup(warehouse, table) for table in ["fact_vitals_5m", "fact_vitals_1h"]}
+    refresh_vitals_rollups(warehouse)
+    for table, frame in appended.items():
+        pd.testing.assert_frame_equal(frame, _rollup(warehouse, table), check_exact=False, rtol=1e-12)
+
+    hour = appended["fact_vitals_1h"].iloc[0]
+    assert (hour["reading_count"], hour["min_value"], hour["max_value"]) == (6, 60.0, 110.0)
+    assert hour["mean_value"] == (70.0 + 80.0 + 90.0 + 60.0 + 110.0 + 100.0) / 6
+    assert (hour["last_value"], hour["last_event_time"]) == (110.0, pd.Timestamp("2026-01-01 08:20:00"))
+
+
+def test_appended_readings_merge_with_compacted_buckets(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1, admit_time="2026-01-01 06:00:00")
+    add_encounter(2, admit_time="2026-01-02 06:00:00")
+    append_vitals([(1, "2026-01-01 08:01:00", "heart_rate", 70.0), (1, "2026-01-01 08:02:00", "heart_rate", 80.0)])
+    append_vitals([(2, "2026-01-02 08:00:00", "heart_rate", 90.0)])
+
+    assert compact_vitals(warehouse, raw_days=1) == 2
+    # a late reading for a bucket whose raw readings are gone
+    append_vitals([(1, "2026-01-01 08:03:00", "heart_rate", 100.0)])
+
+    for table in ["fact_vitals_5m", "fact_vitals_1h"]:
+        bucket = _rollup(warehouse, table).iloc[0]
+        assert bucket["encounter_id"] == 1
+        assert (bucket["reading_count"], bucket["sum_value"], bucket["min_value"], bucket["max_value"]) == (
+            3,
+            250.0,
+            70.0,
+            100.0,
+        )
+        assert bucket["last_value"] == 100.0
+
+
+def _reload_encounter(
+    conn: duckdb.DuckDBPyConnection, encounter_id: int, readings: List[Tuple[str, str, float]]
+) -> None:
+    """
+    Replace the encounter's raw readings, then refresh its rollups like an incremental day load.
+    """
+    conn.execute("DELETE FROM curated.fact_vitals WHERE encounter_id = ?", [encounter_id])
+    conn.executemany(
+        """
+        INSERT INTO curated.fact_vitals
+        VALUES (?, ?, CAST(CAST(? AS TIMESTAMP) AS DATE), CAST(? AS TIMESTAMP), ?, ?, 'monitor')
+        """,
+        [
+            [encounter_id, 100 + encounter_id, event_time, event_time, vital_type, value]
+            for event_time, vital_type, value in readings
+        ],
+    )
+    conn.register("reloaded_encounters_df", pd.DataFrame({"encounter_id": [encounter_id]}))
+    try:
+        refresh_vitals_rollups(conn, encounters="reloaded_encounters_df")
+    finally:
+        conn.unregister("reloaded_encounters_df")
+
+
+def test_reload_starting_later_drops_earlier_buckets(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1)
+    append_vitals([(1, "2026-01-01 07:00:00", "heart_rate", 70.0), (1, "2026-01-01 09:00:00", "heart_rate", 80.0)])
+
+    _reload_encounter(warehouse, 1, [("2026-01-01 09:30:00", "heart_rate", 90.0)])
+
+    for table in ["fact_vitals_5m", "fact_vitals_1h"]:
+        assert _rollup(warehouse, table)["reading_count"].sum() == 1
+    reloaded = {table: _rollup(warehouse, table) for table in ["fact_vitals_5m", "fact_vitals_1h"]}
+    refresh_vitals_rollups(warehouse)
+    for table, frame in reloaded.items():
+        pd.testing.assert_frame_equal(frame, _rollup(warehouse, table))
+
+
+def test_reload_after_compaction_keeps_compacted_buckets(
+    warehouse: duckdb.DuckDBPyConnection, add_encounter: Callable[..., None], append_vitals: Callable[..., int]
+) -> None:
+    add_encounter(1, admit_time="2026-01-01 06:00:00")
+    add_encounter(2, admit_time="2026-01-02 06:00:00")
+    append_vitals(
+        [
+            (1, "2026-01-01 08:00:00", "heart_rate", 70.0),
+            (1, "2026-01-02 07:00:00", "heart_rate", 80.0),
+            (1, "2026-01-02 09:00:00", "heart_rate", 90.0),
+        ]
+    )
+    compact_vitals(warehouse, raw_days=1)
+
+    _reload_encounter(warehouse, 1, [("2026-01-02 09:00:00", "heart_rate", 95.0)])
+
+    hourly = _rollup(warehouse, "fact_vitals_1h")
+    assert hourly["bucket_start"].dt.strftime("%Y-%m-%d %H:%M").tolist() == ["2026-01-01 08:00", "2026-01-02 09:00"]
+    assert hourly["last_value"].tolist() == [70.0, 95.0]
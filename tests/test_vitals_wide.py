@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict
+
+import duckdb
+import pandas as pd
+import pytest
+
+from conftest import warehouse_tables
+from etl_warehouse.etl.extract import extract_day
+from etl_warehouse.etl.sql_engine import drop_staging, stage_day_sql
+from etl_warehouse.etl.transform import transform_day
+
+DAYS = ["2026-01-01", "2026-01-02", "2026-01-03"]
+VITAL_KEY = ["encounter_id", "event_time", "vital_type"]
+
+
+def _layouts(generate_days: Callable[..., Path], engine: str, file_format: str) -> Dict[str, Path]:
+    return {
+        layout: generate_days(DAYS[0], DAYS[-1], file_format=file_format, vitals={"engine": engine, "layout": layout})
+        for layout in ["long", "wide"]
+    }
+
+
+def _sorted(vitals: pd.DataFrame) -> pd.DataFrame:
+    return vitals.sort_values(VITAL_KEY, ignore_index=True)
+
+
+@pytest.mark.parametrize("engine, file_format", [("python", "csv"), ("numpy", "csv"), ("numpy", "parquet")])
+def test_wide_and_long_days_extract_to_the_same_readings(
+    generate_days: Callable[..., Path], warehouse: duckdb.DuckDBPyConnection, engine: str, file_format: str
+) -> None:
+    workspaces = _layouts(generate_days, engine, file_format)
+    for day in DAYS:
+        day_dirs = {layout: workspace / "data" / "raw" / day for layout, workspace in workspaces.items()}
+        assert (day_dirs["wide"] / f"vitals_wide.{file_format}").exists()
+        assert not (day_dirs["wide"] / f"vitals.{file_format}").exists()
+
+        # pandas engine: extract_day unpivots the wide file while reading
+        long_vitals, wide_vitals = (transform_day(extract_day(day_dirs[name]))["vitals"] for name in ["long", "wide"])
+        assert len(long_vitals) > 0
+        pd.testing.assert_frame_equal(_sorted(wide_vitals), _sorted(long_vitals))
+
+        # sql engine: stage_day_sql unpivots in the staging statement
+        staged = {}
+        for layout, day_dir in day_dirs.items():
+            stage_day_sql(warehouse, day_dir)
+            staged[layout] = _sorted(warehouse.execute("SELECT * FROM vitals_df").df())
+            drop_staging(warehouse)
+        pd.testing.assert_frame_equal(staged["wide"], staged["long"])
+        assert len(staged["long"]) == len(long_vitals)
+
+
+
+@pytest.mark.parametrize("engine", ["pandas", "sql"])
+def test_wide_and_long_days_load_the_same_warehouse(
+    generate_days: Callable[..., Path], run_etl: Callable[..., Path], engine: str
+) -> None:
+    workspaces = _layouts(generate_days, "numpy", "csv")
+    loaded = {
+        layout: warehouse_tables(
+            run_etl(workspace, db_name=f"{layout}.duckdb", start=DAYS[0], end=DAYS[-1], engine=engine)
+        )
+        for layout, workspace in workspaces.items()
+    }
+    assert len(loaded["long"]["curated.fact_vitals_wide"]) > 0
+    for name, frame in loaded["long"].items():
+        pd.testing.assert_frame_equal(loaded["wide"][name], frame, obj=name)